@@ -0,0 +1,66 @@
+"""Compare the legacy per-field ``getattr`` serializer with the compiled one.
+
+Usage: ``python -m benchmarks.bench_book_serializer [rows ...]``
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+from typing import Callable, Iterable, List
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+
+from library.models import Book  # noqa: E402
+from library.serializers import BookSerializer  # noqa: E402
+
+DEFAULT_ROWS = (10_000, 100_000, 1_000_000)
+
+
+def _books(rows: int) -> List[Book]:
+    books = []
+    for index in range(rows):
+        book = Book(
+            title=f"Título del libro número {index}",
+            author=f"Autor {index % 500}",
+            published_year=1900 + index % 120,
+            isbn=f"978-{index:09d}",
+            created_by="importer",
+        )
+        book.id = index + 1
+        books.append(book)
+    return books
+
+
+def legacy_data(books: Iterable[Book]) -> List[dict]:
+    """The serializer as it was before compilation: copy, then ``getattr`` per field."""
+
+    fields = BookSerializer.fields
+    books = list(books) if not isinstance(books, list) else books
+    return [{field: getattr(book, field) for field in fields} for book in books]
+
+
+def _best_of(repeat: int, run: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv: List[str]) -> int:
+    sizes = [int(value) for value in argv] or list(DEFAULT_ROWS)
+    print(f"{'rows':>10} {'legacy s':>10} {'compiled s':>11} {'rows() s':>9} {'speed-up':>9}")
+    for rows in sizes:
+        books = _books(rows)
+        repeat = 5 if rows <= 100_000 else 2
+        legacy = _best_of(repeat, lambda: legacy_data(iter(books)))
+        compiled = _best_of(repeat, lambda: BookSerializer(iter(books), many=True).data())
+        tuples = _best_of(repeat, lambda: BookSerializer(books, many=True).rows())
+        print(f"{rows:>10} {legacy:>10.3f} {compiled:>11.3f} {tuples:>9.3f} {legacy / compiled:>8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
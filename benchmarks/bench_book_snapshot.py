@@ -0,0 +1,74 @@
+"""Compare a cold start from a binary snapshot with replaying the catalogue.
+
+Usage: ``python -m benchmarks.bench_book_snapshot [rows ...]``
+
+``load_snapshot`` still decodes every row and rebuilds the secondary indexes,
+so it is measured against ``bulk_create`` over the same books; the decode
+alone (``read_snapshot``) is reported separately.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, List
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+
+from library.book_snapshot import read_snapshot  # noqa: E402
+from library.models import Book, BookRepository  # noqa: E402
+
+DEFAULT_ROWS = (10_000, 100_000)
+
+
+def _items(rows: int) -> List[dict]:
+    return [
+        {
+            "title": f"Título del libro número {index}",
+            "author": f"Autor {index % 500}",
+            "published_year": 1900 + index % 120,
+            "isbn": f"978-{index:09d}",
+            "created_by": "importer",
+        }
+        for index in range(rows)
+    ]
+
+
+def _best_of(repeat: int, setup: Callable[[], object], run: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        setup()
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv: List[str]) -> int:
+    sizes = [int(value) for value in argv] or list(DEFAULT_ROWS)
+    print(f"{'rows':>10} {'storage':>9} {'replay s':>9} {'load s':>7} {'decode s':>9} {'speed-up':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "books.snap")
+        for rows in sizes:
+            items = _items(rows)
+            repeat = 3
+            for storage in ("dict", "columnar"):
+                BookRepository.use_storage(storage)
+                BookRepository.reset()
+                BookRepository.bulk_create(items)
+                BookRepository.dump_snapshot(path)
+                replay = _best_of(repeat, BookRepository.reset, lambda: BookRepository.bulk_create(items))
+                load = _best_of(repeat, BookRepository.reset, lambda: BookRepository.load_snapshot(path))
+                decode = _best_of(repeat, lambda: None, lambda: read_snapshot(path, Book))
+                print(
+                    f"{rows:>10} {storage:>9} {replay:>9.3f} {load:>7.3f} "
+                    f"{decode:>9.3f} {replay / load:>8.1f}x"
+                )
+    BookRepository.reset()
+    BookRepository.use_storage("dict")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
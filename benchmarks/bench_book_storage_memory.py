@@ -0,0 +1,82 @@
+"""Compare the memory used by the dict and columnar BookRepository storages.
+
+Usage: ``python -m benchmarks.bench_book_storage_memory [rows ...]``
+
+Reports the storage backend alone and the whole repository, whose secondary
+indexes (ISBN, author, year, search and updated_at) are the same for both
+backends.
+"""
+from __future__ import annotations
+
+import gc
+import os
+import sys
+import tracemalloc
+from typing import Iterator, List
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+
+from library.models import STORAGE_BACKENDS, Book, BookRepository  # noqa: E402
+
+DEFAULT_ROWS = (10_000, 100_000)
+AUTHORS = [f"Autor {index}" for index in range(500)]
+
+
+def _books(rows: int) -> Iterator[Book]:
+    for index in range(rows):
+        book = Book(
+            title=f"Título del libro número {index}",
+            author=AUTHORS[index % len(AUTHORS)],
+            published_year=1900 + index % 120,
+            isbn=f"978-{index:09d}",
+            created_by="importer",
+        )
+        book.id = index + 1
+        yield book
+
+
+def measure(backend: str, rows: int) -> int:
+    """Return the bytes still allocated after loading ``rows`` books into the store."""
+
+    gc.collect()
+    tracemalloc.start()
+    store = STORAGE_BACKENDS[backend](_books(rows))
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del store
+    return current
+
+
+def measure_repository(backend: str, rows: int) -> int:
+    """Return the bytes allocated by ``BookRepository`` holding ``rows`` books."""
+
+    BookRepository.use_storage(backend)
+    BookRepository.reset()
+    gc.collect()
+    tracemalloc.start()
+    BookRepository.replace_all(_books(rows))
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    BookRepository.reset()
+    BookRepository.use_storage("dict")
+    return current
+
+
+def main(argv: List[str]) -> int:
+    sizes = [int(value) for value in argv] or list(DEFAULT_ROWS)
+    print(f"{'rows':>10} {'scope':>11} {'dict MiB':>10} {'columnar MiB':>13} {'ratio':>7}")
+    for rows in sizes:
+        for scope, function in (("store", measure), ("repository", measure_repository)):
+            dict_bytes = function("dict", rows)
+            columnar_bytes = function("columnar", rows)
+            print(
+                f"{rows:>10} {scope:>11} {dict_bytes / 2**20:>10.2f} "
+                f"{columnar_bytes / 2**20:>13.2f} {dict_bytes / columnar_bytes:>6.1f}x"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
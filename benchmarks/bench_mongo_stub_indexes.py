@@ -0,0 +1,65 @@
+"""Compare review queries on the in-memory pymongo Collection with and without indexes.
+
+Usage: ``python -m benchmarks.bench_mongo_stub_indexes [reviews ...]``
+"""
+from __future__ import annotations
+
+import sys
+import time
+from typing import Callable, List
+
+from pymongo import ASCENDING, DESCENDING, Collection
+
+DEFAULT_REVIEWS = (10_000, 100_000)
+BOOKS = 1_000
+USERS = 5_000
+ORDER = [("created_at", DESCENDING), ("_id", DESCENDING)]
+QUERIES = 200
+
+
+def _load(reviews: int, *, indexed: bool) -> Collection:
+    collection = Collection("book_reviews")
+    if indexed:
+        collection.create_index([("book_id", ASCENDING), *ORDER], name="book_id_created_at")
+        collection.create_index([("book_id", ASCENDING), ("user_id", ASCENDING)], name="book_id_user_id")
+    for index in range(reviews):
+        collection.insert_one(
+            {
+                "book_id": index % BOOKS,
+                "user_id": index % USERS,
+                "rating": 1 + index % 5,
+                "created_at": f"2024-{1 + index % 12:02d}-{1 + index % 28:02d}T{index % 24:02d}:00:00+00:00",
+            }
+        )
+    return collection
+
+
+def _time(query: Callable[[int], object]) -> float:
+    start = time.perf_counter()
+    for book_id in range(QUERIES):
+        query(book_id)
+    return (time.perf_counter() - start) / QUERIES * 1000
+
+
+def measure(collection: Collection) -> List[float]:
+    """Return the average milliseconds of a review page, a pair lookup and a count."""
+
+    return [
+        _time(lambda book_id: list(collection.find({"book_id": book_id}).sort(ORDER).limit(51))),
+        _time(lambda book_id: collection.find_one({"book_id": book_id, "user_id": book_id})),
+        _time(lambda book_id: collection.count_documents({"book_id": book_id})),
+    ]
+
+
+def main(argv: List[str]) -> int:
+    sizes = [int(value) for value in argv] or list(DEFAULT_REVIEWS)
+    print(f"{'reviews':>10} {'index':>6} {'page ms':>9} {'pair ms':>9} {'count ms':>9}")
+    for reviews in sizes:
+        for indexed in (False, True):
+            page, pair, count = measure(_load(reviews, indexed=indexed))
+            print(f"{reviews:>10} {'yes' if indexed else 'no':>6} {page:>9.3f} {pair:>9.3f} {count:>9.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,108 @@
+"""Stress BookRepository with concurrent reader and writer threads.
+
+Usage: ``python -m benchmarks.bench_repository_concurrency [readers] [writers] [seconds]``
+
+Runs in thread-safe mode, reports read/write throughput and checks that ids
+stayed unique and the ordered id index matches the stored records.
+"""
+from __future__ import annotations
+
+import os
+import random
+import sys
+import threading
+import time
+from typing import List
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+
+from library.models import BookRepository  # noqa: E402
+
+SEED_BOOKS = 5_000
+
+
+def _reader(stop: threading.Event, counts: List[int], slot: int, seed: int) -> None:
+    rng = random.Random(seed)
+    operations = 0
+    while not stop.is_set():
+        choice = rng.random()
+        if choice < 0.6:
+            try:
+                BookRepository.get(rng.randint(1, BookRepository._next_id))
+            except LookupError:
+                pass
+        elif choice < 0.9:
+            BookRepository.list_page(after=rng.randint(0, BookRepository._next_id), limit=20)
+        else:
+            BookRepository.search(f"libro {rng.randint(0, 99)}", limit=10)
+        operations += 1
+    counts[slot] = operations
+
+
+def _writer(stop: threading.Event, counts: List[int], created: List[List[int]], slot: int, seed: int) -> None:
+    rng = random.Random(seed)
+    operations = 0
+    mine: List[int] = []
+    while not stop.is_set():
+        choice = rng.random()
+        if choice < 0.5 or not mine:
+            book = BookRepository.create(title=f"Libro {rng.randint(0, 99)}", author=f"Autor {slot}")
+            mine.append(book.id)
+        elif choice < 0.8:
+            BookRepository.update(rng.choice(mine), published_year=rng.randint(1900, 2024))
+        else:
+            BookRepository.delete(mine.pop(rng.randrange(len(mine))))
+        operations += 1
+    counts[slot] = operations
+    created[slot] = mine
+
+
+def run(readers: int, writers: int, seconds: float) -> dict:
+    BookRepository.set_thread_safe(True)
+    BookRepository.reset()
+    BookRepository.bulk_create({"title": f"Libro {index % 100}", "author": "Semilla"} for index in range(SEED_BOOKS))
+    stop = threading.Event()
+    read_counts = [0] * readers
+    write_counts = [0] * writers
+    created: List[List[int]] = [[] for _ in range(writers)]
+    threads = [
+        threading.Thread(target=_reader, args=(stop, read_counts, slot, slot)) for slot in range(readers)
+    ] + [
+        threading.Thread(target=_writer, args=(stop, write_counts, created, slot, 1_000 + slot))
+        for slot in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    survivors = [book_id for ids in created for book_id in ids]
+    consistent = (
+        len(survivors) == len(set(survivors))
+        and list(BookRepository._ordered_ids) == sorted(BookRepository._records)
+        and len(BookRepository.list_all()) == SEED_BOOKS + len(survivors)
+    )
+    BookRepository.set_thread_safe(False)
+    return {
+        "reads_per_second": sum(read_counts) / seconds,
+        "writes_per_second": sum(write_counts) / seconds,
+        "consistent": consistent,
+    }
+
+
+def main(argv: List[str]) -> int:
+    readers = int(argv[0]) if len(argv) > 0 else 8
+    writers = int(argv[1]) if len(argv) > 1 else 2
+    seconds = float(argv[2]) if len(argv) > 2 else 3.0
+    result = run(readers, writers, seconds)
+    print(
+        f"readers={readers} writers={writers} seconds={seconds:g} "
+        f"reads/s={result['reads_per_second']:.0f} writes/s={result['writes_per_second']:.0f} "
+        f"consistent={result['consistent']}"
+    )
+    return 0 if result["consistent"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
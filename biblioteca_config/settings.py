@@ -144,6 +144,10 @@ MONGO_URI = _env("MONGO_URI", "mongodb://mongo:27017/biblioteca_online")
 MONGO_DB_NAME = _env("MONGO_DB_NAME", "biblioteca_online")
 MONGO_ACTIVITY_COLLECTION = _env("MONGO_ACTIVITY_COLLECTION", "activity_logs")
 MONGO_REVIEWS_COLLECTION = _env("MONGO_REVIEWS_COLLECTION", "book_reviews")
+MONGO_RATING_AGGREGATES_COLLECTION = _env("MONGO_RATING_AGGREGATES_COLLECTION", "book_rating_aggregates")
+
+# Rating aggregates cache (Trabajo29)
+REVIEWS_AGGREGATE_CACHE_TTL = float(_env("REVIEWS_AGGREGATE_CACHE_TTL", "5"))
 
 # Neo4j configuration (Trabajo10)
 NEO4J_URI = _env("NEO4J_URI", "bolt://neo4j:7687")
@@ -153,3 +157,9 @@ NEO4J_PASSWORD = _env("NEO4J_PASSWORD", "secret")
 # Celery configuration (Trabajo10)
 CELERY_BROKER_URL = _env("CELERY_BROKER_URL", "redis://redis:6379/0")
 CELERY_RESULT_BACKEND = _env("CELERY_RESULT_BACKEND", CELERY_BROKER_URL)
+
+# Response compression (Trabajo27)
+API_COMPRESSION_MIN_SIZE = int(_env("API_COMPRESSION_MIN_SIZE", "1024"))
+API_COMPRESSION_LEVEL = int(_env("API_COMPRESSION_LEVEL", "6"))
+API_COMPRESSED_CACHE_SIZE = int(_env("API_COMPRESSED_CACHE_SIZE", "64"))
+API_COMPRESSED_CACHE_MAX_BODY = int(_env("API_COMPRESSED_CACHE_MAX_BODY", str(4 << 20)))
@@ -1,8 +1,8 @@
 """Simplified HTTP primitives compatible with the tests."""  # noqa: D205
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any
+from dataclasses import dataclass, field
+from typing import Any, Dict
 
 
 @dataclass
@@ -11,6 +11,8 @@ class HttpRequest:
     path: str = "/"
     body: bytes | None = None
     user: Any | None = None
+    GET: Dict[str, str] = field(default_factory=dict)
+    headers: Dict[str, str] = field(default_factory=dict)
 
 
 class HttpResponse:
@@ -2,23 +2,46 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Dict
+import secrets
+from datetime import UTC, datetime
+from typing import Any, Callable, Dict, Iterator, Sequence
 
 from django.contrib.auth.models import AnonymousUser
 from django.http import HttpRequest
-from rest_framework import APIView, Response
+from rest_framework import APIView, Response, StreamingResponse
+from rest_framework.compression import strip_encoding_suffix
+from rest_framework.renderers import json_dumps
 
-from .models import BookRepository
+from .book_changes import CHANGE_PUT, ChangeFeedExpired
+from .book_storage import to_epoch_micros
+from .models import Book, BookRepository, BookVersionConflict
 from .mongo_client import get_mongo_client
 from .neo4j_service import get_recommended_books_for_user
 from .reviews_service import (
+    RATING_VALUES,
+    RatingAggregate,
     create_review,
+    create_reviews_bulk,
     get_average_rating_for_book,
-    get_reviews_for_book,
+    get_average_ratings_for_books,
+    get_rating_aggregate,
+    get_rating_aggregates,
+    get_reviews_by_user,
+    get_reviews_page,
+    iter_reviews_for_book,
+    upsert_review,
 )
 from .tasks import task_sync_book_reviews_to_neo4j, task_sync_user_recommendations
 from .serializers import BookInputSerializer, BookSerializer
 
+BOOKS_PAGE_DEFAULT_LIMIT = 50
+BOOKS_PAGE_MAX_LIMIT = 500
+BOOKS_RATINGS_BATCH_SIZE = 1000
+REVIEWS_BULK_MAX_ITEMS = 10_000
+BOOKS_BULK_MAX_ITEMS = 10_000
+# Distinguishes list ETags across processes, whose generation counters restart.
+_INSTANCE_TAG = secrets.token_hex(4)
+
 
 class HealthAPIView(APIView):
     """Return a JSON payload confirming the service status."""
@@ -51,11 +74,82 @@ class MongoHealthAPIView(APIView):
 
 
 class BookListAPIView(APIView):
-    """Return every book stored in the repository."""
+    """Return the books stored in the repository.
+
+    Without query parameters the whole catalogue is returned as a list. When
+    ``cursor`` or ``limit`` are given the response is a keyset-paginated page
+    ``{"results": [...], "next_cursor": ...}`` ordered by id. Responses carry
+    an ``ETag`` derived from the repository generation, so ``If-None-Match``
+    is answered with 304 before anything is serialized (but only once every
+    query parameter has been validated).
+
+    ``updated_since=<ISO 8601>`` returns a delta instead: the books created or
+    updated since then, tombstones for the deleted ones and the
+    ``next_updated_since`` value to send on the next sync. If the tombstones
+    no longer reach back that far ``full_resync`` is true and ``results``
+    holds the whole catalogue, which replaces the client copy.
+
+    Every mode accepts ``fields=id,title`` to return only those book fields,
+    and ``include=rating`` to add ``average_rating`` and ``reviews_count`` to
+    each book; the ratings are fetched with one query per batch of books
+    (see :func:`get_average_ratings_for_books`) and such listings carry no
+    ``ETag``.
+    Listings are streamed (see :class:`StreamingResponse`) and assembled from
+    the per-book JSON fragments cached by the repository, so only books that
+    changed since they were last listed are serialized and encoded again.
+    """
+
+    include_options = ("rating",)
 
     def get(self, request: Any | None = None) -> Response:
-        serializer = BookSerializer(BookRepository.list_all(), many=True)
-        return Response(serializer.data(), status=200)
+        params = _query_params(request)
+        errors: Dict[str, list] = {}
+        include = _parse_include(params.get("include"), self.include_options, errors)
+        # Ratings change without touching the catalogue, so rated listings carry no ETag.
+        rated = "rating" in include
+        fields = _parse_fields(params.get("fields"), BookSerializer.fields, errors)
+        delta = "updated_since" in params
+        paged = not delta and ("cursor" in params or "limit" in params)
+        # Every parameter is validated before If-None-Match: a bad request is a 400, not a 304.
+        since = after = limit = None
+        if delta:
+            since = _parse_timestamp(params["updated_since"])
+            if since is None:
+                errors["updated_since"] = ["Fecha inválida (ISO 8601)."]
+        elif paged:
+            after = _parse_cursor(params.get("cursor"), errors)
+            limit = _parse_limit(params.get("limit"), errors)
+        if errors:
+            return Response({"errors": errors}, status=400)
+        etag = None if rated else f'"books-{_INSTANCE_TAG}-{BookRepository.generation()}"'
+        if etag is not None and _etag_matches(_request_header(request, "If-None-Match"), etag):
+            return _not_modified_response(etag)
+        if delta:
+            return self._delta(since, fields, etag, rated)
+        if not paged:
+            serializer = BookSerializer(BookRepository.list_all(), many=True, fields=fields)
+            return _fragments_response(serializer, etag=etag, rated=rated)
+        books, next_cursor = BookRepository.list_page(after=after, limit=limit)
+        envelope = {"next_cursor": str(next_cursor) if next_cursor is not None else None}
+        serializer = BookSerializer(books, many=True, fields=fields)
+        return _fragments_response(serializer, etag=etag, envelope=envelope, rated=rated)
+
+    def _delta(self, since: datetime, fields: tuple | None, etag: str | None, rated: bool) -> Response:
+        books, deleted, complete = BookRepository.changed_since(since)
+        watermark = max(
+            [since, *(book.updated_at for book in books[-1:]), *(deleted_at for _, deleted_at in deleted)]
+        )
+        if not complete:
+            books, deleted = BookRepository.list_all(), []
+        envelope = {
+            "deleted": [
+                {"id": book_id, "deleted_at": deleted_at.isoformat()} for book_id, deleted_at in deleted
+            ],
+            "full_resync": not complete,
+            "next_updated_since": watermark.isoformat(),
+        }
+        serializer = BookSerializer(books, many=True, fields=fields)
+        return _fragments_response(serializer, etag=etag, envelope=envelope, rated=rated)
 
     def post(self, request: HttpRequest | None = None) -> Response:
         user, auth_error = _ensure_authenticated(request)
@@ -75,20 +169,148 @@ class BookListAPIView(APIView):
         return Response(BookSerializer(book).data(), status=201)
 
 
+class BookBulkAPIView(APIView):
+    """Create, update and delete books in batches with per-item results.
+
+    The body is ``{"create": [...], "update": [{"id": ..., ...}], "delete": [...]}``.
+    Every item is validated up front, then the valid ones are applied with a
+    single ``bulk_*`` repository call per operation. Each item of the response
+    carries its ``index`` in the request and an HTTP-like ``status``.
+    """
+
+    def post(self, request: HttpRequest | None = None) -> Response:
+        user, auth_error = _ensure_authenticated(request)
+        if auth_error:
+            return auth_error
+        try:
+            payload = _parse_json_body(request)
+        except ValueError:
+            return Response({"errors": {"non_field_errors": ["JSON inválido"]}}, status=400)
+        if not isinstance(payload, dict):
+            return Response({"errors": {"non_field_errors": ["Debe ser un objeto."]}}, status=400)
+        batches: Dict[str, list] = {}
+        errors: Dict[str, list] = {}
+        for operation in ("create", "update", "delete"):
+            items = payload.get(operation, [])
+            if not isinstance(items, list):
+                errors[operation] = ["Debe ser una lista."]
+            batches[operation] = items if isinstance(items, list) else []
+        if sum(len(items) for items in batches.values()) > BOOKS_BULK_MAX_ITEMS:
+            errors["non_field_errors"] = [f"Máximo {BOOKS_BULK_MAX_ITEMS} elementos por lote."]
+        if errors:
+            return Response({"errors": errors}, status=400)
+        results = {
+            "create": _bulk_create(batches["create"], getattr(user, "username", None)),
+            "update": _bulk_update(batches["update"]),
+            "delete": _bulk_delete(batches["delete"]),
+        }
+        return Response(results, status=200)
+
+
+class BookSearchAPIView(APIView):
+    """Full-text search over book titles and authors."""
+
+    def get(self, request: Any | None = None) -> Response:
+        params = _query_params(request)
+        query = (params.get("q") or "").strip()
+        errors: Dict[str, list] = {}
+        if not query:
+            errors["q"] = ["Este campo es obligatorio."]
+        limit = _parse_limit(params.get("limit"), errors)
+        if errors:
+            return Response({"errors": errors}, status=400)
+        books = BookRepository.search(query, limit=limit)
+        payload = {"query": query, "results": BookSerializer(books, many=True).data()}
+        return Response(payload, status=200)
+
+
+class BookChangesAPIView(APIView):
+    """Incremental feed of catalogue changes after the sequence ``since``.
+
+    Each change carries its ``seq``, ``op`` (``put``, ``delete`` or ``reset``)
+    and ``book_id``; ``put`` changes embed the current state of the book, so
+    several edits of one book between polls all show its latest version.
+    Clients poll again with ``since=next_since``. When the feed no longer
+    holds every change after ``since``, or ``since`` is ahead of it because the
+    server restarted, the answer is 410 and the client has to reload the
+    catalogue and continue from ``latest_seq``.
+    """
+
+    def get(self, request: Any | None = None) -> Response:
+        params = _query_params(request)
+        errors: Dict[str, list] = {}
+        since = _parse_cursor(params.get("since"), errors, field="since") or 0
+        limit = _parse_limit(params.get("limit"), errors)
+        if errors:
+            return Response({"errors": errors}, status=400)
+        try:
+            changes, latest = BookRepository.changes_since(since, limit=limit)
+        except ChangeFeedExpired as exc:
+            payload = {
+                "detail": "Los cambios solicitados ya no están disponibles",
+                "oldest_seq": exc.oldest_seq,
+                "latest_seq": BookRepository.latest_change_seq(),
+            }
+            return Response(payload, status=410)
+        results = []
+        for change in changes:
+            item: Dict[str, Any] = {"seq": change.seq, "op": change.op, "book_id": change.book_id}
+            if change.op == CHANGE_PUT:
+                try:
+                    item["book"] = BookSerializer(BookRepository.get(change.book_id)).data()
+                except LookupError:
+                    item["book"] = None
+            results.append(item)
+        payload = {
+            "changes": results,
+            "next_since": changes[-1].seq if changes else since,
+            "latest_seq": latest,
+        }
+        return Response(payload, status=200)
+
+
 class BookDetailAPIView(APIView):
-    """Return the serialized representation for a single book."""
+    """Return the serialized representation for a single book.
+
+    The ``ETag`` combines the book version with its rating summary, so
+    ``If-None-Match`` revalidations return 304 without building the body.
+    ``PUT``/``PATCH`` honour ``If-Match`` (comparing only the book version) and
+    answer 412 when the book changed since the client read it.
+
+    ``fields=`` selects a sparse fieldset among the book fields and the rating
+    summary; when no rating field is requested the rating (and its part of
+    the ``ETag``) is not computed at all.
+    """
+
+    rating_fields = ("average_rating", "reviews_count")
 
     def get(self, request: Any | None = None, *, book_id: int) -> Response:
+        errors: Dict[str, list] = {}
+        fields = _parse_fields(
+            _query_params(request).get("fields"), (*BookSerializer.fields, *self.rating_fields), errors
+        )
+        if errors:
+            return Response({"errors": errors}, status=400)
         try:
             book = BookRepository.get(book_id)
         except LookupError:
             return _book_not_found_response()
-        serializer = BookSerializer(book)
-        payload = serializer.data()
-        average, reviews_count = get_average_rating_for_book(book_id)
-        payload["average_rating"] = average
-        payload["reviews_count"] = reviews_count
-        return Response(payload, status=200)
+        if fields is None:
+            book_fields, rating_fields = None, self.rating_fields
+        else:
+            book_fields = tuple(field for field in fields if field in BookSerializer.fields)
+            rating_fields = tuple(field for field in fields if field in self.rating_fields)
+        etag = f'"{_book_version_tag(book)}"'
+        if rating_fields:
+            average, reviews_count = get_average_rating_for_book(book_id)
+            etag = f'"{_book_version_tag(book)}~r{reviews_count}~{average}"'
+        if _etag_matches(_request_header(request, "If-None-Match"), etag):
+            return _not_modified_response(etag)
+        payload = BookSerializer(book, fields=book_fields).data()
+        if rating_fields:
+            rating = {"average_rating": average, "reviews_count": reviews_count}
+            payload.update((field, rating[field]) for field in rating_fields)
+        return Response(payload, status=200, headers={"ETag": etag})
 
     def put(self, request: HttpRequest | None = None, *, book_id: int) -> Response:
         return self._update(request, book_id, partial=False)
@@ -111,9 +333,12 @@ class BookDetailAPIView(APIView):
         if auth_error:
             return auth_error
         try:
-            BookRepository.get(book_id)
+            current = BookRepository.get(book_id)
         except LookupError:
             return _book_not_found_response()
+        if_match = _request_header(request, "If-Match")
+        if if_match is not None and not _if_match_satisfied(if_match, current):
+            return _precondition_failed_response()
         try:
             payload = _parse_json_body(request)
         except ValueError:
@@ -121,18 +346,48 @@ class BookDetailAPIView(APIView):
         serializer = BookInputSerializer(payload, partial=partial)
         if not serializer.is_valid():
             return Response({"errors": serializer.errors}, status=400)
-        book = BookRepository.update(book_id, **serializer.validated_data)
-        return Response(BookSerializer(book).data(), status=200)
+        try:
+            book = BookRepository.update(
+                book_id,
+                expected_version=current.version if if_match is not None else None,
+                **serializer.validated_data,
+            )
+        except BookVersionConflict:
+            return _precondition_failed_response()
+        except LookupError:
+            return _book_not_found_response()
+        etag = f'"{_book_version_tag(book)}"'
+        return Response(BookSerializer(book).data(), status=200, headers={"ETag": etag})
 
 
 class BookReviewsAPIView(APIView):
-    """Gestiona el listado y creación de reseñas por libro."""
+    """Gestiona el listado y creación de reseñas por libro.
+
+    Sin parámetros se devuelven todas las reseñas, de la más reciente a la
+    más antigua. Con ``limit`` o ``before=<created_at>,<id>`` (el
+    ``next_cursor`` de la página anterior) la respuesta es una página
+    ``{"next_cursor": ..., "results": [...]}``. ``POST ?upsert=true``
+    sustituye la reseña previa del usuario para el libro (200) en lugar de
+    añadir otra (201).
+    """
 
     def get(self, request: Any | None = None, *, book_id: int) -> Response:
         if not _book_exists(book_id):
             return _book_not_found_response()
-        reviews = get_reviews_for_book(book_id)
-        return Response(reviews, status=200)
+        params = _query_params(request)
+        if "before" not in params and "limit" not in params:
+            return StreamingResponse(iter_reviews_for_book(book_id), status=200)
+        errors: Dict[str, list] = {}
+        before = _parse_review_cursor(params.get("before"), errors)
+        limit = _parse_limit(params.get("limit"), errors)
+        if errors:
+            return Response({"errors": errors}, status=400)
+        try:
+            reviews, next_cursor = get_reviews_page(book_id, before=before, limit=limit)
+        except ValueError:
+            return Response({"errors": {"before": ["Cursor inválido."]}}, status=400)
+        envelope = {"next_cursor": ",".join(next_cursor) if next_cursor is not None else None}
+        return StreamingResponse(reviews, status=200, envelope=envelope)
 
     def post(self, request: HttpRequest | None = None, *, book_id: int) -> Response:
         user, auth_error = _ensure_authenticated(request)
@@ -146,8 +401,9 @@ class BookReviewsAPIView(APIView):
             return Response({"errors": {"non_field_errors": ["JSON inválido"]}}, status=400)
         if "rating" not in payload:
             return Response({"errors": {"rating": ["Este campo es obligatorio."]}}, status=400)
+        upsert = str(_query_params(request).get("upsert", "")).lower() in ("1", "true")
         try:
-            review = create_review(
+            review, created = (upsert_review if upsert else _create_review)(
                 book_id=book_id,
                 user_id=getattr(user, "id", 0),
                 username=getattr(user, "username", None),
@@ -160,7 +416,87 @@ class BookReviewsAPIView(APIView):
         user_id = getattr(user, "id", 0)
         if user_id:
             task_sync_user_recommendations.delay(user_id)
-        return Response(review, status=201)
+        return Response(review, status=201 if created else 200)
+
+
+class UserReviewsAPIView(APIView):
+    """Reseñas del usuario autenticado, de la más reciente a la más antigua.
+
+    Siempre paginado: ``?before=<created_at>,<id>&limit=`` como en
+    :class:`BookReviewsAPIView`, resuelto con el índice ``user_id`` de la
+    colección.
+    """
+
+    def get(self, request: HttpRequest | None = None) -> Response:
+        user, auth_error = _ensure_authenticated(request)
+        if auth_error:
+            return auth_error
+        params = _query_params(request)
+        errors: Dict[str, list] = {}
+        before = _parse_review_cursor(params.get("before"), errors)
+        limit = _parse_limit(params.get("limit"), errors)
+        if errors:
+            return Response({"errors": errors}, status=400)
+        try:
+            reviews, next_cursor = get_reviews_by_user(getattr(user, "id", 0), before=before, limit=limit)
+        except ValueError:
+            return Response({"errors": {"before": ["Cursor inválido."]}}, status=400)
+        envelope = {"next_cursor": ",".join(next_cursor) if next_cursor is not None else None}
+        return StreamingResponse(reviews, status=200, envelope=envelope)
+
+
+class ReviewBulkAPIView(APIView):
+    """Ingesta masiva de reseñas (p. ej. migraciones), solo para staff.
+
+    El cuerpo es ``{"reviews": [{"book_id", "user_id", "rating", ...}]}``.
+    Las reseñas válidas se insertan con un único ``insert_many`` y se programa
+    una sola sincronización con Neo4j por libro y por usuario afectados. Cada
+    elemento de ``results`` lleva su ``index`` y un ``status`` tipo HTTP.
+    """
+
+    def post(self, request: HttpRequest | None = None) -> Response:
+        user, auth_error = _ensure_authenticated(request)
+        if auth_error:
+            return auth_error
+        if not getattr(user, "is_staff", False):
+            return Response({"detail": "Permiso denegado"}, status=403)
+        try:
+            payload = _parse_json_body(request)
+        except ValueError:
+            return Response({"errors": {"non_field_errors": ["JSON inválido"]}}, status=400)
+        items = payload.get("reviews") if isinstance(payload, dict) else None
+        if not isinstance(items, list):
+            return Response({"errors": {"reviews": ["Debe ser una lista."]}}, status=400)
+        if len(items) > REVIEWS_BULK_MAX_ITEMS:
+            return Response(
+                {"errors": {"non_field_errors": [f"Máximo {REVIEWS_BULK_MAX_ITEMS} elementos por lote."]}},
+                status=400,
+            )
+        results: list = [None] * len(items)
+        known_books: Dict[int, bool] = {}
+        candidates: list = []
+        for index, item in enumerate(items):
+            book_id = item.get("book_id") if isinstance(item, dict) else None
+            if isinstance(book_id, int) and not isinstance(book_id, bool):
+                if book_id not in known_books:
+                    known_books[book_id] = _book_exists(book_id)
+                if not known_books[book_id]:
+                    results[index] = {"index": index, "status": 404, "detail": "Libro no encontrado"}
+                    continue
+            candidates.append(index)
+        created, errors = create_reviews_bulk([items[index] for index in candidates])
+        for position, item_errors in errors.items():
+            index = candidates[position]
+            results[index] = _bulk_error(index, item_errors)
+        for position, review in created:
+            index = candidates[position]
+            results[index] = {"index": index, "status": 201, "review": review}
+        for book_id in dict.fromkeys(review["book_id"] for _, review in created):
+            task_sync_book_reviews_to_neo4j.delay(book_id)
+        for user_id in dict.fromkeys(review["user_id"] for _, review in created):
+            if user_id:
+                task_sync_user_recommendations.delay(user_id)
+        return Response({"results": results}, status=200)
 
 
 class BookRatingAPIView(APIView):
@@ -174,6 +510,44 @@ class BookRatingAPIView(APIView):
         return Response(payload, status=200)
 
 
+class BookRatingHistogramAPIView(APIView):
+    """Número de reseñas por valor de estrella, leído de los agregados incrementales."""
+
+    def get(self, request: Any | None = None, *, book_id: int) -> Response:
+        if not _book_exists(book_id):
+            return _book_not_found_response()
+        return Response(_histogram_payload(get_rating_aggregate(book_id)), status=200)
+
+
+class BooksRatingHistogramAPIView(APIView):
+    """Histogramas de varios libros (``?ids=1,2,3``) con una sola consulta.
+
+    ``results`` sigue el orden de ``ids``; los libros que no existen se
+    indican en ``not_found``.
+    """
+
+    def get(self, request: Any | None = None) -> Response:
+        raw = _query_params(request).get("ids") or ""
+        parts = [part.strip() for part in str(raw).split(",") if part.strip()]
+        errors: Dict[str, list] = {}
+        if not parts:
+            errors["ids"] = ["Este campo es obligatorio."]
+        elif not all(_is_ascii_int(part) for part in parts):
+            errors["ids"] = ["Debe ser una lista de números enteros."]
+        elif len(parts) > BOOKS_PAGE_MAX_LIMIT:
+            errors["ids"] = [f"Máximo {BOOKS_PAGE_MAX_LIMIT} libros por petición."]
+        if errors:
+            return Response({"errors": errors}, status=400)
+        book_ids = list(dict.fromkeys(int(part) for part in parts))
+        found = [book_id for book_id in book_ids if _book_exists(book_id)]
+        aggregates = get_rating_aggregates(found)
+        payload = {
+            "results": [_histogram_payload(aggregates[book_id]) for book_id in found],
+            "not_found": [book_id for book_id in book_ids if book_id not in aggregates],
+        }
+        return Response(payload, status=200)
+
+
 class RecommendationsAPIView(APIView):
     """Return recommended books for the authenticated user."""
 
@@ -185,6 +559,66 @@ class RecommendationsAPIView(APIView):
         return Response(recommendations, status=200)
 
 
+def _bulk_create(items: list, username: str | None) -> list:
+    results: list = [None] * len(items)
+    serializer = BookInputSerializer(items, many=True)
+    serializer.is_valid()
+    for index, errors in serializer.errors.items():
+        results[index] = _bulk_error(index, errors)
+    books = BookRepository.bulk_create(serializer.validated_data, created_by=username)
+    for index, book in zip(serializer.valid_indexes, books):
+        results[index] = {"index": index, "status": 201, "book": BookSerializer(book).data()}
+    return results
+
+
+def _bulk_update(items: list) -> list:
+    results: list = [None] * len(items)
+    candidates: list = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = _bulk_error(index, {"non_field_errors": ["Debe ser un objeto."]})
+            continue
+        book_id = item.get("id")
+        if not isinstance(book_id, int) or isinstance(book_id, bool):
+            results[index] = _bulk_error(index, {"id": ["Debe ser un número entero."]})
+            continue
+        candidates.append((index, book_id))
+    # "id" is not an input field, so the payloads can be validated as they are.
+    serializer = BookInputSerializer([items[index] for index, _ in candidates], partial=True, many=True)
+    serializer.is_valid()
+    for position, errors in serializer.errors.items():
+        index = candidates[position][0]
+        results[index] = _bulk_error(index, errors)
+    valid = [candidates[position] for position in serializer.valid_indexes]
+    books = BookRepository.bulk_update(
+        (book_id, data) for (_, book_id), data in zip(valid, serializer.validated_data)
+    )
+    for (index, book_id), book in zip(valid, books):
+        if book is None:
+            results[index] = {"index": index, "id": book_id, "status": 404, "detail": "Libro no encontrado"}
+        else:
+            results[index] = {"index": index, "status": 200, "book": BookSerializer(book).data()}
+    return results
+
+
+def _bulk_delete(items: list) -> list:
+    results: list = [None] * len(items)
+    valid: list = []
+    for index, book_id in enumerate(items):
+        if not isinstance(book_id, int) or isinstance(book_id, bool):
+            results[index] = _bulk_error(index, {"id": ["Debe ser un número entero."]})
+            continue
+        valid.append((index, book_id))
+    deleted = BookRepository.bulk_delete(book_id for _, book_id in valid)
+    for (index, book_id), existed in zip(valid, deleted):
+        results[index] = {"index": index, "id": book_id, "status": 204 if existed else 404}
+    return results
+
+
+def _bulk_error(index: int, errors: Dict[str, list]) -> Dict[str, Any]:
+    return {"index": index, "status": 400, "errors": errors}
+
+
 def _parse_json_body(request: HttpRequest | None) -> Dict[str, Any]:
     if request is None or getattr(request, "body", None) in (None, b"", ""):
         return {}
@@ -197,6 +631,198 @@ def _parse_json_body(request: HttpRequest | None) -> Dict[str, Any]:
         raise ValueError("Invalid JSON") from exc
 
 
+def _query_params(request: HttpRequest | None) -> Dict[str, str]:
+    return getattr(request, "GET", None) or {}
+
+
+def _parse_include(raw: str | None, allowed: tuple, errors: Dict[str, list]) -> tuple:
+    if raw is None:
+        return ()
+    requested = tuple(dict.fromkeys(name.strip() for name in str(raw).split(",") if name.strip()))
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        errors["include"] = [f"Valores no válidos: {', '.join(unknown)}."]
+        return ()
+    return requested
+
+
+def _parse_fields(
+    raw: str | None, allowed: tuple, errors: Dict[str, list]
+) -> tuple | None:
+    """Parse ``fields=a,b`` into a tuple of names, or ``None`` for every field."""
+
+    if raw is None:
+        return None
+    requested = tuple(dict.fromkeys(name.strip() for name in str(raw).split(",") if name.strip()))
+    unknown = [name for name in requested if name not in allowed]
+    if unknown or not requested:
+        errors["fields"] = [f"Campos no válidos: {', '.join(unknown)}." if unknown else "Debe indicar algún campo."]
+        return None
+    return requested
+
+
+def _is_ascii_int(raw: Any) -> bool:
+    """``str.isdigit`` also accepts characters such as ``²`` that ``int()`` rejects."""
+
+    text = str(raw)
+    return text.isascii() and text.isdigit()
+
+
+def _parse_cursor(raw: str | None, errors: Dict[str, list], *, field: str = "cursor") -> int | None:
+    if raw in (None, ""):
+        return None
+    if not _is_ascii_int(raw):
+        errors[field] = ["Cursor inválido."]
+        return None
+    return int(raw)
+
+
+def _histogram_payload(aggregate: RatingAggregate) -> Dict[str, Any]:
+    return {
+        "book_id": aggregate.book_id,
+        "average_rating": aggregate.average,
+        "num_reviews": aggregate.count,
+        "histogram": {str(rating): count for rating, count in zip(RATING_VALUES, aggregate.histogram)},
+    }
+
+
+def _create_review(**kwargs: Any) -> tuple[Dict[str, Any], bool]:
+    return create_review(**kwargs), True
+
+
+def _parse_review_cursor(raw: str | None, errors: Dict[str, list]) -> tuple[str, str] | None:
+    if raw in (None, ""):
+        return None
+    created_at, _, review_id = str(raw).rpartition(",")
+    timestamp = _parse_timestamp(created_at) if created_at else None
+    if timestamp is None or not review_id.strip():
+        errors["before"] = ["Cursor inválido."]
+        return None
+    # Stored timestamps are UTC strings compared as text.
+    return timestamp.astimezone(UTC).isoformat(), review_id.strip()
+
+
+def _parse_limit(raw: str | None, errors: Dict[str, list]) -> int:
+    if raw in (None, ""):
+        return BOOKS_PAGE_DEFAULT_LIMIT
+    if not _is_ascii_int(raw) or int(raw) < 1:
+        errors["limit"] = ["Debe ser un número entero positivo."]
+        return BOOKS_PAGE_DEFAULT_LIMIT
+    return min(int(raw), BOOKS_PAGE_MAX_LIMIT)
+
+
+def _parse_timestamp(raw: str) -> datetime | None:
+    """Parse an ISO 8601 timestamp; naive values are taken as UTC."""
+
+    text = str(raw).strip()
+    if "T" in text:
+        # A literal "+" in the offset arrives as a space when not URL-encoded.
+        text = text.replace(" ", "+")
+    try:
+        value = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    return value if value.tzinfo is not None else value.replace(tzinfo=UTC)
+
+
+def _request_header(request: HttpRequest | None, name: str) -> str | None:
+    headers = getattr(request, "headers", None) or {}
+    lowered = name.lower()
+    for key, value in headers.items():
+        if key.lower() == lowered:
+            return value
+    return None
+
+
+def _parse_etags(header: str, *, weak: bool = True) -> list[str]:
+    """Split an ETag list; with ``weak=False`` weak tags are dropped.
+
+    Tags of compressed variants (``"x-gzip"``) are reduced to the tag of the
+    representation they encode, so validators obtained either way match.
+    """
+
+    tags = []
+    for raw in header.split(","):
+        tag = raw.strip()
+        if tag.startswith("W/"):
+            if not weak:
+                continue
+            tag = tag[2:]
+        if tag:
+            tags.append(strip_encoding_suffix(tag))
+    return tags
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    """Weak comparison used by ``If-None-Match``."""
+
+    if not header:
+        return False
+    tags = _parse_etags(header)
+    return "*" in tags or etag in tags
+
+
+def _book_version_tag(book: Book) -> str:
+    return f"b{book.id}.{book.version}.{to_epoch_micros(book.updated_at)}"
+
+
+def _if_match_satisfied(header: str, book: Book) -> bool:
+    """Check ``If-Match`` against the book version, ignoring rating suffixes.
+
+    ``If-Match`` uses the strong comparison, so weak tags never match.
+    """
+
+    version_tag = _book_version_tag(book)
+    for tag in _parse_etags(header, weak=False):
+        if tag == "*" or tag.strip('"').split("~", 1)[0] == version_tag:
+            return True
+    return False
+
+
+def _fragments_response(
+    serializer: BookSerializer,
+    *,
+    etag: str | None,
+    envelope: Dict[str, Any] | None = None,
+    rated: bool = False,
+) -> StreamingResponse:
+    items: Iterator[Any] = serializer.iter_data()
+    fragments: Iterator[bytes] = serializer.iter_fragments(BookRepository.fragment_cache())
+    if rated:
+        books = serializer.instance
+        items = _with_ratings(books, items, lambda item, rating: {**item, **rating})
+        # '{"id":1}' + rating -> '{"id":1,"average_rating":...,"reviews_count":...}'
+        fragments = _with_ratings(
+            books, fragments, lambda fragment, rating: fragment[:-1] + b"," + json_dumps(rating)[1:]
+        )
+    return StreamingResponse(
+        items,
+        status=200,
+        envelope=envelope,
+        json_fragments=fragments,
+        headers={"ETag": etag} if etag is not None else None,
+    )
+
+
+def _with_ratings(books: Sequence[Book], encoded: Iterator[Any], attach: Callable[[Any, dict], Any]) -> Iterator[Any]:
+    """Attach each book's rating to its serialized form, one ratings query per batch."""
+
+    for start in range(0, len(books), BOOKS_RATINGS_BATCH_SIZE):
+        book_ids = [book.id for book in books[start : start + BOOKS_RATINGS_BATCH_SIZE]]
+        ratings = get_average_ratings_for_books(book_ids)
+        for book_id, item in zip(book_ids, encoded):
+            average, count = ratings[book_id]
+            yield attach(item, {"average_rating": average, "reviews_count": count})
+
+
+def _not_modified_response(etag: str) -> Response:
+    return Response(None, status=304, headers={"ETag": etag})
+
+
+def _precondition_failed_response() -> Response:
+    return Response({"detail": "El libro ha cambiado desde la última lectura"}, status=412)
+
+
 def _book_not_found_response() -> Response:
     return Response({"detail": "Libro no encontrado"}, status=404)
 
@@ -15,6 +15,14 @@ urlpatterns = [
         name="api-mongo-health",
     ),
     path("api/books/", api.BookListAPIView.as_view(), name="api-books-list"),
+    path("api/books/bulk/", api.BookBulkAPIView.as_view(), name="api-books-bulk"),
+    path("api/books/changes/", api.BookChangesAPIView.as_view(), name="api-books-changes"),
+    path("api/books/search/", api.BookSearchAPIView.as_view(), name="api-books-search"),
+    path(
+        "api/books/rating/histogram/",
+        api.BooksRatingHistogramAPIView.as_view(),
+        name="api-books-rating-histogram",
+    ),
     path(
         "api/books/<int:book_id>/",
         api.BookDetailAPIView.as_view(),
@@ -30,5 +38,12 @@ urlpatterns = [
         api.BookRatingAPIView.as_view(),
         name="api-books-rating",
     ),
+    path(
+        "api/books/<int:book_id>/rating/histogram/",
+        api.BookRatingHistogramAPIView.as_view(),
+        name="api-books-rating-histogram-detail",
+    ),
+    path("api/reviews/bulk/", api.ReviewBulkAPIView.as_view(), name="api-reviews-bulk"),
+    path("api/users/me/reviews/", api.UserReviewsAPIView.as_view(), name="api-users-me-reviews"),
     path("api/recommendations/", api.RecommendationsAPIView.as_view(), name="api-recommendations"),
 ]
@@ -0,0 +1,85 @@
+"""Bounded change feed of :class:`library.models.BookRepository` mutations."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Tuple
+
+CHANGE_PUT = "put"
+CHANGE_DELETE = "delete"
+CHANGE_RESET = "reset"
+
+
+@dataclass(frozen=True, slots=True)
+class BookChange:
+    """One mutation: ``put``/``delete`` of ``book_id`` or a catalogue ``reset``."""
+
+    seq: int
+    op: str
+    book_id: int | None = None
+
+
+class ChangeFeedExpired(LookupError):
+    """Raised when the changes after a sequence number cannot be served.
+
+    Either they are no longer held in the buffer, or the sequence number was
+    never issued by this feed (it restarts with the process, so a consumer
+    may hold a number from a previous run).
+    """
+
+    def __init__(self, since: int, oldest_seq: int) -> None:
+        super().__init__(f"Changes after {since} unavailable; oldest retained is {oldest_seq}")
+        self.since = since
+        self.oldest_seq = oldest_seq
+
+
+class ChangeFeed:
+    """Ring buffer keeping the latest ``capacity`` changes.
+
+    Sequence numbers start after ``start_seq`` and grow by one per recorded change, so the
+    change with a given ``seq`` sits at a fixed slot and :meth:`since` is a
+    constant-time seek followed by a copy of the requested slice. Sequence
+    numbers keep growing across repository resets; a reset is recorded as a
+    change of its own that tells consumers to resynchronise from scratch.
+    """
+
+    def __init__(self, capacity: int = 10_000, *, start_seq: int = 0) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._slots: List[BookChange | None] = [None] * capacity
+        self._latest = start_seq
+        self._first = start_seq + 1
+
+    @property
+    def latest_seq(self) -> int:
+        """Sequence number of the last recorded change (``0`` if none)."""
+
+        return self._latest
+
+    @property
+    def oldest_seq(self) -> int:
+        """Sequence number of the oldest change still in the buffer."""
+
+        return max(self._first, self._latest - self.capacity + 1)
+
+    def record(self, op: str, book_id: int | None = None) -> BookChange:
+        self._latest += 1
+        change = BookChange(self._latest, op, book_id)
+        self._slots[self._latest % self.capacity] = change
+        return change
+
+    def since(self, seq: int, *, limit: int | None = None) -> Tuple[List[BookChange], int]:
+        """Return the changes after ``seq`` and the latest sequence number.
+
+        Raises :class:`ChangeFeedExpired` when some change after ``seq`` was
+        already overwritten, since returning the rest would silently lose it,
+        and when ``seq`` is ahead of :attr:`latest_seq`, since the consumer's
+        position then belongs to another run of the feed.
+        """
+
+        latest = self._latest
+        if seq < self.oldest_seq - 1 or seq > latest:
+            raise ChangeFeedExpired(seq, self.oldest_seq)
+        end = latest if limit is None else min(latest, seq + limit)
+        slots = self._slots
+        return [slots[number % self.capacity] for number in range(seq + 1, end + 1)], latest
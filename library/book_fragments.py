@@ -0,0 +1,61 @@
+"""Cache of pre-encoded JSON fragments for individual books."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable, Tuple
+
+Stamp = Tuple[int, datetime]
+
+
+class FragmentCache:
+    """Encoded JSON of single books, keyed by id and then by field set.
+
+    Each entry remembers the ``(version, updated_at)`` stamp of the book it
+    was rendered from and is only returned for that same stamp, so a stale
+    fragment is never served, even when it was stored by a request that raced
+    with an update or with a reset that reused the id. The repository still
+    discards the fragments of every book it updates or deletes (and everything
+    on ``reset``/``replace_all``) so memory is not spent on dead entries.
+
+    By default the cache is unbounded: the repository drops the entries of
+    deleted books, so it never holds more books than the catalogue. With a
+    ``maxsize`` the cache stops admitting new books once full instead of
+    evicting, because full listings walk the catalogue in the same order and
+    any eviction order would throw away exactly the fragments the next
+    listing needs; the books already cached keep hitting. Every operation is
+    a single dict update, which keeps the cache safe to share between threads
+    without a lock.
+    """
+
+    def __init__(self, maxsize: int | None = None) -> None:
+        self.maxsize = maxsize
+        self._books: Dict[int, Dict[Tuple[str, ...], Tuple[Stamp, bytes]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+    def get(self, book_id: int, stamp: Stamp, fields: Tuple[str, ...]) -> bytes | None:
+        entry = self._books.get(book_id, {}).get(fields)
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def put(self, book_id: int, stamp: Stamp, fields: Tuple[str, ...], fragment: bytes) -> None:
+        variants = self._books.get(book_id)
+        if variants is None:
+            if self.maxsize is not None and len(self._books) >= self.maxsize:
+                return
+            variants = self._books.setdefault(book_id, {})
+        variants[fields] = (stamp, fragment)
+
+    def discard(self, book_ids: Iterable[int]) -> None:
+        for book_id in book_ids:
+            self._books.pop(book_id, None)
+
+    def clear(self) -> None:
+        self._books.clear()
+        self.hits = self.misses = 0
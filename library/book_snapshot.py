@@ -0,0 +1,149 @@
+"""Compact binary snapshots of the book catalogue, read through ``mmap``.
+
+Layout (little-endian)::
+
+    header   magic (8 bytes) | row count (u64) | next id (u64)
+    numeric  ids | version | published_year | created_at | updated_at
+             (n x i64 each; ``BOOKSNP1`` files have no version column)
+    strings  title | author | isbn | created_by, each stored as
+             null flags (n bytes) | offsets ((n + 1) x u64) | UTF-8 blob
+
+Numeric columns are copied straight into ``array`` objects and strings are
+decoded from slices of the mapped buffer, so loading needs no parsing. Derived
+indexes are not stored; ``BookRepository.load_snapshot`` rebuilds them.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import TYPE_CHECKING, Iterable, List, Tuple
+
+from .book_storage import from_epoch_micros, to_epoch_micros
+
+if TYPE_CHECKING:  # pragma: no cover - import only used for annotations
+    from .models import Book
+
+MAGIC = b"BOOKSNP2"
+_NUMERIC_COLUMNS = {b"BOOKSNP1": 4, MAGIC: 5}
+_HEADER = struct.Struct("<8sQQ")
+_NULL_INT = -(2**63)
+_STRING_FIELDS = ("title", "author", "isbn", "created_by")
+_SWAP_BYTES = sys.byteorder == "big"
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot file is truncated or has an unknown format."""
+
+
+def _to_bytes(column: array) -> bytes:
+    if _SWAP_BYTES:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _from_bytes(typecode: str, data: memoryview) -> array:
+    column = array(typecode)
+    column.frombytes(data)
+    if _SWAP_BYTES:
+        column.byteswap()
+    return column
+
+
+def write_snapshot(path: str | os.PathLike[str], books: Iterable[Book], next_id: int) -> int:
+    """Write ``books`` to ``path`` atomically and return the number of rows."""
+
+    rows = sorted(books, key=lambda book: book.id)
+    ids = array("q", (book.id for book in rows))
+    versions = array("q", (book.version for book in rows))
+    years = array("q", (_NULL_INT if book.published_year is None else book.published_year for book in rows))
+    created_at = array("q", (to_epoch_micros(book.created_at) for book in rows))
+    updated_at = array("q", (to_epoch_micros(book.updated_at) for book in rows))
+    temporary = f"{os.fspath(path)}.tmp"
+    with open(temporary, "wb") as handle:
+        handle.write(_HEADER.pack(MAGIC, len(rows), next_id))
+        for column in (ids, versions, years, created_at, updated_at):
+            handle.write(_to_bytes(column))
+        for field in _STRING_FIELDS:
+            values = [getattr(book, field) for book in rows]
+            encoded = [b"" if value is None else value.encode("utf-8") for value in values]
+            offsets = array("Q", [0])
+            for chunk in encoded:
+                offsets.append(offsets[-1] + len(chunk))
+            handle.write(bytes(value is None for value in values))
+            handle.write(_to_bytes(offsets))
+            handle.write(b"".join(encoded))
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temporary, path)
+    return len(rows)
+
+
+def read_snapshot(path: str | os.PathLike[str], book_cls: type[Book]) -> Tuple[List[Book], int]:
+    """Return the books stored in ``path`` and the saved ``next_id``."""
+
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size < _HEADER.size:
+            raise SnapshotError("Snapshot truncado")
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return _decode(view, book_cls)
+            except SnapshotError as exc:
+                # Re-raised outside the map: the traceback pins slices of it.
+                message = str(exc)
+            finally:
+                view.release()
+    raise SnapshotError(message)
+
+
+def _decode(view: memoryview, book_cls: type[Book]) -> Tuple[List[Book], int]:
+    magic, count, next_id = _HEADER.unpack_from(view)
+    if magic not in _NUMERIC_COLUMNS:
+        raise SnapshotError("Formato de snapshot desconocido")
+    position = _HEADER.size
+    numeric: List[array] = []
+    for _ in range(_NUMERIC_COLUMNS[magic]):
+        numeric.append(_from_bytes("q", _take(view, position, 8 * count)))
+        position += 8 * count
+    strings: List[List[str | None]] = []
+    for _ in _STRING_FIELDS:
+        nulls = _take(view, position, count)
+        position += count
+        offsets = _from_bytes("Q", _take(view, position, 8 * (count + 1)))
+        position += 8 * (count + 1)
+        blob = _take(view, position, offsets[-1])
+        position += offsets[-1]
+        strings.append(
+            [
+                None if nulls[row] else str(blob[offsets[row] : offsets[row + 1]], "utf-8")
+                for row in range(count)
+            ]
+        )
+    if len(numeric) == 4:
+        numeric.insert(1, array("q", [1]) * count)
+    ids, versions, years, created_at, updated_at = numeric
+    titles, authors, isbns, creators = strings
+    books: List[Book] = []
+    for row in range(count):
+        book = book_cls.__new__(book_cls)
+        book.id = ids[row]
+        book.version = versions[row]
+        book.title = titles[row]
+        book.author = authors[row]
+        book.published_year = None if years[row] == _NULL_INT else years[row]
+        book.isbn = isbns[row]
+        book.created_by = creators[row]
+        book.created_at = from_epoch_micros(created_at[row])
+        book.updated_at = from_epoch_micros(updated_at[row])
+        books.append(book)
+    return books, next_id
+
+
+def _take(view: memoryview, position: int, size: int) -> memoryview:
+    if position + size > len(view):
+        raise SnapshotError("Snapshot truncado")
+    return view[position : position + size]
@@ -0,0 +1,376 @@
+"""Compact columnar storage backend for :class:`library.models.BookRepository`."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import MutableMapping
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover - import only used for annotations
+    from .models import Book
+
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+_NULL_INT = -(2**63)
+_NULL_LENGTH = 0xFFFFFFFF
+
+
+def to_epoch_micros(value: datetime) -> int:
+    """Convert an aware ``datetime`` to integer microseconds since the epoch."""
+
+    return (value - EPOCH) // _ONE_MICROSECOND
+
+
+def from_epoch_micros(value: int) -> datetime:
+    """Inverse of :func:`to_epoch_micros`, returning an aware UTC ``datetime``."""
+
+    return EPOCH + timedelta(microseconds=value)
+
+
+class SortedPairs:
+    """Sorted ``(key, id)`` integer pairs kept in two parallel ``array('q')`` columns.
+
+    Used by the repository for its range indexes (publication year,
+    ``updated_at`` and tombstones): 16 bytes per entry instead of a tuple and
+    two ``int`` objects. Pairs are ordered by key and then by id.
+    """
+
+    def __init__(self, pairs: Iterable[Tuple[int, int]] = ()) -> None:
+        ordered = sorted(pairs)
+        self._keys = array("q", (key for key, _ in ordered))
+        self._ids = array("q", (item_id for _, item_id in ordered))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return zip(self._keys, self._ids)
+
+    def _position(self, key: int, item_id: int) -> int:
+        low = bisect_left(self._keys, key)
+        high = bisect_right(self._keys, key, low)
+        return bisect_left(self._ids, item_id, low, high)
+
+    def add(self, key: int, item_id: int) -> None:
+        position = self._position(key, item_id)
+        self._keys.insert(position, key)
+        self._ids.insert(position, item_id)
+
+    def extend(self, pairs: Iterable[Tuple[int, int]]) -> None:
+        """Add several pairs, re-sorting once (cheaper than one ``add`` each)."""
+
+        merged = sorted([*self, *pairs])
+        self._keys = array("q", (key for key, _ in merged))
+        self._ids = array("q", (item_id for _, item_id in merged))
+
+    def remove(self, key: int, item_id: int) -> None:
+        position = self._position(key, item_id)
+        if position < len(self._keys) and self._keys[position] == key and self._ids[position] == item_id:
+            del self._keys[position]
+            del self._ids[position]
+
+    def ids_between(self, low: int | None = None, high: int | None = None) -> List[int]:
+        """Ids whose key lies in ``[low, high]`` (either bound may be open)."""
+
+        start = 0 if low is None else bisect_left(self._keys, low)
+        end = len(self._keys) if high is None else bisect_right(self._keys, high)
+        return self._ids[start:end].tolist()
+
+    def items_from(self, low: int) -> List[Tuple[int, int]]:
+        """``(key, id)`` pairs whose key is at least ``low``."""
+
+        start = bisect_left(self._keys, low)
+        return list(zip(self._keys[start:], self._ids[start:]))
+
+    def drop_first(self, count: int) -> int:
+        """Remove the ``count`` smallest pairs and return the largest key removed."""
+
+        last = self._keys[count - 1]
+        del self._keys[:count]
+        del self._ids[:count]
+        return last
+
+    def nbytes(self) -> int:
+        return self._keys.itemsize * (len(self._keys) + len(self._ids))
+
+
+class _StringPool:
+    """Deduplicated strings referenced by integer handles (``0`` is ``None``).
+
+    Meant for low-cardinality columns such as authors. Handles are never
+    reclaimed, so memory grows with the number of distinct values ever seen.
+    """
+
+    def __init__(self) -> None:
+        self._values: List[str | None] = [None]
+        self._handles: Dict[str, int] = {}
+
+    def handle(self, value: str | None) -> int:
+        if value is None:
+            return 0
+        handle = self._handles.get(value)
+        if handle is None:
+            handle = self._handles[value] = len(self._values)
+            self._values.append(value)
+        return handle
+
+    def value(self, handle: int) -> str | None:
+        return self._values[handle]
+
+
+class _StringColumn:
+    """High-cardinality strings packed into one UTF-8 buffer plus offsets.
+
+    Overwriting a row with an equal value is a no-op; any other overwrite
+    leaves the old bytes behind as garbage, and the buffer is rewritten once
+    garbage makes up more than half of it.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._offsets = array("Q")
+        self._lengths = array("I")
+        self._garbage = 0
+
+    def _encode(self, value: str | None) -> tuple[int, int]:
+        if value is None:
+            return 0, _NULL_LENGTH
+        encoded = value.encode("utf-8")
+        offset = len(self._buffer)
+        self._buffer += encoded
+        return offset, len(encoded)
+
+    def append(self, value: str | None) -> None:
+        offset, length = self._encode(value)
+        self._offsets.append(offset)
+        self._lengths.append(length)
+
+    def extend(self, values: Iterable[str | None]) -> None:
+        for value in values:
+            if value is None:
+                self._offsets.append(0)
+                self._lengths.append(_NULL_LENGTH)
+                continue
+            encoded = value.encode("utf-8")
+            self._offsets.append(len(self._buffer))
+            self._lengths.append(len(encoded))
+            self._buffer += encoded
+
+    def insert(self, row: int, value: str | None) -> None:
+        offset, length = self._encode(value)
+        self._offsets.insert(row, offset)
+        self._lengths.insert(row, length)
+
+    def set(self, row: int, value: str | None) -> None:
+        length = self._lengths[row]
+        if length != _NULL_LENGTH:
+            offset = self._offsets[row]
+            if value is not None and self._buffer[offset : offset + length] == value.encode("utf-8"):
+                return
+            self._garbage += length
+        elif value is None:
+            return
+        self._offsets[row], self._lengths[row] = self._encode(value)
+        if self._garbage * 2 > len(self._buffer):
+            self._compact()
+
+    def get(self, row: int) -> str | None:
+        length = self._lengths[row]
+        if length == _NULL_LENGTH:
+            return None
+        offset = self._offsets[row]
+        return self._buffer[offset : offset + length].decode("utf-8")
+
+    def _compact(self) -> None:
+        source = memoryview(self._buffer)
+        buffer = bytearray()
+        for row, length in enumerate(self._lengths):
+            if length == _NULL_LENGTH:
+                continue
+            offset = self._offsets[row]
+            self._offsets[row] = len(buffer)
+            buffer += source[offset : offset + length]
+        source.release()
+        self._buffer = buffer
+        self._garbage = 0
+
+    def nbytes(self) -> int:
+        return (
+            len(self._buffer)
+            + self._offsets.itemsize * len(self._offsets)
+            + self._lengths.itemsize * len(self._lengths)
+        )
+
+
+class ColumnarBookStore(MutableMapping):
+    """Mapping of ``id -> Book`` that keeps every field in typed columns.
+
+    Ids, versions, publication years and timestamps (as epoch microseconds)
+    live in ``array('q')`` columns; titles and ISBNs are packed in UTF-8
+    buffers and authors/creators are pooled. Rows are sorted by id so lookups are binary
+    searches, deletions only flip a liveness flag until more than half of the
+    rows are dead and the columns are compacted.
+
+    ``Book`` objects are materialised on every access, so mutating a returned
+    instance has no effect until it is stored again (which is exactly what
+    ``BookRepository.update`` does).
+    """
+
+    def __init__(self, book_cls: type[Book], books: Iterable[Book] = ()) -> None:
+        self._book_cls = book_cls
+        self._init_columns()
+        self._extend(books)
+
+    def _init_columns(self) -> None:
+        self._ids = array("q")
+        self._live = bytearray()
+        self._versions = array("q")
+        self._years = array("q")
+        self._created_at = array("q")
+        self._updated_at = array("q")
+        self._titles = _StringColumn()
+        self._isbns = _StringColumn()
+        self._authors = array("I")
+        self._creators = array("I")
+        self._pool = _StringPool()
+        self._size = 0
+
+    def _row(self, book_id: int) -> int:
+        row = bisect_left(self._ids, book_id)
+        if row < len(self._ids) and self._ids[row] == book_id:
+            return row
+        return -1
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, book_id: object) -> bool:
+        if not isinstance(book_id, int):
+            return False
+        row = self._row(book_id)
+        return row >= 0 and bool(self._live[row])
+
+    def __iter__(self) -> Iterator[int]:
+        live = self._live
+        return (book_id for row, book_id in enumerate(self._ids) if live[row])
+
+    def __getitem__(self, book_id: int) -> Book:
+        row = self._row(book_id)
+        if row < 0 or not self._live[row]:
+            raise KeyError(book_id)
+        return self._materialize(row)
+
+    def __setitem__(self, book_id: int, book: Book) -> None:
+        row = self._row(book_id)
+        if row < 0:
+            self._insert(book_id, book)
+            return
+        if not self._live[row]:
+            self._live[row] = 1
+            self._size += 1
+        self._versions[row] = book.version
+        self._years[row] = _NULL_INT if book.published_year is None else book.published_year
+        self._created_at[row] = to_epoch_micros(book.created_at)
+        self._updated_at[row] = to_epoch_micros(book.updated_at)
+        self._titles.set(row, book.title)
+        self._isbns.set(row, book.isbn)
+        self._authors[row] = self._pool.handle(book.author)
+        self._creators[row] = self._pool.handle(book.created_by)
+
+    def __delitem__(self, book_id: int) -> None:
+        row = self._row(book_id)
+        if row < 0 or not self._live[row]:
+            raise KeyError(book_id)
+        self._live[row] = 0
+        self._size -= 1
+        if self._size * 2 < len(self._ids):
+            self._compact()
+
+    def values(self) -> Iterator[Book]:  # type: ignore[override]
+        live = self._live
+        return (self._materialize(row) for row in range(len(self._ids)) if live[row])
+
+    def nbytes(self) -> int:
+        """Approximate bytes held by the columns (excluding the string pool)."""
+
+        numeric = (
+            self._ids,
+            self._versions,
+            self._years,
+            self._created_at,
+            self._updated_at,
+            self._authors,
+            self._creators,
+        )
+        return (
+            sum(column.itemsize * len(column) for column in numeric)
+            + len(self._live)
+            + self._titles.nbytes()
+            + self._isbns.nbytes()
+        )
+
+    def _insert(self, book_id: int, book: Book) -> None:
+        year = _NULL_INT if book.published_year is None else book.published_year
+        values = (
+            (self._ids, book_id),
+            (self._versions, book.version),
+            (self._years, year),
+            (self._created_at, to_epoch_micros(book.created_at)),
+            (self._updated_at, to_epoch_micros(book.updated_at)),
+            (self._authors, self._pool.handle(book.author)),
+            (self._creators, self._pool.handle(book.created_by)),
+        )
+        if not self._ids or book_id > self._ids[-1]:
+            for column, value in values:
+                column.append(value)
+            self._live.append(1)
+            self._titles.append(book.title)
+            self._isbns.append(book.isbn)
+        else:
+            row = bisect_left(self._ids, book_id)
+            for column, value in values:
+                column.insert(row, value)
+            self._live.insert(row, 1)
+            self._titles.insert(row, book.title)
+            self._isbns.insert(row, book.isbn)
+        self._size += 1
+
+    def _extend(self, books: Iterable[Book]) -> None:
+        """Fill empty columns in one pass per column instead of one insert per row."""
+
+        latest = {book.id: book for book in books}
+        rows = [latest[book_id] for book_id in sorted(latest)]
+        handle = self._pool.handle
+        self._ids = array("q", (book.id for book in rows))
+        self._live = bytearray(b"\x01") * len(rows)
+        self._versions = array("q", (book.version for book in rows))
+        self._years = array(
+            "q", (_NULL_INT if book.published_year is None else book.published_year for book in rows)
+        )
+        self._created_at = array("q", (to_epoch_micros(book.created_at) for book in rows))
+        self._updated_at = array("q", (to_epoch_micros(book.updated_at) for book in rows))
+        self._titles.extend(book.title for book in rows)
+        self._isbns.extend(book.isbn for book in rows)
+        self._authors = array("I", (handle(book.author) for book in rows))
+        self._creators = array("I", (handle(book.created_by) for book in rows))
+        self._size = len(rows)
+
+    def _materialize(self, row: int) -> Book:
+        book = self._book_cls.__new__(self._book_cls)
+        book.id = self._ids[row]
+        book.version = self._versions[row]
+        book.title = self._titles.get(row)
+        book.author = self._pool.value(self._authors[row])
+        year = self._years[row]
+        book.published_year = None if year == _NULL_INT else year
+        book.isbn = self._isbns.get(row)
+        book.created_by = self._pool.value(self._creators[row])
+        book.created_at = from_epoch_micros(self._created_at[row])
+        book.updated_at = from_epoch_micros(self._updated_at[row])
+        return book
+
+    def _compact(self) -> None:
+        books = list(self.values())
+        self._init_columns()
+        self._extend(books)
@@ -0,0 +1,273 @@
+"""Append-only write-ahead log for :class:`library.models.BookRepository`.
+
+Each entry is framed as ``length (u32) | crc32 (u32) | JSON payload``.
+Appends are queued and written with a single ``fsync`` per group. A writer
+that needs durability passes the ticket returned by ``append_many`` to
+``wait``: the first waiter to find the disk idle flushes everything queued so
+far, and writers that queue entries during that ``fsync`` are committed
+together by the next one. Entries nobody waits for are flushed once
+``batch_size`` of them are pending or ``max_delay`` seconds after the first
+one, whichever comes first. A torn or corrupt tail
+(for example after a crash mid-write) ends the replay and is truncated when
+the log is reopened.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List
+
+from .book_storage import from_epoch_micros, to_epoch_micros
+
+if TYPE_CHECKING:  # pragma: no cover - import only used for annotations
+    from .models import Book
+
+logger = logging.getLogger(__name__)
+
+_FRAME = struct.Struct("<II")
+COMPACTING_SUFFIX = ".compacting"
+
+
+def encode_book(book: Book) -> Dict[str, Any]:
+    """Return a JSON-friendly record with every stored field of ``book``."""
+
+    return {
+        "id": book.id,
+        "version": book.version,
+        "title": book.title,
+        "author": book.author,
+        "published_year": book.published_year,
+        "isbn": book.isbn,
+        "created_by": book.created_by,
+        "created_at": to_epoch_micros(book.created_at),
+        "updated_at": to_epoch_micros(book.updated_at),
+    }
+
+
+def decode_book(record: Dict[str, Any], book_cls: type[Book]) -> Book:
+    """Inverse of :func:`encode_book`."""
+
+    book = book_cls.__new__(book_cls)
+    for field in ("id", "title", "author", "published_year", "isbn", "created_by"):
+        setattr(book, field, record.get(field))
+    book.version = record.get("version", 1)
+    book.created_at = from_epoch_micros(record["created_at"])
+    book.updated_at = from_epoch_micros(record["updated_at"])
+    return book
+
+
+def read_entries(path: str | os.PathLike[str]) -> Iterator[Dict[str, Any]]:
+    """Yield the valid entries stored in ``path``, stopping at a torn tail."""
+
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as handle:
+        data = handle.read()
+    for payload, _ in _frames(data):
+        yield json.loads(payload)
+
+
+def _frames(data: bytes) -> Iterator[tuple[bytes, int]]:
+    """Yield ``(payload, end_offset)`` for every intact frame in ``data``."""
+
+    position = 0
+    while position + _FRAME.size <= len(data):
+        length, checksum = _FRAME.unpack_from(data, position)
+        start = position + _FRAME.size
+        payload = data[start : start + length]
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            return
+        position = start + length
+        yield payload, position
+
+
+def _frame(entry: Dict[str, Any]) -> bytes:
+    payload = json.dumps(entry, separators=(",", ":")).encode("utf-8")
+    return _FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+class WriteAheadLog:
+    """Buffered, group-committed log of repository mutations."""
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        batch_size: int = 64,
+        max_delay: float = 0.05,
+    ) -> None:
+        self.path = os.fspath(path)
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition(self._lock)
+        self._pending: List[bytes] = []
+        self._first_pending_at = 0.0
+        self._queued = 0
+        self._durable = 0
+        self._flushing = False
+        self._truncate_torn_tail()
+        self._handle = open(self.path, "ab")
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="book-wal-flusher", daemon=True)
+        self._flusher.start()
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        self.append_many((entry,))
+
+    def append_many(self, entries: Iterable[Dict[str, Any]]) -> int:
+        """Queue ``entries`` as one group and return the ticket for :meth:`wait`."""
+
+        frames = [_frame(entry) for entry in entries]
+        with self._lock:
+            if not frames:
+                return self._queued
+            if not self._pending:
+                self._first_pending_at = time.monotonic()
+            self._pending.extend(frames)
+            self._queued += len(frames)
+            ticket = self._queued
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+            return ticket
+
+    def wait(self, ticket: int) -> None:
+        """Block until every entry up to ``ticket`` has been written and fsynced."""
+
+        with self._lock:
+            while self._durable < ticket:
+                if self._flushing:
+                    self._flushed.wait()
+                else:
+                    self._flush_locked()
+
+    def flush(self) -> None:
+        """Write and ``fsync`` every pending entry."""
+
+        with self._lock:
+            self._flush_locked()
+
+    def size(self) -> int:
+        """Bytes currently stored in the active log file (pending excluded)."""
+
+        with self._lock:
+            while self._flushing:
+                self._flushed.wait()
+            return self._handle.tell()
+
+    def rotate(self) -> str:
+        """Move the active log aside for compaction and start an empty one.
+
+        Returns the path of the rotated file. A rotated file left behind by an
+        interrupted compaction is kept and the active log appended to it, so
+        entries are never reordered.
+        """
+
+        rotated = self.path + COMPACTING_SUFFIX
+        with self._lock:
+            self._flush_locked()
+            self._handle.close()
+            if os.path.exists(rotated):
+                with open(self.path, "rb") as source, open(rotated, "ab") as target:
+                    target.write(source.read())
+                    target.flush()
+                    os.fsync(target.fileno())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, rotated)
+            self._handle = open(self.path, "ab")
+        return rotated
+
+    def close(self) -> None:
+        self._closed.set()
+        self._flusher.join()
+        with self._lock:
+            self._flush_locked()
+            self._handle.close()
+
+    def _flush_locked(self) -> None:
+        """Write and fsync the pending group; the lock is released meanwhile.
+
+        Only one flush runs at a time, so groups reach the file in order, and
+        writers can keep queueing the next group during the ``fsync``. A failed
+        write puts the group back at the head of the queue and re-raises.
+        """
+
+        while self._flushing:
+            self._flushed.wait()
+        if not self._pending:
+            return
+        data, upto = b"".join(self._pending), self._queued
+        self._pending = []
+        self._flushing = True
+        self._lock.release()
+        written = False
+        try:
+            self._handle.write(data)
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+            written = True
+        finally:
+            self._lock.acquire()
+            self._flushing = False
+            self._flushed.notify_all()
+            if not written:
+                self._pending.insert(0, data)
+        self._durable = upto
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(self.max_delay):
+            with self._lock:
+                if self._pending and time.monotonic() - self._first_pending_at >= self.max_delay:
+                    self._flush_locked()
+
+    def _truncate_torn_tail(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as handle:
+            data = handle.read()
+        valid = 0
+        for _, end in _frames(data):
+            valid = end
+        if valid < len(data):
+            with open(self.path, "r+b") as handle:
+                handle.truncate(valid)
+
+
+class CompactionThread(threading.Thread):
+    """Periodically call ``compact`` once the log grows beyond ``min_bytes``.
+
+    A failed compaction is logged and retried on the next interval.
+    """
+
+    def __init__(
+        self,
+        wal: WriteAheadLog,
+        compact: Callable[[], Any],
+        *,
+        interval: float = 60.0,
+        min_bytes: int = 1 << 20,
+    ) -> None:
+        super().__init__(name="book-wal-compaction", daemon=True)
+        self._wal = wal
+        self._compact = compact
+        self._interval = interval
+        self._min_bytes = min_bytes
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self._interval):
+            try:
+                if self._wal.size() >= self._min_bytes:
+                    self._compact()
+            except Exception:
+                logger.exception("La compactación del WAL ha fallado; se reintentará")
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
@@ -0,0 +1,112 @@
+"""Locking primitives shared by the in-memory repositories."""
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Iterator
+
+_NO_LOCK = nullcontext()
+
+
+class NullLock:
+    """Lock with the :class:`ReadWriteLock` interface that never blocks."""
+
+    def read(self) -> ContextManager[None]:
+        return _NO_LOCK
+
+    def write(self) -> ContextManager[None]:
+        return _NO_LOCK
+
+
+class ReadWriteLock:
+    """Phase-fair lock: many concurrent readers or a single writer.
+
+    A waiting writer stops new readers from entering. When a writer releases,
+    as many readers as were queued at that moment are admitted before the next
+    writer, so neither side can starve the other under sustained load.
+
+    Both sides are reentrant for the owning thread and the writer may also
+    take the read side, so locked methods can call each other. Upgrading a
+    read lock to a write lock is refused because two upgrading readers would
+    deadlock each other.
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer: int | None = None
+        self._writer_depth = 0
+        self._writers_waiting = 0
+        self._readers_waiting = 0
+        self._read_grants = 0
+        self._local = threading.local()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+    def acquire_read(self) -> None:
+        depth = getattr(self._local, "depth", 0)
+        if depth:
+            self._local.depth = depth + 1
+            return
+        if self._writer == threading.get_ident():
+            self._local.depth = 1
+            self._local.counted = False
+            return
+        with self._condition:
+            self._readers_waiting += 1
+            while self._writer is not None or (self._writers_waiting and not self._read_grants):
+                self._condition.wait()
+            self._readers_waiting -= 1
+            self._readers += 1
+            if self._read_grants:
+                self._read_grants -= 1
+        self._local.depth = 1
+        self._local.counted = True
+
+    def release_read(self) -> None:
+        self._local.depth -= 1
+        if self._local.depth or not self._local.counted:
+            return
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            if getattr(self._local, "depth", 0):
+                raise RuntimeError("No se puede ampliar un bloqueo de lectura a escritura")
+            self._writers_waiting += 1
+            try:
+                while self._writer is not None or self._readers or self._read_grants:
+                    self._condition.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = me
+            self._writer_depth = 1
+
+    def release_write(self) -> None:
+        with self._condition:
+            self._writer_depth -= 1
+            if not self._writer_depth:
+                self._writer = None
+                self._read_grants = self._readers_waiting
+                self._condition.notify_all()
@@ -45,6 +45,14 @@ def sync_book_node(book: Book) -> Dict[str, object]:
     return payload
 
 
+def remove_book_node(book_id: int) -> bool:
+    """Drop a book node and its ratings; return whether the node existed."""
+
+    state = _graph_state()
+    state["ratings"].pop(book_id, None)
+    return state["books"].pop(book_id, None) is not None
+
+
 def sync_user_node(user: User) -> Dict[str, object]:
     state = _graph_state()
     payload = {"id": user.id, "username": user.username}
@@ -1,19 +1,100 @@
 """Servicio para gestionar reseñas de libros almacenadas en MongoDB."""
 from __future__ import annotations
 
+import time
+from dataclasses import dataclass
 from datetime import UTC, datetime
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
 
 from django.conf import settings
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
 
 from .mongo_client import get_mongo_database
 
+try:
+    from bson import ObjectId
+except ImportError:  # pragma: no cover - el stub de PyMongo usa ids enteros
+    ObjectId = None
+
+RATING_VALUES = (1, 2, 3, 4, 5)
+# Más recientes primero; ``_id`` desempata reseñas con el mismo ``created_at``.
+REVIEWS_ORDER = [("created_at", DESCENDING), ("_id", DESCENDING)]
+REVIEWS_BY_BOOK_INDEX = [("book_id", ASCENDING), *REVIEWS_ORDER]
+REVIEWS_BY_USER_INDEX = [("user_id", ASCENDING), *REVIEWS_ORDER]
+REVIEWS_BY_PAIR_INDEX = [("book_id", ASCENDING), ("user_id", ASCENDING)]
+
+ReviewCursor = Tuple[str, str]
+
+
+@dataclass(frozen=True, slots=True)
+class RatingAggregate:
+    """Suma, número de reseñas e histograma (índices 0-4 para ratings 1-5) de un libro."""
+
+    book_id: int
+    total: int = 0
+    count: int = 0
+    histogram: Tuple[int, ...] = (0,) * len(RATING_VALUES)
+
+    @property
+    def average(self) -> float | None:
+        return round(self.total / self.count, 2) if self.count else None
+
+
+class _AggregateCache:
+    """Caché por proceso de agregados, con caducidad para ver escrituras de otros procesos."""
+
+    def __init__(self, maxsize: int = 10_000) -> None:
+        self.maxsize = maxsize
+        self._entries: Dict[int, Tuple[float, RatingAggregate]] = {}
+
+    def get(self, book_id: int) -> RatingAggregate | None:
+        entry = self._entries.get(book_id)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def put(self, aggregate: RatingAggregate) -> None:
+        ttl = float(getattr(settings, "REVIEWS_AGGREGATE_CACHE_TTL", 5))
+        if aggregate.book_id not in self._entries and len(self._entries) >= self.maxsize:
+            try:
+                self._entries.pop(next(iter(self._entries)), None)
+            except (StopIteration, RuntimeError):  # vaciada o redimensionada por otro hilo
+                pass
+        self._entries[aggregate.book_id] = (time.monotonic() + ttl, aggregate)
+
+    def discard(self, book_id: int) -> None:
+        self._entries.pop(book_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_aggregate_cache = _AggregateCache()
+_indexed_collections: set[str] = set()
+
 
 def get_reviews_collection():
     """Obtener la colección de reseñas configurada para el proyecto."""
 
     collection_name = getattr(settings, "MONGO_REVIEWS_COLLECTION", "book_reviews")
-    return get_mongo_database()[collection_name]
+    collection = get_mongo_database()[collection_name]
+    if collection_name not in _indexed_collections:
+        collection.create_index(REVIEWS_BY_BOOK_INDEX, name="book_id_created_at")
+        collection.create_index(REVIEWS_BY_USER_INDEX, name="user_id_created_at")
+        collection.create_index(REVIEWS_BY_PAIR_INDEX, name="book_id_user_id")
+        _indexed_collections.add(collection_name)
+    return collection
+
+
+def get_rating_aggregates_collection():
+    """Colección con un documento ``{book_id, sum, count, histogram}`` por libro reseñado."""
+
+    collection_name = getattr(settings, "MONGO_RATING_AGGREGATES_COLLECTION", "book_rating_aggregates")
+    collection = get_mongo_database()[collection_name]
+    if collection_name not in _indexed_collections:
+        collection.create_index([("book_id", ASCENDING)], name="book_id", unique=True)
+        _indexed_collections.add(collection_name)
+    return collection
 
 
 def create_review(
@@ -23,9 +104,19 @@ def create_review(
     username: str | None,
     rating: int | str,
     comment: str | None = None,
+    upsert: bool = False,
 ) -> Dict[str, Any]:
-    """Insertar una reseña para un libro determinado y devolverla serializada."""
+    """Insertar una reseña para un libro determinado y devolverla serializada.
+
+    Con ``upsert=True`` se actualiza la reseña que el usuario ya tuviera para
+    el libro (véase :func:`upsert_review`) en lugar de añadir otra.
+    """
 
+    if upsert:
+        review, _ = upsert_review(
+            book_id=book_id, user_id=user_id, username=username, rating=rating, comment=comment
+        )
+        return review
     normalized_rating = _normalize_rating(rating)
     normalized_comment = _normalize_comment(comment)
     timestamp = datetime.now(tz=UTC).isoformat()
@@ -40,32 +131,347 @@ def create_review(
     }
     result = get_reviews_collection().insert_one(payload)
     payload["_id"] = result.inserted_id
+    _increment_aggregate(book_id, normalized_rating)
     return _serialize_review(payload)
 
 
+def upsert_review(
+    *,
+    book_id: int,
+    user_id: int,
+    username: str | None,
+    rating: int | str,
+    comment: str | None = None,
+) -> Tuple[Dict[str, Any], bool]:
+    """Crear o actualizar la reseña de ``user_id`` para ``book_id``; devuelve ``(reseña, creada)``.
+
+    El par ``(book_id, user_id)`` se localiza por índice y se actualiza con un
+    único ``find_one_and_update`` atómico; los agregados se corrigen con la
+    diferencia respecto al rating anterior.
+    """
+
+    normalized_rating = _normalize_rating(rating)
+    normalized_comment = _normalize_comment(comment)
+    timestamp = datetime.now(tz=UTC).isoformat()
+    collection = get_reviews_collection()
+    pair = {"book_id": book_id, "user_id": user_id}
+    changes = {
+        "username": username,
+        "rating": normalized_rating,
+        "comment": normalized_comment,
+        "updated_at": timestamp,
+    }
+    previous = collection.find_one_and_update(
+        pair,
+        {"$set": changes, "$setOnInsert": {"created_at": timestamp}},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE,
+    )
+    if previous is None:
+        _increment_aggregate(book_id, normalized_rating)
+        return _serialize_review(collection.find_one(pair)), True
+    old_rating = previous.get("rating")
+    if old_rating not in RATING_VALUES:
+        rebuild_rating_aggregates(book_id)
+    elif old_rating != normalized_rating:
+        increment = {
+            "sum": normalized_rating - old_rating,
+            f"histogram.{old_rating}": -1,
+            f"histogram.{normalized_rating}": 1,
+        }
+        _apply_increment(book_id, increment)
+    return _serialize_review({**previous, **changes}), False
+
+
+def create_reviews_bulk(
+    items: Sequence[Any],
+) -> Tuple[List[Tuple[int, Dict[str, Any]]], Dict[int, Dict[str, List[str]]]]:
+    """Validar e insertar muchas reseñas con un único ``insert_many``.
+
+    Cada elemento es un objeto con ``book_id``, ``user_id``, ``rating`` y,
+    opcionalmente, ``username``, ``comment`` y ``created_at`` (ISO 8601, para
+    conservar la fecha original al migrar). Devuelve las reseñas creadas como
+    pares ``(índice, reseña)`` y los errores por índice. Los agregados se
+    actualizan con un solo ``$inc`` por libro.
+    """
+
+    payloads: List[Dict[str, Any]] = []
+    indexes: List[int] = []
+    errors: Dict[int, Dict[str, List[str]]] = {}
+    now = datetime.now(tz=UTC).isoformat()
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors[index] = {"non_field_errors": ["Debe ser un objeto."]}
+            continue
+        payload, item_errors = _validate_bulk_review(item, now)
+        if item_errors:
+            errors[index] = item_errors
+        else:
+            payloads.append(payload)
+            indexes.append(index)
+    if not payloads:
+        return [], errors
+    result = get_reviews_collection().insert_many(payloads, ordered=False)
+    increments: Dict[int, Dict[str, int]] = {}
+    for payload, inserted_id in zip(payloads, result.inserted_ids):
+        payload["_id"] = inserted_id
+        rating = payload["rating"]
+        increment = increments.setdefault(payload["book_id"], {"sum": 0, "count": 0})
+        increment["sum"] += rating
+        increment["count"] += 1
+        increment[f"histogram.{rating}"] = increment.get(f"histogram.{rating}", 0) + 1
+    for book_id, increment in increments.items():
+        _apply_increment(book_id, increment)
+    return [(index, _serialize_review(payload)) for index, payload in zip(indexes, payloads)], errors
+
+
 def get_reviews_for_book(book_id: int) -> List[Dict[str, Any]]:
     """Devolver todas las reseñas de un libro ordenadas por fecha de creación."""
 
-    collection = get_reviews_collection()
-    documents = list(collection.find({"book_id": book_id}))
-    documents.sort(key=lambda doc: doc.get("created_at", ""), reverse=True)
-    return [_serialize_review(doc) for doc in documents]
+    return list(iter_reviews_for_book(book_id))
+
+
+def iter_reviews_for_book(book_id: int) -> Iterator[Dict[str, Any]]:
+    """Como :func:`get_reviews_for_book`, pero serializando cada reseña al iterar.
+
+    El orden lo resuelve la colección con el índice ``(book_id, created_at)``.
+    """
+
+    cursor = get_reviews_collection().find({"book_id": book_id}).sort(REVIEWS_ORDER)
+    return map(_serialize_review, cursor)
+
+
+def get_reviews_page(
+    book_id: int, *, before: ReviewCursor | None = None, limit: int
+) -> Tuple[List[Dict[str, Any]], ReviewCursor | None]:
+    """Devolver hasta ``limit`` reseñas anteriores a ``before`` y el cursor de la siguiente página.
+
+    ``before`` es el par ``(created_at, id)`` de la última reseña ya recibida.
+    El filtro, el orden y el límite se delegan en la colección, por lo que el
+    coste de una página no depende del número de reseñas del libro.
+    """
+
+    return _reviews_page({"book_id": book_id}, before, limit)
+
+
+def get_reviews_by_user(
+    user_id: int, *, before: ReviewCursor | None = None, limit: int
+) -> Tuple[List[Dict[str, Any]], ReviewCursor | None]:
+    """Como :func:`get_reviews_page`, para las reseñas de un usuario (índice ``user_id``)."""
+
+    return _reviews_page({"user_id": user_id}, before, limit)
+
+
+def _reviews_page(
+    filtro: Dict[str, Any], before: ReviewCursor | None, limit: int
+) -> Tuple[List[Dict[str, Any]], ReviewCursor | None]:
+    if before is not None:
+        created_at, review_id = before
+        object_id = _parse_review_id(review_id)
+        # La cota de rango hace que el índice (…, created_at, _id) empiece en el
+        # cursor; el $or solo desempata dentro del mismo ``created_at``.
+        filtro["created_at"] = {"$lte": created_at}
+        filtro["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": object_id}},
+        ]
+    cursor = get_reviews_collection().find(filtro).sort(REVIEWS_ORDER).limit(limit + 1)
+    reviews = [_serialize_review(document) for document in cursor]
+    if len(reviews) <= limit:
+        return reviews, None
+    reviews = reviews[:limit]
+    return reviews, (reviews[-1]["created_at"], reviews[-1]["id"])
 
 
 def get_average_rating_for_book(book_id: int) -> Tuple[float | None, int]:
-    """Calcular la media de rating y el número de reseñas de un libro."""
+    """Devolver la media de rating y el número de reseñas de un libro.
 
-    collection = get_reviews_collection()
-    ratings: List[int] = []
-    for document in collection.find({"book_id": book_id}):
+    Se lee del agregado mantenido por :func:`create_review`, sin recorrer las
+    reseñas.
+    """
+
+    aggregate = get_rating_aggregate(book_id)
+    return aggregate.average, aggregate.count
+
+
+def get_rating_aggregate(book_id: int) -> RatingAggregate:
+    """Devolver el agregado de valoraciones de un libro (vacío si no tiene reseñas).
+
+    Los agregados leídos de Mongo se guardan en una caché por proceso durante
+    ``REVIEWS_AGGREGATE_CACHE_TTL`` segundos; las reseñas creadas en este
+    proceso la invalidan al momento. Si el libro no tiene agregado pero sí
+    reseñas (anteriores a los agregados), se reconstruye en ese momento.
+    """
+
+    aggregate = _aggregate_cache.get(book_id)
+    if aggregate is None:
+        aggregates = get_rating_aggregates_collection()
+        document = aggregates.find_one({"book_id": book_id})
+        if document is None and get_reviews_collection().find_one({"book_id": book_id}) is not None:
+            _rebuild_aggregates({"book_id": book_id})
+            document = aggregates.find_one({"book_id": book_id})
+        aggregate = _aggregate_from_document(book_id, document)
+        _aggregate_cache.put(aggregate)
+    return aggregate
+
+
+def get_average_ratings_for_books(book_ids: Iterable[int]) -> Dict[int, Tuple[float | None, int]]:
+    """Como :func:`get_average_rating_for_book` para varios libros, con una sola consulta."""
+
+    return {
+        book_id: (aggregate.average, aggregate.count)
+        for book_id, aggregate in get_rating_aggregates(book_ids).items()
+    }
+
+
+def get_rating_aggregates(book_ids: Iterable[int]) -> Dict[int, RatingAggregate]:
+    """Devolver los agregados de ``book_ids``; los que no están en caché se piden con un único ``$in``.
+
+    Como en :func:`get_rating_aggregate`, los libros con reseñas pero sin
+    agregado se reconstruyen (todos juntos) antes de devolverlos.
+    """
+
+    aggregates: Dict[int, RatingAggregate] = {}
+    missing: List[int] = []
+    for book_id in dict.fromkeys(book_ids):
+        cached = _aggregate_cache.get(book_id)
+        if cached is None:
+            missing.append(book_id)
+        else:
+            aggregates[book_id] = cached
+    if missing:
+        collection = get_rating_aggregates_collection()
+        documents = {
+            document["book_id"]: document for document in collection.find({"book_id": {"$in": missing}})
+        }
+        unaggregated = [book_id for book_id in missing if book_id not in documents]
+        if unaggregated:
+            legacy = {
+                review["book_id"] for review in get_reviews_collection().find({"book_id": {"$in": unaggregated}})
+            }
+            if legacy:
+                _rebuild_aggregates({"book_id": {"$in": sorted(legacy)}})
+                documents.update(
+                    (document["book_id"], document)
+                    for document in collection.find({"book_id": {"$in": sorted(legacy)}})
+                )
+        for book_id in missing:
+            aggregate = _aggregate_from_document(book_id, documents.get(book_id))
+            _aggregate_cache.put(aggregate)
+            aggregates[book_id] = aggregate
+    return aggregates
+
+
+def rebuild_rating_aggregates(book_id: int | None = None) -> int:
+    """Recalcular los agregados a partir de las reseñas y devolver cuántos libros tienen reseñas.
+
+    Repara cualquier desviación (reseñas borradas o insertadas sin pasar por
+    :func:`create_review`); sin ``book_id`` reconstruye todos los libros.
+    """
+
+    filtro = {} if book_id is None else {"book_id": book_id}
+    rebuilt = _rebuild_aggregates(filtro)
+    if book_id is None:
+        _aggregate_cache.clear()
+    else:
+        _aggregate_cache.discard(book_id)
+    return rebuilt
+
+
+def _rebuild_aggregates(filtro: Dict[str, Any]) -> int:
+    sums: Dict[int, List[int]] = {}
+    for document in get_reviews_collection().find(filtro):
         rating_value = document.get("rating")
-        if isinstance(rating_value, (int, float)):
-            ratings.append(int(rating_value))
-    total_reviews = len(ratings)
-    if not total_reviews:
-        return None, 0
-    average = sum(ratings) / total_reviews
-    return round(average, 2), total_reviews
+        if isinstance(rating_value, (int, float)) and int(rating_value) in RATING_VALUES:
+            sums.setdefault(document.get("book_id"), [0] * len(RATING_VALUES))[int(rating_value) - 1] += 1
+    aggregates = get_rating_aggregates_collection()
+    aggregates.delete_many(filtro)
+    for reviewed_book_id, histogram in sums.items():
+        aggregates.insert_one(
+            {
+                "book_id": reviewed_book_id,
+                "sum": sum(rating * count for rating, count in zip(RATING_VALUES, histogram)),
+                "count": sum(histogram),
+                "histogram": {str(rating): count for rating, count in zip(RATING_VALUES, histogram) if count},
+            }
+        )
+        _aggregate_cache.discard(reviewed_book_id)
+    return len(sums)
+
+
+def _increment_aggregate(book_id: int, rating: int) -> None:
+    _apply_increment(book_id, {"sum": rating, "count": 1, f"histogram.{rating}": 1})
+
+
+def _apply_increment(book_id: int, increment: Dict[str, int]) -> None:
+    """Aplicar ``increment`` al agregado del libro, que debe existir.
+
+    Los agregados solo se crean reconstruyéndolos desde las reseñas (que ya
+    incluyen el cambio): un ``$inc`` con ``upsert`` sobre un libro con reseñas
+    anteriores a los agregados dejaría fuera esas reseñas.
+    """
+
+    result = get_rating_aggregates_collection().update_one({"book_id": book_id}, {"$inc": increment})
+    if result.matched_count == 0:
+        _rebuild_aggregates({"book_id": book_id})
+    _aggregate_cache.discard(book_id)
+
+
+def _aggregate_from_document(book_id: int, document: Dict[str, Any] | None) -> RatingAggregate:
+    if document is None:
+        return RatingAggregate(book_id)
+    histogram = document.get("histogram") or {}
+    return RatingAggregate(
+        book_id,
+        total=int(document.get("sum", 0)),
+        count=int(document.get("count", 0)),
+        histogram=tuple(int(histogram.get(str(rating), 0)) for rating in RATING_VALUES),
+    )
+
+
+def _validate_bulk_review(item: Mapping[str, Any], now: str) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+    errors: Dict[str, List[str]] = {}
+    for field in ("book_id", "user_id"):
+        value = item.get(field)
+        if not isinstance(value, int) or isinstance(value, bool):
+            errors[field] = ["Debe ser un número entero."]
+    username = item.get("username")
+    if username is not None and not isinstance(username, str):
+        errors["username"] = ["Debe ser una cadena."]
+    payload: Dict[str, Any] = {
+        "book_id": item.get("book_id"),
+        "user_id": item.get("user_id"),
+        "username": username,
+        "created_at": now,
+        "updated_at": now,
+    }
+    try:
+        payload["rating"] = _normalize_rating(item.get("rating", ""))
+    except ValueError as exc:
+        errors["rating"] = [str(exc)]
+    try:
+        payload["comment"] = _normalize_comment(item.get("comment"))
+    except ValueError as exc:
+        errors["comment"] = [str(exc)]
+    created_at = item.get("created_at")
+    if created_at is not None:
+        try:
+            timestamp = datetime.fromisoformat(created_at)
+        except (TypeError, ValueError):
+            errors["created_at"] = ["Fecha inválida (ISO 8601)."]
+        else:
+            timestamp = timestamp if timestamp.tzinfo is not None else timestamp.replace(tzinfo=UTC)
+            payload["created_at"] = payload["updated_at"] = timestamp.astimezone(UTC).isoformat()
+    return payload, errors
+
+
+def _parse_review_id(raw: str) -> Any:
+    # Antes que los enteros: un ObjectId puede estar formado solo por dígitos.
+    if ObjectId is not None and ObjectId.is_valid(raw):
+        return ObjectId(raw)
+    if raw.isascii() and raw.isdigit():
+        return int(raw)
+    raise ValueError("Identificador de reseña inválido")
 
 
 def _normalize_rating(value: int | str) -> int:
@@ -0,0 +1,170 @@
+"""In-process inverted index used for full-text search over the catalogue."""
+from __future__ import annotations
+
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Tuple
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class _FoldTable(dict):
+    """``str.translate`` table mapping each code point to its NFKD form without marks.
+
+    Stripping combining marks after decomposing character by character gives
+    the same result as decomposing the whole string, since canonical
+    reordering only moves the marks being dropped.
+    """
+
+    def __missing__(self, codepoint: int) -> str:
+        decomposed = unicodedata.normalize("NFKD", chr(codepoint))
+        folded = self[codepoint] = "".join(
+            char for char in decomposed if not unicodedata.combining(char)
+        )
+        return folded
+
+
+_FOLD_TABLE = _FoldTable()
+
+
+def fold_text(value: str) -> str:
+    """Strip accents and case so that ``"Cortázar"`` matches ``"cortazar"``."""
+
+    if value.isascii():
+        return value.casefold()
+    return value.translate(_FOLD_TABLE).casefold()
+
+
+def tokenize(value: str | None) -> List[str]:
+    """Split ``value`` into accent-folded lowercase terms."""
+
+    if not value:
+        return []
+    return _TOKEN_RE.findall(fold_text(value))
+
+
+class InvertedIndex:
+    """Map terms to the documents containing them and their term frequency.
+
+    Terms are also kept in a sorted list so that every query token can be
+    resolved as a prefix with two binary searches. Most terms occur once in
+    a single document, so such a posting list is stored as the bare document
+    id and only becomes a ``{doc_id: frequency}`` dict when it grows.
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, int | Dict[int, int]] = {}
+        self._terms: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def add(self, doc_id: int, texts: Iterable[str | None]) -> None:
+        for term in self._terms_for(texts):
+            if term not in self._postings:
+                insort(self._terms, term)
+            self._add_posting(term, doc_id)
+
+    def add_many(self, documents: Iterable[Tuple[int, Iterable[str | None]]]) -> None:
+        """Index several documents at once, sorting the term list only once.
+
+        Texts shared by several documents (typically author names) are only
+        tokenized once.
+        """
+
+        tokens: Dict[str, List[str]] = {}
+        all_postings = self._postings
+        for doc_id, texts in documents:
+            for text in texts:
+                if not text:
+                    continue
+                terms = tokens.get(text)
+                if terms is None:
+                    terms = tokens[text] = tokenize(text)
+                for term in terms:
+                    postings = all_postings.get(term)
+                    if postings is None:
+                        all_postings[term] = doc_id
+                    elif postings.__class__ is dict:
+                        postings[doc_id] = postings.get(doc_id, 0) + 1
+                    else:
+                        self._add_posting(term, doc_id)
+        self._terms = sorted(all_postings)
+
+    def remove(self, doc_id: int, texts: Iterable[str | None]) -> None:
+        for term in set(self._terms_for(texts)):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            if isinstance(postings, dict):
+                if postings.pop(doc_id, None) is None:
+                    continue
+                if len(postings) == 1:
+                    (only, frequency), = postings.items()
+                    if frequency == 1:
+                        self._postings[term] = only
+                if postings:
+                    continue
+            elif postings != doc_id:
+                continue
+            del self._postings[term]
+            del self._terms[bisect_left(self._terms, term)]
+
+    def clear(self) -> None:
+        self._postings = {}
+        self._terms = []
+
+    def _add_posting(self, term: str, doc_id: int) -> None:
+        postings = self._postings.get(term)
+        if postings is None:
+            self._postings[term] = doc_id
+        elif isinstance(postings, dict):
+            postings[doc_id] = postings.get(doc_id, 0) + 1
+        elif postings == doc_id:
+            self._postings[term] = {doc_id: 2}
+        else:
+            self._postings[term] = {postings: 1, doc_id: 1}
+
+    def search(self, query: str, limit: int | None = None) -> List[Tuple[int, int]]:
+        """Return ``(doc_id, score)`` pairs for documents matching every token.
+
+        Each query token matches any indexed term that starts with it and the
+        score is the summed frequency of the matched terms. Results are ordered
+        by descending score and then by ascending id.
+        """
+
+        scores: Dict[int, int] | None = None
+        for token in dict.fromkeys(tokenize(query)):
+            token_scores: Dict[int, int] = {}
+            position = bisect_left(self._terms, token)
+            while position < len(self._terms) and self._terms[position].startswith(token):
+                postings = self._postings[self._terms[position]]
+                if not isinstance(postings, dict):
+                    postings = {postings: 1}
+                for doc_id, frequency in postings.items():
+                    token_scores[doc_id] = token_scores.get(doc_id, 0) + frequency
+                position += 1
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    doc_id: score + token_scores[doc_id]
+                    for doc_id, score in scores.items()
+                    if doc_id in token_scores
+                }
+            if not scores:
+                return []
+        if not scores:
+            return []
+        ranked = ((-score, doc_id) for doc_id, score in scores.items())
+        ordered = heapq.nsmallest(limit, ranked) if limit is not None else sorted(ranked)
+        return [(doc_id, -negative_score) for negative_score, doc_id in ordered]
+
+    @staticmethod
+    def _terms_for(texts: Iterable[str | None]) -> List[str]:
+        terms: List[str] = []
+        for text in texts:
+            terms.extend(tokenize(text))
+        return terms
@@ -1,91 +1,232 @@
 """Serializers for API payloads."""
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, List, Mapping
+import keyword
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
 
+from rest_framework.renderers import json_dumps
+
+from .book_fragments import FragmentCache
 from .models import Book
 
 
+def compile_row_getter(fields: Tuple[str, ...]) -> Callable[[Any], tuple]:
+    """Return a function extracting ``fields`` of an object as a tuple."""
+
+    getter = attrgetter(*fields) if fields else (lambda _: ())
+    if len(fields) == 1:
+        return lambda instance: (getter(instance),)
+    return getter
+
+
+@lru_cache(maxsize=64)
+def compile_dict_builder(fields: Tuple[str, ...]) -> Callable[[Any], dict]:
+    """Return a function building ``{field: instance.field, ...}`` for ``fields``.
+
+    The function is generated as a single dict display, which avoids the
+    per-field ``getattr`` calls and the loop of a comprehension. Builders are
+    cached per field tuple, so a sparse fieldset is compiled only once.
+    """
+
+    for field in fields:
+        if not field.isidentifier() or keyword.iskeyword(field):
+            raise ValueError(f"Invalid field name {field!r}")
+    items = ", ".join(f"{field!r}: instance.{field}" for field in fields)
+    namespace: Dict[str, Any] = {}
+    exec(f"def build(instance):\n    return {{{items}}}\n", namespace)  # noqa: S102 - identifiers only
+    return namespace["build"]
+
+
 class BookSerializer:
-    """Serialize Book instances to primitives apt for JSON."""
+    """Serialize Book instances to primitives apt for JSON.
 
-    fields = ("id", "title", "author", "published_year", "isbn", "created_by")
+    ``fields`` restricts the output to a subset of :attr:`fields` (a sparse
+    fieldset); it is resolved once in the constructor, not per book. Books are
+    converted by a builder compiled once per field set
+    (:func:`compile_dict_builder`), and :meth:`rows` returns plain tuples for
+    callers that do not need dictionaries.
+    """
 
-    def __init__(self, instance: Book | Iterable[Book], *, many: bool = False) -> None:
+    fields: Sequence[str] = ("id", "title", "author", "published_year", "isbn", "created_by")
+
+    def __init__(
+        self,
+        instance: Book | Iterable[Book],
+        *,
+        many: bool = False,
+        fields: Iterable[str] | None = None,
+    ) -> None:
         self.instance = instance
         self.many = many
+        if fields is not None:
+            requested = set(fields)
+            unknown = requested.difference(type(self).fields)
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+            self.fields = tuple(field for field in type(self).fields if field in requested)
+        self._build = compile_dict_builder(tuple(self.fields))
 
     def data(self) -> List[dict] | dict:
         if self.many:
-            books = list(self.instance) if not isinstance(self.instance, list) else self.instance
-            return [self._serialize(book) for book in books]
-        return self._serialize(self.instance)  # type: ignore[arg-type]
+            return list(map(self._build, self.instance))  # type: ignore[arg-type]
+        return self._build(self.instance)
+
+    def iter_data(self) -> Iterator[dict]:
+        """Serialize lazily, one book at a time (for streaming responses)."""
+
+        if self.many:
+            return map(self._build, self.instance)  # type: ignore[arg-type]
+        return iter((self._build(self.instance),))
 
-    def _serialize(self, book: Book) -> dict:
-        return {field: getattr(book, field) for field in self.fields}
+    def iter_fragments(self, cache: FragmentCache) -> Iterator[bytes]:
+        """Yield the encoded JSON of each book, reusing fragments from ``cache``.
+
+        Books missing from the cache (or cached at another version) are
+        encoded and stored, so repeated listings only join existing bytes.
+        """
+
+        build, fields = self._build, tuple(self.fields)
+        books = self.instance if self.many else (self.instance,)
+        get, put = cache.get, cache.put
+        for book in books:  # type: ignore[union-attr]
+            stamp = (book.version, book.updated_at)
+            fragment = get(book.id, stamp, fields)
+            if fragment is None:
+                fragment = json_dumps(build(book))
+                put(book.id, stamp, fields, fragment)
+            yield fragment
+
+    def rows(self) -> List[tuple]:
+        """Return one tuple per book with the values of :attr:`fields`, in order."""
+
+        getter = compile_row_getter(tuple(self.fields))
+        if self.many:
+            return list(map(getter, self.instance))  # type: ignore[arg-type]
+        return [getter(self.instance)]
+
+
+_REQUIRED = "Este campo es obligatorio."
+_MISSING = object()
+
+
+class _Invalid(ValueError):
+    """Raised by the field cleaners with the message for the field."""
+
+
+def _clean_required_text(value: Any) -> str:
+    if not isinstance(value, str):
+        raise _Invalid(_REQUIRED if value is None else "Debe ser una cadena.")
+    normalized = value.strip()
+    if not normalized:
+        raise _Invalid(_REQUIRED)
+    return normalized
+
+
+def _clean_optional_text(value: Any) -> str | None:
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise _Invalid("Debe ser una cadena.")
+    return value.strip() or None
+
+
+def _clean_year(value: Any) -> int | None:
+    if value is None or value == "":
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isascii() and value.strip().isdigit():
+        return int(value.strip())
+    raise _Invalid("Debe ser un número entero.")
 
 
 class BookInputSerializer:
-    """Validate incoming payloads for creation and updates."""
+    """Validate incoming payloads for creation and updates.
+
+    With ``many=True`` ``data`` is a list of payloads validated in one pass
+    over a field table shared by the whole batch (no serializer per item).
+    :attr:`errors` then maps the index of each invalid payload to its errors,
+    and :attr:`validated_data` holds the cleaned valid payloads, whose
+    positions in ``data`` are listed in :attr:`valid_indexes`.
+    """
 
     required_fields = ("title", "author")
     optional_fields = ("published_year", "isbn")
     allowed_fields = required_fields + optional_fields
+    cleaners: Dict[str, Callable[[Any], Any]] = {
+        "title": _clean_required_text,
+        "author": _clean_required_text,
+        "published_year": _clean_year,
+        "isbn": _clean_optional_text,
+    }
 
-    def __init__(self, data: Mapping[str, Any] | None, *, partial: bool = False) -> None:
-        self.data: Dict[str, Any] = dict(data or {})
+    def __init__(self, data: Any, *, partial: bool = False, many: bool = False) -> None:
+        self.many = many
+        self.data: Any = list(data or []) if many else dict(data or {})
         self.partial = partial
-        self._errors: Dict[str, List[str]] = {}
-        self.validated_data: Dict[str, Any] = {}
+        self._errors: Dict[Any, Any] = {}
+        self.validated_data: Any = [] if many else {}
+        self.valid_indexes: List[int] = []
 
     def is_valid(self) -> bool:
-        cleaned: Dict[str, Any] = {}
-        self._errors = {}
-        for field in self.allowed_fields:
-            if field not in self.data:
+        # (field, cleaner, required if missing, required field) resolved once for every payload.
+        table = tuple(
+            (
+                field,
+                self.cleaners[field],
+                not self.partial and field in self.required_fields,
+                field in self.required_fields,
+            )
+            for field in self.allowed_fields
+        )
+        if not self.many:
+            cleaned, errors = _validate_payload(self.data, table)
+            self._errors = errors or {}
+            self.validated_data = cleaned if errors is None else {}
+            return errors is None
+        self._errors, self.validated_data, self.valid_indexes = {}, [], []
+        append_data, append_index = self.validated_data.append, self.valid_indexes.append
+        for index, item in enumerate(self.data):
+            if not isinstance(item, dict):
+                self._errors[index] = {"non_field_errors": ["Debe ser un objeto."]}
                 continue
-            valid, normalized = self._validate_field(field, self.data[field])
-            if valid:
-                cleaned[field] = normalized
-        for field in self.required_fields:
-            if field not in cleaned:
-                if self.partial and field not in self.data:
-                    continue
-                self._errors.setdefault(field, []).append("Este campo es obligatorio.")
-        if not self._errors:
-            self.validated_data = cleaned
-        else:
-            self.validated_data = {}
+            cleaned, errors = _validate_payload(item, table)
+            if errors is None:
+                append_data(cleaned)
+                append_index(index)
+            else:
+                self._errors[index] = errors
         return not self._errors
 
     @property
-    def errors(self) -> Dict[str, List[str]]:
+    def errors(self) -> Dict[Any, Any]:
         return self._errors
 
-    def _validate_field(self, field: str, value: Any) -> tuple[bool, Any]:
-        if field in {"title", "author", "isbn"}:
-            if value is None:
-                if field in self.required_fields:
-                    self._errors.setdefault(field, []).append("Este campo es obligatorio.")
-                    return False, None
-                return True, None
-            if not isinstance(value, str):
-                self._errors.setdefault(field, []).append("Debe ser una cadena.")
-                return False, None
-            normalized = value.strip()
-            if field in self.required_fields and not normalized:
-                self._errors.setdefault(field, []).append("Este campo es obligatorio.")
-                return False, None
-            if field == "isbn" and not normalized:
-                return True, None
-            return True, normalized
-        if field == "published_year":
-            if value in (None, ""):
-                return True, None
-            if isinstance(value, int):
-                return True, value
-            if isinstance(value, str) and value.strip().isdigit():
-                return True, int(value.strip())
-            self._errors.setdefault(field, []).append("Debe ser un número entero.")
-            return False, None
-        return True, value
+
+def _validate_payload(
+    item: Mapping[str, Any], table: tuple
+) -> Tuple[Dict[str, Any], Dict[str, List[str]] | None]:
+    """Clean ``item`` against ``table``; an invalid required field also reports it is required."""
+
+    cleaned: Dict[str, Any] = {}
+    errors: Dict[str, List[str]] | None = None
+    missing: List[str] = []
+    get = item.get
+    for field, clean, required, required_field in table:
+        value = get(field, _MISSING)
+        if value is _MISSING:
+            if required:
+                missing.append(field)
+            continue
+        try:
+            cleaned[field] = clean(value)
+        except _Invalid as exc:
+            errors = errors or {}
+            errors[field] = [str(exc), _REQUIRED] if required_field else [str(exc)]
+    if missing:
+        errors = errors or {}
+        for field in missing:
+            errors[field] = [_REQUIRED]
+    return cleaned, errors
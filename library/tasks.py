@@ -6,14 +6,17 @@ from typing import Dict, List
 from django.contrib.auth.models import User
 
 from . import celery_app
+from .book_changes import CHANGE_RESET, ChangeFeedExpired
 from .models import BookRepository
 from .neo4j_service import (
+    get_graph_snapshot,
     get_recommended_books_for_user,
+    remove_book_node,
     sync_book_node,
     sync_review_relation,
     sync_user_node,
 )
-from .reviews_service import get_reviews_for_book
+from .reviews_service import get_reviews_for_book, rebuild_rating_aggregates
 
 
 def _find_user(user_id: int, username: str | None) -> User:
@@ -49,3 +52,46 @@ def task_sync_user_recommendations(user_id: int, limit: int = 5) -> List[Dict[st
     """Return the recommended books for a given user."""
 
     return get_recommended_books_for_user(user_id, limit=limit)
+
+
+@celery_app.task(name="library.task_rebuild_rating_aggregates")
+def task_rebuild_rating_aggregates(book_id: int | None = None) -> Dict[str, int]:
+    """Recompute the rating aggregates from the reviews (all books by default)."""
+
+    return {"books_rebuilt": rebuild_rating_aggregates(book_id)}
+
+
+@celery_app.task(name="library.task_sync_book_changes_to_neo4j")
+def task_sync_book_changes_to_neo4j(since: int = 0) -> Dict[str, int]:
+    """Apply the catalogue changes recorded after ``since`` to the book nodes.
+
+    Returns ``next_since`` for the following run. When the change feed no
+    longer reaches back to ``since`` (or records a reset) every book node is
+    resynchronised from the repository instead.
+    """
+
+    try:
+        changes, latest = BookRepository.changes_since(since)
+    except ChangeFeedExpired:
+        changes, latest = None, BookRepository.latest_change_seq()
+    if changes is None or any(change.op == CHANGE_RESET for change in changes):
+        return {"next_since": latest, "full_resync": 1, **_resync_book_nodes()}
+    synced = removed = 0
+    for book_id in {change.book_id: None for change in changes}:
+        try:
+            book = BookRepository.get(book_id)
+        except LookupError:
+            removed += remove_book_node(book_id)
+            continue
+        sync_book_node(book)
+        synced += 1
+    return {"next_since": latest, "full_resync": 0, "books_synced": synced, "books_removed": removed}
+
+
+def _resync_book_nodes() -> Dict[str, int]:
+    books = BookRepository.list_all()
+    current = {book.id for book in books}
+    removed = sum(remove_book_node(book_id) for book_id in get_graph_snapshot()["books"] if book_id not in current)
+    for book in books:
+        sync_book_node(book)
+    return {"books_synced": len(books), "books_removed": removed}
@@ -1,10 +1,16 @@
 """Ligera implementación en memoria compatible con PyMongo para tests."""
 from __future__ import annotations
 
+import copy
+from bisect import bisect_left, insort
 from dataclasses import dataclass
-from typing import Any, Dict, Iterator, List, Mapping, MutableMapping, Optional
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, MutableMapping, Optional, Sequence, Tuple
 from urllib.parse import urlparse
 
+from .errors import DuplicateKeyError
+
 
 @dataclass
 class InsertOneResult:
@@ -13,6 +19,22 @@ class InsertOneResult:
     inserted_id: Any
 
 
+@dataclass
+class InsertManyResult:
+    """Resultado simplificado de insert_many."""
+
+    inserted_ids: List[Any]
+
+
+@dataclass
+class UpdateResult:
+    """Resultado simplificado de update_one."""
+
+    matched_count: int
+    modified_count: int
+    upserted_id: Any = None
+
+
 @dataclass
 class DeleteResult:
     """Resultado simplificado de delete_many."""
@@ -32,46 +54,464 @@ class _AdminModule:
         raise NotImplementedError(f"Comando {name} no soportado en el stub de PyMongo")
 
 
+ASCENDING = 1
+DESCENDING = -1
+
+
+class ReturnDocument:
+    """Qué versión devuelve ``find_one_and_update``."""
+
+    BEFORE = False
+    AFTER = True
+
+
+class Cursor:
+    """Cursor perezoso con ``sort`` y ``limit`` encadenables, como el de PyMongo."""
+
+    def __init__(self, collection: "Collection", filtro: Optional[Mapping[str, Any]]) -> None:
+        self._collection = collection
+        self._filter = filtro
+        self._sort: List[Tuple[str, int]] = []
+        self._limit = 0
+        self._iterator: Optional[Iterator[Dict[str, Any]]] = None
+
+    def sort(self, key_or_list: str | Sequence[Tuple[str, int]], direction: int = ASCENDING) -> "Cursor":
+        if isinstance(key_or_list, str):
+            self._sort = [(key_or_list, direction)]
+        else:
+            self._sort = [tuple(key) for key in key_or_list]
+        return self
+
+    def limit(self, limit: int) -> "Cursor":
+        self._limit = limit
+        return self
+
+    def __iter__(self) -> "Cursor":
+        return self
+
+    def __next__(self) -> Dict[str, Any]:
+        if self._iterator is None:
+            documents = self._collection._query(self._filter, self._sort, self._limit)
+            self._iterator = (dict(document) for document in documents)
+        return next(self._iterator)
+
+
+# Orden entre tipos de Mongo: null < números < cadenas < objetos < arrays < binarios < ObjectId < bool < fechas.
+_MAX_KEY = (99,)
+
+
+_RANKS = {int: 1, float: 1, str: 2, bool: 7}
+
+
+def _sort_key(value: Any) -> Tuple[Any, ...]:
+    rank = _RANKS.get(type(value))
+    if rank is not None:
+        return (rank, value)
+    if value is None:
+        return (0,)
+    if isinstance(value, bool):
+        return (7, value)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    if isinstance(value, Mapping):
+        return (3, repr(value))
+    if isinstance(value, (list, tuple)):
+        return (4, repr(value))
+    if isinstance(value, (bytes, bytearray)):
+        return (5, bytes(value))
+    if isinstance(value, datetime):
+        return (8, value)
+    return (6, str(value))
+
+
+def _hash_key(value: Any) -> Any:
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def _comparable(value: Any, operand: Any) -> bool:
+    # Los rangos solo comparan valores del mismo tipo, como en Mongo.
+    return value is not None and _sort_key(value)[0] == _sort_key(operand)[0]
+
+
+_COMPARISONS = {
+    "$eq": lambda value, operand: value == operand,
+    "$ne": lambda value, operand: value != operand,
+    "$lt": lambda value, operand: _comparable(value, operand) and value < operand,
+    "$lte": lambda value, operand: _comparable(value, operand) and value <= operand,
+    "$gt": lambda value, operand: _comparable(value, operand) and value > operand,
+    "$gte": lambda value, operand: _comparable(value, operand) and value >= operand,
+    "$in": lambda value, operand: value in operand,
+}
+_RANGE_OPERATORS = frozenset(("$lt", "$lte", "$gt", "$gte"))
+
+
+def _is_operator_dict(value: Any) -> bool:
+    return isinstance(value, Mapping) and bool(value) and all(key.startswith("$") for key in value)
+
+
+def _matches(document: Mapping[str, Any], filtro: Optional[Mapping[str, Any]]) -> bool:
+    if not filtro:
+        return True
+    for field, value in filtro.items():
+        if field == "$or":
+            if not any(_matches(document, clause) for clause in value):
+                return False
+        elif field == "$and":
+            if not all(_matches(document, clause) for clause in value):
+                return False
+        elif _is_operator_dict(value):
+            current = document.get(field)
+            for operator, operand in value.items():
+                if operator not in _COMPARISONS:
+                    raise NotImplementedError(f"Operador {operator} no soportado en el stub de PyMongo")
+                if not _COMPARISONS[operator](current, operand):
+                    return False
+        elif document.get(field) != value:
+            return False
+    return True
+
+
+class _Index:
+    """Índice secundario sobre campos de primer nivel (simple o compuesto).
+
+    ``_buckets`` agrupa los ``_id`` por la clave completa (búsquedas por
+    igualdad y comprobación de unicidad). Salvo en los índices ``hashed``,
+    ``_sorted`` guarda además ``(clave ordenable, secuencia, _id)`` ordenado,
+    lo que permite recorrer prefijos y rangos con ``bisect`` en el orden del
+    índice. Los campos ausentes se indexan como ``None``.
+    """
+
+    def __init__(self, name: str, spec: List[Tuple[str, Any]], *, unique: bool) -> None:
+        self.name = name
+        self.spec = spec
+        self.fields = tuple(field for field, _ in spec)
+        self.unique = unique
+        self.hashed = any(direction == "hashed" for _, direction in spec)
+        self._buckets: Dict[Tuple[Any, ...], Dict[Any, None]] = {}
+        self._sorted: List[Tuple[Any, ...]] = []
+
+    def _key(self, document: Mapping[str, Any]) -> Tuple[Any, ...]:
+        return tuple(_hash_key(document.get(field)) for field in self.fields)
+
+    def _sort_entry(self, document: Mapping[str, Any], seq: int, doc_id: Any) -> Tuple[Any, ...]:
+        return (tuple(_sort_key(document.get(field)) for field in self.fields), seq, doc_id)
+
+    def check(self, document: Mapping[str, Any], doc_id: Any = None) -> None:
+        if self.unique:
+            bucket = self._buckets.get(self._key(document))
+            if bucket and (doc_id is None or any(other != doc_id for other in bucket)):
+                raise DuplicateKeyError(f"Clave duplicada para el índice {self.name}: {self._key(document)!r}")
+
+    def add(self, document: Mapping[str, Any], seq: int, doc_id: Any) -> None:
+        self._buckets.setdefault(self._key(document), {})[doc_id] = None
+        if not self.hashed:
+            insort(self._sorted, self._sort_entry(document, seq, doc_id))
+
+    def build(self, entries: Iterable[Tuple[Mapping[str, Any], int, Any]]) -> None:
+        """Indexar documentos existentes de una vez (un solo ``sort`` en lugar de ``insort``)."""
+
+        for document, seq, doc_id in entries:
+            self.check(document)
+            self._buckets.setdefault(self._key(document), {})[doc_id] = None
+            if not self.hashed:
+                self._sorted.append(self._sort_entry(document, seq, doc_id))
+        self._sorted.sort()
+
+    def remove(self, document: Mapping[str, Any], seq: int, doc_id: Any) -> None:
+        key = self._key(document)
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.pop(doc_id, None)
+            if not bucket:
+                del self._buckets[key]
+        if not self.hashed:
+            entry = self._sort_entry(document, seq, doc_id)
+            position = bisect_left(self._sorted, entry[:2])
+            if position < len(self._sorted) and self._sorted[position][:2] == entry[:2]:
+                del self._sorted[position]
+
+    def lookup(self, values: Tuple[Any, ...]) -> List[Any]:
+        return list(self._buckets.get(tuple(_hash_key(value) for value in values), ()))
+
+    def scan(self, prefix: Tuple[Any, ...], bounds: Mapping[str, Any] | None) -> Tuple[int, int]:
+        """Devolver el intervalo de ``_sorted`` con ``prefix`` y, opcionalmente, un rango en el campo siguiente."""
+
+        low_key = high_key = tuple(_sort_key(value) for value in prefix)
+        low: Tuple[Any, ...] = low_key
+        high: Tuple[Any, ...] = low_key + (_MAX_KEY,)
+        if bounds:
+            operand = next(iter(bounds.values()))
+            rank = _sort_key(operand)[0]
+            low, high = low_key + ((rank,),), high_key + ((rank + 1,),)
+            for operator, operand in bounds.items():
+                bound = _sort_key(operand)
+                if operator == "$gte":
+                    low = max(low, low_key + (bound,))
+                elif operator == "$gt":
+                    low = max(low, low_key + (bound, _MAX_KEY))
+                elif operator == "$lte":
+                    high = min(high, high_key + (bound, _MAX_KEY))
+                else:
+                    high = min(high, high_key + (bound,))
+        return bisect_left(self._sorted, (low,)), bisect_left(self._sorted, (high,))
+
+    def info(self) -> Dict[str, Any]:
+        info: Dict[str, Any] = {"key": list(self.spec)}
+        if self.unique:
+            info["unique"] = True
+        return info
+
+
 class Collection:
-    """Colección en memoria con una API inspirada en PyMongo."""
+    """Colección en memoria con una API inspirada en PyMongo.
+
+    Los documentos se guardan por ``_id``; ``create_index`` crea índices
+    simples o compuestos (ordenados o ``hashed``, opcionalmente únicos) que
+    ``find``, ``find_one``, ``count_documents`` y ``delete_many`` usan para
+    evitar recorrer toda la colección. El resto del filtro se comprueba
+    después sobre los candidatos.
+    """
 
     def __init__(self, name: str) -> None:
         self.name = name
-        self._documents: List[Dict[str, Any]] = []
+        self._documents: Dict[Any, Dict[str, Any]] = {}
+        self._seq: Dict[Any, int] = {}
+        self._indexes: Dict[str, _Index] = {}
         self._next_id = 1
+        self._next_seq = 0
 
     def _match(self, document: Mapping[str, Any], filtro: Optional[Mapping[str, Any]]) -> bool:
-        if not filtro:
-            return True
-        for field, value in filtro.items():
-            if document.get(field) != value:
-                return False
-        return True
+        return _matches(document, filtro)
+
+    def create_index(self, keys: str | Sequence[Tuple[str, Any]], **kwargs: Any) -> str:
+        """Crear (o reutilizar) un índice sobre ``keys``; ``unique=True`` rechaza claves repetidas."""
+
+        spec = [(keys, ASCENDING)] if isinstance(keys, str) else [tuple(key) for key in keys]
+        name = kwargs.get("name") or "_".join(f"{field}_{direction}" for field, direction in spec)
+        if name in self._indexes:
+            return name
+        index = _Index(name, spec, unique=bool(kwargs.get("unique")))
+        index.build((document, self._seq[doc_id], doc_id) for doc_id, document in self._documents.items())
+        self._indexes[name] = index
+        return name
+
+    def drop_index(self, name: str) -> None:
+        del self._indexes[name]
+
+    def index_information(self) -> Dict[str, Dict[str, Any]]:
+        return {"_id_": {"key": [("_id", ASCENDING)]}, **{name: index.info() for name, index in self._indexes.items()}}
 
     def insert_one(self, document: MutableMapping[str, Any]) -> InsertOneResult:
         payload = dict(document)
         payload.setdefault("_id", self._next_id)
         self._next_id += 1
-        self._documents.append(payload)
-        return InsertOneResult(payload["_id"])
+        doc_id = payload["_id"]
+        if doc_id in self._documents:
+            raise DuplicateKeyError(f"Clave duplicada para el índice _id_: {doc_id!r}")
+        for index in self._indexes.values():
+            index.check(payload)
+        self._next_seq += 1
+        self._documents[doc_id] = payload
+        self._seq[doc_id] = self._next_seq
+        for index in self._indexes.values():
+            index.add(payload, self._next_seq, doc_id)
+        return InsertOneResult(doc_id)
+
+    def insert_many(self, documents: Iterable[MutableMapping[str, Any]], ordered: bool = True) -> InsertManyResult:
+        return InsertManyResult([self.insert_one(document).inserted_id for document in documents])
+
+    def update_one(
+        self,
+        filtro: Mapping[str, Any],
+        update: Mapping[str, Mapping[str, Any]],
+        upsert: bool = False,
+    ) -> UpdateResult:
+        """Aplicar ``$set``/``$inc``/``$setOnInsert`` (con rutas ``a.b``) al primer documento."""
+
+        unsupported = set(update) - {"$set", "$inc", "$setOnInsert"}
+        if unsupported:
+            raise NotImplementedError(f"Operadores {sorted(unsupported)} no soportados en el stub de PyMongo")
+        for document in self._query(filtro, (), 1):
+            doc_id, seq = document["_id"], self._seq[document["_id"]]
+            updated = copy.deepcopy(document)
+            _apply_update(updated, update, inserting=False)
+            for index in self._indexes.values():
+                index.check(updated, doc_id)
+            for index in self._indexes.values():
+                index.remove(document, seq, doc_id)
+                index.add(updated, seq, doc_id)
+            document.clear()
+            document.update(updated)
+            return UpdateResult(matched_count=1, modified_count=1)
+        if not upsert:
+            return UpdateResult(matched_count=0, modified_count=0)
+        document = {field: value for field, value in filtro.items() if not field.startswith("$")}
+        _apply_update(document, update, inserting=True)
+        result = self.insert_one(document)
+        return UpdateResult(matched_count=0, modified_count=0, upserted_id=result.inserted_id)
+
+    def find_one_and_update(
+        self,
+        filtro: Mapping[str, Any],
+        update: Mapping[str, Mapping[str, Any]],
+        upsert: bool = False,
+        return_document: bool = ReturnDocument.BEFORE,
+    ) -> Optional[Dict[str, Any]]:
+        """Actualizar el primer documento y devolverlo antes o después del cambio."""
+
+        before = next((copy.deepcopy(doc) for doc in self._query(filtro, (), 1)), None)
+        result = self.update_one(filtro, update, upsert=upsert)
+        if return_document == ReturnDocument.BEFORE:
+            return before
+        if before is not None:
+            return self.find_one({"_id": before["_id"]})
+        if result.upserted_id is not None:
+            return self.find_one({"_id": result.upserted_id})
+        return None
 
-    def find(self, filtro: Optional[Mapping[str, Any]] = None) -> Iterator[Dict[str, Any]]:
-        for document in list(self._documents):
-            if self._match(document, filtro):
-                yield dict(document)
+    def find(self, filtro: Optional[Mapping[str, Any]] = None) -> "Cursor":
+        return Cursor(self, filtro)
 
     def find_one(self, filtro: Optional[Mapping[str, Any]] = None) -> Optional[Dict[str, Any]]:
-        for document in self.find(filtro):
-            return document
+        for document in self._query(filtro, (), 1):
+            return dict(document)
         return None
 
     def delete_many(self, filtro: Optional[Mapping[str, Any]] = None) -> DeleteResult:
-        before = len(self._documents)
-        self._documents = [doc for doc in self._documents if not self._match(doc, filtro)]
-        return DeleteResult(deleted_count=before - len(self._documents))
+        if not filtro:
+            deleted = len(self._documents)
+            self._documents.clear()
+            self._seq.clear()
+            for index in self._indexes.values():
+                index._buckets.clear()
+                index._sorted.clear()
+            return DeleteResult(deleted_count=deleted)
+        doomed = list(self._query(filtro, (), 0))
+        for document in doomed:
+            doc_id = document["_id"]
+            seq = self._seq.pop(doc_id)
+            del self._documents[doc_id]
+            for index in self._indexes.values():
+                index.remove(document, seq, doc_id)
+        return DeleteResult(deleted_count=len(doomed))
 
     def count_documents(self, filtro: Optional[Mapping[str, Any]] = None) -> int:
-        return sum(1 for _ in self.find(filtro))
+        if not filtro:
+            return len(self._documents)
+        return sum(1 for _ in self._query(filtro, (), 0))
+
+    def _query(
+        self, filtro: Optional[Mapping[str, Any]], sort: Sequence[Tuple[str, int]], limit: int
+    ) -> Iterator[Dict[str, Any]]:
+        """Devolver (sin copiar) los documentos de ``filtro`` en el orden de ``sort``."""
+
+        candidates, ordered = self._plan(filtro or {}, sort)
+        documents = self._documents
+        matching = (
+            document
+            for document in map(documents.get, candidates)
+            if document is not None and _matches(document, filtro)
+        )
+        if not ordered:
+            results = list(matching)
+            for field, direction in reversed(sort):
+                results.sort(key=lambda doc: _sort_key(doc.get(field)), reverse=direction == DESCENDING)
+            return iter(results[:limit] if limit else results)
+        return islice(matching, limit) if limit else matching
+
+    def _plan(self, filtro: Mapping[str, Any], sort: Sequence[Tuple[str, int]]) -> Tuple[Iterable[Any], bool]:
+        """Elegir candidatos: ``(ids, ya_ordenados)``; sin índice útil, toda la colección."""
+
+        equal: Dict[str, Any] = {}
+        ranges: Dict[str, Mapping[str, Any]] = {}
+        within: Dict[str, Sequence[Any]] = {}
+        for field, value in filtro.items():
+            if field.startswith("$"):
+                continue
+            if not _is_operator_dict(value):
+                equal[field] = value
+            elif set(value) == {"$eq"}:
+                equal[field] = value["$eq"]
+            elif set(value) <= _RANGE_OPERATORS:
+                ranges[field] = value
+            elif set(value) == {"$in"}:
+                within[field] = value["$in"]
+        if "_id" in equal:
+            return [_hash_key(equal["_id"])], True
+        best: Tuple[Any, ...] | None = None
+        for index in self._indexes.values():
+            used = 0
+            while used < len(index.fields) and index.fields[used] in equal:
+                used += 1
+            prefix = tuple(equal[field] for field in index.fields[:used])
+            if index.hashed:
+                if used == len(index.fields):
+                    candidate = (used + 1, False, index, prefix, None)
+                elif len(index.fields) == 1 and index.fields[0] in within:
+                    candidate = (1, False, index, None, within[index.fields[0]])
+                else:
+                    continue
+            else:
+                bounds = ranges.get(index.fields[used]) if used < len(index.fields) else None
+                if used == 0 and bounds is None and not (index.fields[0] in within and len(index.fields) == 1):
+                    continue
+                score = used + (0.5 if bounds else 0) + (0.25 if used == len(index.fields) else 0)
+                if used == 0 and bounds is None:
+                    candidate = (1, False, index, None, within[index.fields[0]])
+                else:
+                    candidate = (score, _sort_direction(index, used, sort) is not None, index, prefix, bounds)
+            if best is None or candidate[:2] > best[:2]:
+                best = candidate
+        if best is None:
+            return list(self._documents), not sort
+        _, provides_order, index, prefix, extra = best
+        if prefix is None:  # $in sobre un índice de un solo campo
+            ids = [doc_id for value in dict.fromkeys(map(_hash_key, extra)) for doc_id in index.lookup((value,))]
+        elif index.hashed:
+            ids = index.lookup(prefix)
+        else:
+            low, high = index.scan(prefix, extra)
+            direction = _sort_direction(index, len(prefix), sort)
+            if sort and direction is not None:
+                entries = index._sorted[low:high]
+                return (entry[2] for entry in (reversed(entries) if direction < 0 else entries)), True
+            ids = [entry[2] for entry in index._sorted[low:high]]
+        # Sin orden pedido se devuelve el orden natural (de inserción), como antes.
+        ids.sort(key=self._seq.__getitem__)
+        return ids, not sort
+
+
+def _sort_direction(index: _Index, used: int, sort: Sequence[Tuple[str, int]]) -> int | None:
+    """1/-1 si recorrer el índice tras los ``used`` campos fijados produce el orden ``sort``."""
+
+    if not sort:
+        return None
+    fields = tuple(field for field, _ in sort)
+    directions = {direction for _, direction in sort}
+    if index.fields[used : used + len(fields)] != fields or len(directions) != 1:
+        return None
+    return directions.pop()
+
+
+def _apply_update(document: Dict[str, Any], update: Mapping[str, Mapping[str, Any]], *, inserting: bool) -> None:
+    for operator, fields in update.items():
+        if operator == "$setOnInsert" and not inserting:
+            continue
+        for path, value in fields.items():
+            *parents, leaf = path.split(".")
+            target = document
+            for part in parents:
+                target = target.setdefault(part, {})
+            if operator == "$inc":
+                target[leaf] = target.get(leaf, 0) + value
+            else:
+                target[leaf] = value
 
 
 class Database:
@@ -121,9 +561,16 @@ class MongoClient:
 
 
 __all__ = [
+    "ASCENDING",
     "Collection",
+    "Cursor",
+    "DESCENDING",
+    "DuplicateKeyError",
     "Database",
     "DeleteResult",
+    "InsertManyResult",
     "InsertOneResult",
     "MongoClient",
+    "ReturnDocument",
+    "UpdateResult",
 ]
@@ -0,0 +1,13 @@
+"""Excepciones del stub de PyMongo, con los mismos nombres que ``pymongo.errors``."""
+from __future__ import annotations
+
+
+class PyMongoError(Exception):
+    """Base de los errores de PyMongo."""
+
+
+class DuplicateKeyError(PyMongoError):
+    """Una escritura viola un índice único."""
+
+
+__all__ = ["DuplicateKeyError", "PyMongoError"]
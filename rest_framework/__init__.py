@@ -1,5 +1,5 @@
 """Minimal subset of Django REST Framework used in tests."""
-from .response import Response
+from .response import Response, StreamingResponse
 from .views import APIView
 
-__all__ = ["Response", "APIView"]
+__all__ = ["Response", "StreamingResponse", "APIView"]
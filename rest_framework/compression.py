@@ -0,0 +1,219 @@
+"""``Accept-Encoding`` negotiation, response compression and a cache of encoded bodies."""
+from __future__ import annotations
+
+import threading
+import zlib
+from collections import OrderedDict
+from itertools import chain
+from typing import TYPE_CHECKING, Callable, Dict, Hashable, Iterable, Iterator, List, Tuple
+
+from django.conf import settings
+
+if TYPE_CHECKING:  # pragma: no cover - import only used for annotations
+    from .response import Response
+
+SUPPORTED_ENCODINGS = ("gzip", "deflate")
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_LEVEL = 6
+DEFAULT_CACHE_SIZE = 64
+DEFAULT_CACHE_MAX_BODY = 4 << 20
+# zlib window bits selecting the gzip or the zlib ("deflate" in HTTP) container.
+_WBITS = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+
+
+def compression_settings() -> Tuple[int, int, int]:
+    """Return ``(min_size, level, cache_max_body)`` from the ``API_COMPRESS*`` settings."""
+
+    min_size = int(getattr(settings, "API_COMPRESSION_MIN_SIZE", DEFAULT_MIN_SIZE))
+    level = int(getattr(settings, "API_COMPRESSION_LEVEL", DEFAULT_LEVEL))
+    max_body = int(getattr(settings, "API_COMPRESSED_CACHE_MAX_BODY", DEFAULT_CACHE_MAX_BODY))
+    return min_size, level, max_body
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Return the preferred supported content coding, or ``None`` for identity."""
+
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for raw in accept_encoding.split(","):
+        coding, *params = [part.strip() for part in raw.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            weights[coding.lower()] = quality
+    best, best_quality = None, 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        quality = weights.get(coding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _WBITS[encoding])
+    return compressor.compress(body) + compressor.flush()
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str, level: int) -> Iterator[bytes]:
+    """Compress ``chunks`` incrementally, yielding output as it becomes available."""
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _WBITS[encoding])
+    for chunk in chunks:
+        output = compressor.compress(chunk)
+        if output:
+            yield output
+    yield compressor.flush()
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """Return the ``ETag`` of the ``encoding`` variant: ``"x"`` becomes ``"x-gzip"``.
+
+    Each content coding is a different representation, so it gets its own
+    (still strong or weak, as the original) validator.
+    """
+
+    prefix = "W/" if etag.startswith("W/") else ""
+    return f'{prefix}{etag[len(prefix):-1]}-{encoding}"'
+
+
+def strip_encoding_suffix(tag: str) -> str:
+    """Undo :func:`encoded_etag` on a quoted tag, leaving other tags untouched."""
+
+    for encoding in SUPPORTED_ENCODINGS:
+        suffix = f'-{encoding}"'
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)] + '"'
+    return tag
+
+
+class EncodedBodyCache:
+    """Small LRU of rendered bodies, raw and per content coding.
+
+    Keys identify a representation (for instance path, query, media type and
+    ``ETag``), so an entry is only reused while the ``ETag`` is unchanged.
+    Each entry keeps the raw body together with its compressed variants,
+    which are computed at most once. Without an explicit ``maxsize`` the limit
+    is read from the ``API_COMPRESSED_CACHE_SIZE`` setting.
+    """
+
+    def __init__(self, maxsize: int | None = None) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, Dict[str | None, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, encoding: str | None) -> bytes | None:
+        with self._lock:
+            variants = self._entries.get(key)
+            if variants is None:
+                return None
+            self._entries.move_to_end(key)
+            return variants.get(encoding)
+
+    def get_or_compress(self, key: Hashable, encoding: str, level: int) -> bytes | None:
+        """Return the ``encoding`` variant, compressing the cached raw body if needed."""
+
+        with self._lock:
+            variants = self._entries.get(key)
+            raw = None if variants is None else variants.get(None)
+        if raw is None:
+            return None
+        return self.store(key, encoding, lambda: compress(raw, encoding, level))
+
+    def store(self, key: Hashable, encoding: str | None, body: bytes | Callable[[], bytes]) -> bytes:
+        with self._lock:
+            variants = self._entries.get(key)
+            if variants is not None and encoding in variants:
+                self._entries.move_to_end(key)
+                return variants[encoding]
+        value = body() if callable(body) else body
+        with self._lock:
+            variants = self._entries.setdefault(key, {})
+            variants.setdefault(encoding, value)
+            self._entries.move_to_end(key)
+            limit = self.maxsize
+            if limit is None:
+                limit = int(getattr(settings, "API_COMPRESSED_CACHE_SIZE", DEFAULT_CACHE_SIZE))
+            while len(self._entries) > limit:
+                self._entries.popitem(last=False)
+            return variants[encoding]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+body_cache = EncodedBodyCache()
+
+
+def encode_response(response: Response, *, accept_encoding: str | None, cache_key: Hashable | None) -> None:
+    """Compress ``response`` for the negotiated coding and reuse cached bodies.
+
+    Identity requests are left untouched (streaming bodies keep streaming);
+    bodies below ``API_COMPRESSION_MIN_SIZE`` bytes are sent as they are.
+    With a ``cache_key`` (cacheable responses carrying an ``ETag``) the raw
+    body and each compressed variant are kept in :data:`body_cache`, so a
+    repeated request neither renders nor compresses again. Streaming bodies
+    larger than ``API_COMPRESSED_CACHE_MAX_BODY`` are not cached and are
+    compressed on the fly instead. A compressed response gets its own
+    ``ETag`` (see :func:`encoded_etag`).
+    """
+
+    if response.is_rendered and not response.content:
+        return
+    response.patch_vary("Accept-Encoding")
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding is None:
+        return
+    min_size, level, max_body = compression_settings()
+    raw = body_cache.get(cache_key, None) if cache_key is not None else None
+    if raw is None and getattr(response, "streaming", False) and not response.is_rendered:
+        # Buffer just enough to decide: the cache limit, or the threshold.
+        limit = max(max_body, min_size) if cache_key is not None else min_size
+        head: List[bytes] = []
+        size = 0
+        chunks = response.streaming_content
+        for chunk in chunks:
+            head.append(chunk)
+            size += len(chunk)
+            if size > limit:
+                response.set_stream(compress_stream(chain(head, chunks), encoding, level))
+                _mark_encoded(response, encoding)
+                return
+        _set_body(response, b"".join(head))
+    if raw is None:
+        raw = response.content
+        if cache_key is not None and len(raw) <= max_body:
+            body_cache.store(cache_key, None, raw)
+        else:
+            cache_key = None
+    if len(raw) < min_size:
+        _set_body(response, raw)
+        return
+    if cache_key is not None:
+        _set_body(response, body_cache.store(cache_key, encoding, lambda: compress(raw, encoding, level)))
+    else:
+        _set_body(response, compress(raw, encoding, level))
+    _mark_encoded(response, encoding)
+
+
+def _mark_encoded(response: Response, encoding: str) -> None:
+    response.headers["Content-Encoding"] = encoding
+    etag = response.headers.get("ETag")
+    if etag:
+        response.headers["ETag"] = encoded_etag(etag, encoding)
+
+
+def _set_body(response: Response, body: bytes) -> None:
+    response.content = body
+    if getattr(response, "streaming", False):
+        response.set_stream(iter((body,)))
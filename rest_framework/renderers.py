@@ -0,0 +1,298 @@
+"""Renderers selected by content negotiation, mirroring DRF's ``renderers`` module."""
+from __future__ import annotations
+
+import json
+import struct
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+try:  # Optional fast path: orjson is several times faster than the stdlib.
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the environment
+    msgpack = None
+
+_json_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def json_dumps(data: Any) -> bytes:
+    """Encode ``data`` as compact UTF-8 JSON, with orjson when it is installed.
+
+    Both paths produce the same bytes for plain JSON data. Values orjson
+    refuses (for example integers beyond 64 bits) fall back to the stdlib.
+    """
+
+    if orjson is not None:
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            pass
+    return _json_encode(data).encode("utf-8")
+
+
+class BaseRenderer:
+    """Turn response data into bytes for one media type."""
+
+    media_type = "application/octet-stream"
+    format = ""
+
+    def render(self, data: Any) -> bytes:  # pragma: no cover - interface definition
+        raise NotImplementedError
+
+    def render_stream(
+        self,
+        items: Iterable[Any],
+        *,
+        envelope: Dict[str, Any] | None = None,
+        key: str = "results",
+        chunk_size: int = 500,
+        fragments: Iterable[bytes] | None = None,
+    ) -> Iterator[bytes]:
+        """Render a collection (optionally inside ``envelope``) as byte chunks.
+
+        The default collects every item and renders the result at once;
+        formats that can be written incrementally override it.
+        """
+
+        collected = list(items)
+        yield self.render(collected if envelope is None else {**envelope, key: collected})
+
+
+class JSONRenderer(BaseRenderer):
+    media_type = "application/json"
+    format = "json"
+
+    def render(self, data: Any) -> bytes:
+        return json_dumps(data)
+
+    def render_stream(
+        self,
+        items: Iterable[Any],
+        *,
+        envelope: Dict[str, Any] | None = None,
+        key: str = "results",
+        chunk_size: int = 500,
+        fragments: Iterable[bytes] | None = None,
+    ) -> Iterator[bytes]:
+        """Emit the array ``chunk_size`` items at a time.
+
+        ``fragments`` are the items already encoded as JSON; when given they
+        are joined instead of encoding ``items``.
+        """
+
+        if envelope is None:
+            yield b"["
+        else:
+            # '{..., "results":[]}' without the closing "]}".
+            yield json_dumps({**envelope, key: []})[:-2]
+        encoded = fragments if fragments is not None else map(json_dumps, items)
+        separator = b""
+        chunk: List[bytes] = []
+        for item in encoded:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                yield separator + b",".join(chunk)
+                separator, chunk = b",", []
+        if chunk:
+            yield separator + b",".join(chunk)
+        yield b"]" if envelope is None else b"]}"
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Compact binary encoding meant for service-to-service calls.
+
+    Uses the ``msgpack`` package when installed and a small built-in encoder
+    (:func:`packb`) otherwise.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    aliases = ("application/x-msgpack",)
+
+    def render(self, data: Any) -> bytes:
+        if msgpack is not None:
+            return msgpack.packb(data, use_bin_type=True)
+        return packb(data)
+
+
+DEFAULT_RENDERERS: Tuple[type[BaseRenderer], ...] = (JSONRenderer, MessagePackRenderer)
+
+
+def negotiate(accept: str | None, renderer_classes: Sequence[type[BaseRenderer]]) -> BaseRenderer | None:
+    """Pick the renderer preferred by an ``Accept`` header (``None`` if none fits).
+
+    Media ranges are ranked by their ``q`` value and then by specificity; ties
+    keep the order of ``renderer_classes``, so the first one is the default.
+    """
+
+    if not accept or not accept.strip():
+        return renderer_classes[0]()
+    ranges = []
+    for position, raw in enumerate(accept.split(",")):
+        media_range, *params = [part.strip() for part in raw.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_range and quality > 0:
+            specificity = 0 if media_range == "*/*" else 1 if media_range.endswith("/*") else 2
+            ranges.append((-quality, -specificity, position, media_range.lower()))
+    for *_, media_range in sorted(ranges):
+        for renderer_class in renderer_classes:
+            media_types = (renderer_class.media_type, *getattr(renderer_class, "aliases", ()))
+            if any(_media_matches(media_range, media_type) for media_type in media_types):
+                return renderer_class()
+    return None
+
+
+def _media_matches(media_range: str, media_type: str) -> bool:
+    if media_range == "*/*":
+        return True
+    kind, _, subtype = media_range.partition("/")
+    media_kind, _, media_subtype = media_type.partition("/")
+    return kind == media_kind and subtype in ("*", media_subtype)
+
+
+def packb(data: Any) -> bytes:
+    """Encode ``data`` as MessagePack (nil, bool, int, float, str, bin, array, map)."""
+
+    out = bytearray()
+    _pack(data, out)
+    return bytes(out)
+
+
+def unpackb(payload: bytes) -> Any:
+    """Decode a MessagePack document produced by :func:`packb`."""
+
+    value, position = _unpack(memoryview(payload), 0)
+    if position != len(payload):
+        raise ValueError("Extra data after the MessagePack document")
+    return value
+
+
+def _pack(value: Any, out: bytearray) -> None:
+    if value is None:
+        out.append(0xC0)
+    elif value is True or value is False:
+        out.append(0xC3 if value else 0xC2)
+    elif isinstance(value, int):
+        _pack_int(value, out)
+    elif isinstance(value, float):
+        out += b"\xcb" + struct.pack(">d", value)
+    elif isinstance(value, str):
+        encoded = value.encode("utf-8")
+        _pack_header(len(encoded), out, fix=(0xA0, 32), sizes=((0xD9, ">B"), (0xDA, ">H"), (0xDB, ">I")))
+        out += encoded
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        _pack_header(len(value), out, fix=None, sizes=((0xC4, ">B"), (0xC5, ">H"), (0xC6, ">I")))
+        out += value
+    elif isinstance(value, (list, tuple)):
+        _pack_header(len(value), out, fix=(0x90, 16), sizes=((0xDC, ">H"), (0xDD, ">I")))
+        for item in value:
+            _pack(item, out)
+    elif isinstance(value, dict):
+        _pack_header(len(value), out, fix=(0x80, 16), sizes=((0xDE, ">H"), (0xDF, ">I")))
+        for key, item in value.items():
+            _pack(key, out)
+            _pack(item, out)
+    else:
+        raise TypeError(f"Cannot serialize {type(value).__name__} to MessagePack")
+
+
+_UNSIGNED = ((0xCC, ">B", 1 << 8), (0xCD, ">H", 1 << 16), (0xCE, ">I", 1 << 32), (0xCF, ">Q", 1 << 64))
+_SIGNED = ((0xD0, ">b", 1 << 7), (0xD1, ">h", 1 << 15), (0xD2, ">i", 1 << 31), (0xD3, ">q", 1 << 63))
+
+
+def _pack_int(value: int, out: bytearray) -> None:
+    if 0 <= value < 0x80:
+        out.append(value)
+    elif -32 <= value < 0:
+        out.append(value & 0xFF)
+    elif value >= 0:
+        for code, fmt, limit in _UNSIGNED:
+            if value < limit:
+                out += bytes((code,)) + struct.pack(fmt, value)
+                return
+        raise OverflowError("Integer too large for MessagePack")
+    else:
+        for code, fmt, limit in _SIGNED:
+            if value >= -limit:
+                out += bytes((code,)) + struct.pack(fmt, value)
+                return
+        raise OverflowError("Integer too small for MessagePack")
+
+
+def _pack_header(
+    length: int, out: bytearray, *, fix: Tuple[int, int] | None, sizes: Sequence[Tuple[int, str]]
+) -> None:
+    if fix is not None and length < fix[1]:
+        out.append(fix[0] | length)
+        return
+    for code, fmt in sizes:
+        if length < 1 << (8 * struct.calcsize(fmt)):
+            out += bytes((code,)) + struct.pack(fmt, length)
+            return
+    raise OverflowError("Value too large for MessagePack")
+
+
+_FIXED = {0xC0: None, 0xC2: False, 0xC3: True}
+_NUMBERS = {
+    0xCA: ">f", 0xCB: ">d",
+    0xCC: ">B", 0xCD: ">H", 0xCE: ">I", 0xCF: ">Q",
+    0xD0: ">b", 0xD1: ">h", 0xD2: ">i", 0xD3: ">q",
+}
+_LENGTHS = {
+    0xC4: (">B", "bin"), 0xC5: (">H", "bin"), 0xC6: (">I", "bin"),
+    0xD9: (">B", "str"), 0xDA: (">H", "str"), 0xDB: (">I", "str"),
+    0xDC: (">H", "array"), 0xDD: (">I", "array"),
+    0xDE: (">H", "map"), 0xDF: (">I", "map"),
+}
+
+
+def _unpack(view: memoryview, position: int) -> Tuple[Any, int]:
+    code = view[position]
+    position += 1
+    if code < 0x80:
+        return code, position
+    if code >= 0xE0:
+        return code - 0x100, position
+    if code in _FIXED:
+        return _FIXED[code], position
+    if code in _NUMBERS:
+        fmt = _NUMBERS[code]
+        return struct.unpack_from(fmt, view, position)[0], position + struct.calcsize(fmt)
+    if 0xA0 <= code <= 0xBF:
+        kind, length = "str", code & 0x1F
+    elif 0x90 <= code <= 0x9F:
+        kind, length = "array", code & 0x0F
+    elif 0x80 <= code <= 0x8F:
+        kind, length = "map", code & 0x0F
+    elif code in _LENGTHS:
+        fmt, kind = _LENGTHS[code]
+        length = struct.unpack_from(fmt, view, position)[0]
+        position += struct.calcsize(fmt)
+    else:
+        raise ValueError(f"Unsupported MessagePack type 0x{code:02x}")
+    if kind in ("str", "bin"):
+        chunk = bytes(view[position : position + length])
+        if len(chunk) < length:
+            raise ValueError("Truncated MessagePack document")
+        return (chunk.decode("utf-8") if kind == "str" else chunk), position + length
+    if kind == "array":
+        items = []
+        for _ in range(length):
+            item, position = _unpack(view, position)
+            items.append(item)
+        return items, position
+    mapping = {}
+    for _ in range(length):
+        key, position = _unpack(view, position)
+        mapping[key], position = _unpack(view, position)
+    return mapping, position
@@ -1,19 +1,139 @@
-"""Simplified Response object that returns JSON payloads."""
+"""Simplified Response objects rendered lazily by a negotiated renderer."""
 from __future__ import annotations
 
-import json
-from typing import Any
+from typing import Any, Dict, Iterable, Iterator
+
+from .renderers import BaseRenderer, JSONRenderer
 
 
 class Response:
-    """Tiny stand-in for rest_framework.response.Response."""
+    """Tiny stand-in for rest_framework.response.Response.
+
+    Nothing is encoded until :attr:`content` is first read, so responses that
+    are discarded or emptied (304, ``HEAD``) never pay for rendering. The view
+    sets :attr:`accepted_renderer` from the request ``Accept`` header; JSON is
+    used otherwise.
+    """
 
-    def __init__(self, data: Any, status: int = 200, *, content_type: str = "application/json") -> None:
+    def __init__(
+        self,
+        data: Any,
+        status: int = 200,
+        *,
+        content_type: str | None = None,
+        headers: Dict[str, str] | None = None,
+    ) -> None:
         self.data = data
         self.status_code = status
-        self.content_type = content_type
-        self.content = self.render()
+        self.headers: Dict[str, str] = dict(headers or {})
+        self._content_type = content_type
+        self._content: bytes | None = None
+        self.accepted_renderer: BaseRenderer = JSONRenderer()
+
+    @property
+    def content_type(self) -> str:
+        return self._content_type or self.accepted_renderer.media_type
+
+    @content_type.setter
+    def content_type(self, value: str) -> None:
+        self._content_type = value
+
+    @property
+    def content(self) -> bytes:
+        if self._content is None:
+            self._content = self.render()
+        return self._content
+
+    @content.setter
+    def content(self, value: bytes) -> None:
+        self._content = value
+
+    @property
+    def is_rendered(self) -> bool:
+        return self._content is not None
 
     def render(self) -> bytes:
-        """Render the payload to JSON bytes."""
-        return json.dumps(self.data).encode("utf-8")
+        """Render the payload with the accepted renderer (empty body when ``data`` is ``None``)."""
+        if self.data is None:
+            return b""
+        return self.accepted_renderer.render(self.data)
+
+    def discard_body(self) -> None:
+        """Drop the body without rendering it (used for ``HEAD`` requests)."""
+
+        self._content = b""
+
+    def patch_vary(self, *names: str) -> None:
+        """Add ``names`` to the ``Vary`` header, keeping the ones already listed."""
+
+        current = [name.strip() for name in self.headers.get("Vary", "").split(",") if name.strip()]
+        known = {name.lower() for name in current}
+        current.extend(name for name in names if name.lower() not in known)
+        self.headers["Vary"] = ", ".join(current)
+
+
+class StreamingResponse(Response):
+    """Response whose collection body is encoded lazily, ``chunk_size`` items at a time.
+
+    ``items`` may be a generator: it is consumed only while the body is being
+    iterated through :attr:`streaming_content`, so neither the full list of
+    objects nor the full byte string has to exist at once. With ``envelope``
+    the collection is emitted as its ``key`` member, after the other (small)
+    members. ``json_fragments`` may supply the items already encoded as JSON,
+    which the JSON renderer joins instead of encoding ``items``; other
+    renderers ignore them. Reading :attr:`content` joins and caches the whole
+    body, which is meant for tests and for callers that need the bytes anyway.
+    """
+
+    streaming = True
+
+    def __init__(
+        self,
+        items: Iterable[Any],
+        status: int = 200,
+        *,
+        envelope: Dict[str, Any] | None = None,
+        key: str = "results",
+        chunk_size: int = 500,
+        json_fragments: Iterable[bytes] | None = None,
+        content_type: str | None = None,
+        headers: Dict[str, str] | None = None,
+    ) -> None:
+        super().__init__(None, status, content_type=content_type, headers=headers)
+        self._items = items
+        self._envelope = envelope
+        self._key = key
+        self._chunk_size = chunk_size
+        self._fragments = json_fragments
+        self._stream: Iterator[bytes] | None = None
+        self._consumed = False
+
+    @property
+    def streaming_content(self) -> Iterator[bytes]:
+        if self._consumed:
+            raise RuntimeError("The streaming content has already been consumed")
+        self._consumed = True
+        if self._stream is not None:
+            return self._stream
+        return self.accepted_renderer.render_stream(
+            self._items,
+            envelope=self._envelope,
+            key=self._key,
+            chunk_size=self._chunk_size,
+            fragments=self._fragments if isinstance(self.accepted_renderer, JSONRenderer) else None,
+        )
+
+    def render(self) -> bytes:
+        return b"".join(self.streaming_content)
+
+    def discard_body(self) -> None:
+        """Drop the body and the stream, so neither is rendered (``HEAD``)."""
+
+        super().discard_body()
+        self.set_stream(iter(()))
+
+    def set_stream(self, chunks: Iterator[bytes]) -> None:
+        """Replace the body with already encoded ``chunks`` (e.g. compressed)."""
+
+        self._stream = chunks
+        self._consumed = False
@@ -1,13 +1,27 @@
 """Simplified APIView implementation."""
 from __future__ import annotations
 
-from typing import Any, Callable
+from typing import Any, Callable, Hashable, Sequence
+
+from .compression import encode_response
+from .renderers import DEFAULT_RENDERERS, BaseRenderer, negotiate
+from .response import Response
 
 
 class APIView:
-    """Very small subset of DRF's APIView."""
+    """Very small subset of DRF's APIView.
+
+    The renderer is negotiated from the request ``Accept`` header against
+    :attr:`renderer_classes` before the handler runs (406 when none fits), and
+    every response lists ``Accept`` in ``Vary``.
+    ``HEAD`` is served by ``get`` with the body dropped unrendered. Other
+    bodies are compressed according to ``Accept-Encoding`` (see
+    :func:`~rest_framework.compression.encode_response`); successful ``GET``
+    responses with an ``ETag`` are cacheable and their encoded bodies reused.
+    """
 
-    http_method_names = {"get", "post", "put", "patch", "delete"}
+    http_method_names = {"get", "post", "put", "patch", "delete", "head"}
+    renderer_classes: Sequence[type[BaseRenderer]] = DEFAULT_RENDERERS
 
     @classmethod
     def as_view(cls, **initkwargs: Any) -> Callable[..., Any]:
@@ -19,12 +33,49 @@ class APIView:
             if method not in cls.http_method_names:
                 raise AttributeError(f"Method {method} not allowed")
             handler = getattr(self, method, None)
+            if handler is None and method == "head":
+                handler = self.get
             if handler is None:
                 raise AttributeError(f"Handler for {method} not implemented")
-            return handler(request, *args, **kwargs)
+            renderer = negotiate(_header(request, "Accept"), cls.renderer_classes)
+            if renderer is None:
+                media_types = [renderer_class.media_type for renderer_class in cls.renderer_classes]
+                response = Response({"detail": "No acceptable media type", "available": media_types}, status=406)
+                response.patch_vary("Accept")
+                return response
+            response = handler(request, *args, **kwargs)
+            if isinstance(response, Response):
+                response.accepted_renderer = renderer
+                response.patch_vary("Accept")
+                if method == "head":
+                    response.discard_body()
+                else:
+                    encode_response(
+                        response,
+                        accept_encoding=_header(request, "Accept-Encoding"),
+                        cache_key=_cache_key(request, method, response, renderer),
+                    )
+            return response
 
         return view
 
     # Subclasses override e.g. `get`
     def get(self, request: Any | None = None, *args: Any, **kwargs: Any) -> Any:  # pragma: no cover - interface definition
         raise NotImplementedError
+
+
+def _header(request: Any, name: str) -> str | None:
+    headers = getattr(request, "headers", None) or {}
+    lowered = name.lower()
+    for key, value in headers.items():
+        if key.lower() == lowered:
+            return value
+    return None
+
+
+def _cache_key(request: Any, method: str, response: Response, renderer: BaseRenderer) -> Hashable | None:
+    etag = response.headers.get("ETag")
+    if method != "get" or response.status_code != 200 or not etag:
+        return None
+    query = tuple(sorted((getattr(request, "GET", None) or {}).items()))
+    return (getattr(request, "path", ""), query, renderer.media_type, etag)
@@ -15,6 +15,7 @@ from library.reviews_service import (
     create_review,
     get_average_rating_for_book,
     get_reviews_collection,
+    rebuild_rating_aggregates,
     get_reviews_for_book,
 )
 
@@ -27,6 +28,7 @@ def setup_function(_: object) -> None:
     BookRepository.reset()
     User.objects.reset()
     get_reviews_collection().delete_many({})
+    rebuild_rating_aggregates()
 
 
 def _call(path: str, *, method: str = "GET", body: dict | None = None, user: User | None = None):
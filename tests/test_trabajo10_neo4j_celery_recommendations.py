@@ -20,7 +20,7 @@ from library.neo4j_service import (
     sync_review_relation,
     sync_user_node,
 )
-from library.reviews_service import create_review, get_reviews_collection
+from library.reviews_service import create_review, get_reviews_collection, rebuild_rating_aggregates
 from library.tasks import (
     task_sync_book_reviews_to_neo4j,
     task_sync_user_recommendations,
@@ -35,6 +35,7 @@ def setup_function(_: object) -> None:
     BookRepository.reset()
     User.objects.reset()
     get_reviews_collection().delete_many({})
+    rebuild_rating_aggregates()
     reset_graph_state()
 
 
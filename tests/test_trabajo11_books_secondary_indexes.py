@@ -0,0 +1,92 @@
+"""Tests asociados al Trabajo11 (índices secundarios del repositorio de libros)."""
+from __future__ import annotations
+
+import os
+
+import django
+import pytest
+from django.conf import settings
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+from library.models import Book, BookRepository  # noqa: E402
+
+
+def setup_function(_: object) -> None:
+    BookRepository.reset()
+
+
+def test_trabajo11_find_by_isbn_ignora_guiones_y_mayusculas():
+    book = BookRepository.create(title="Rayuela", author="Julio Cortázar", isbn="978-84-376-0494-x")
+    BookRepository.create(title="Otro", author="Otra", isbn="9780000000000")
+
+    assert BookRepository.find_by_isbn("978843760494X") == [book]
+    assert BookRepository.find_by_isbn("0000") == []
+
+
+def test_trabajo11_find_by_author_es_insensible_a_mayusculas():
+    first = BookRepository.create(title="Ficciones", author="Jorge Luis Borges")
+    second = BookRepository.create(title="El Aleph", author="jorge  luis borges")
+    BookRepository.create(title="Rayuela", author="Julio Cortázar")
+
+    assert BookRepository.find_by_author("JORGE LUIS BORGES") == [first, second]
+
+
+def test_trabajo11_find_by_year_range_devuelve_orden_por_anio():
+    old = BookRepository.create(title="Viejo", author="A", published_year=1950)
+    new = BookRepository.create(title="Nuevo", author="B", published_year=2020)
+    mid = BookRepository.create(title="Medio", author="C", published_year=1980)
+    BookRepository.create(title="Sin año", author="D")
+
+    assert BookRepository.find_by_year_range(1950, 1980) == [old, mid]
+    assert BookRepository.find_by_year_range(start=1981) == [new]
+    assert BookRepository.find_by_year_range(end=1949) == []
+    assert BookRepository.find_by_year_range() == [old, mid, new]
+
+
+def test_trabajo11_update_y_delete_mantienen_indices():
+    book = BookRepository.create(title="Libro", author="Autora", published_year=2000, isbn="111")
+
+    book = BookRepository.update(book.id, author="Otra Autora", published_year=2010, isbn="222")
+
+    assert BookRepository.find_by_author("Autora") == []
+    assert BookRepository.find_by_author("otra autora") == [book]
+    assert BookRepository.find_by_isbn("111") == []
+    assert BookRepository.find_by_isbn("222") == [book]
+    assert BookRepository.find_by_year_range(2000, 2000) == []
+    assert BookRepository.find_by_year_range(2010, 2010) == [book]
+
+    BookRepository.delete(book.id)
+
+    assert BookRepository.find_by_author("otra autora") == []
+    assert BookRepository.find_by_isbn("222") == []
+    assert BookRepository.find_by_year_range() == []
+
+
+def test_trabajo11_update_con_campo_desconocido_no_toca_los_indices():
+    book = BookRepository.create(title="Indexado", author="Autora", isbn="111")
+
+    with pytest.raises(AttributeError):
+        BookRepository.update(book.id, bogus=1)
+
+    assert BookRepository.find_by_isbn("111") == [book]
+    assert BookRepository.search("indexado") == [book]
+
+
+def test_trabajo11_replace_all_y_reset_reconstruyen_indices():
+    book = Book(title="Importado", author="Autor", published_year=1999, isbn="333")
+    book.id = 7
+    BookRepository.create(title="Descartado", author="Autor", isbn="444")
+
+    BookRepository.replace_all([book])
+
+    assert BookRepository.find_by_isbn("444") == []
+    assert BookRepository.find_by_isbn("333") == [book]
+    assert BookRepository.find_by_author("autor") == [book]
+
+    BookRepository.reset()
+
+    assert BookRepository.find_by_isbn("333") == []
+    assert BookRepository.find_by_year_range() == []
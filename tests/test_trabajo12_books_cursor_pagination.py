@@ -0,0 +1,95 @@
+"""Tests asociados al Trabajo12 (paginación por cursor del listado de libros)."""
+from __future__ import annotations
+
+import json
+import os
+
+import django
+from django.conf import settings
+from django.http import HttpRequest
+from django.urls import resolve
+
+from library.models import Book, BookRepository
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+
+def setup_function(_: object) -> None:
+    BookRepository.reset()
+
+
+def _get(path: str, params: dict | None = None):
+    route = resolve(path)
+    request = HttpRequest(method="GET", path=path, GET=params or {})
+    return route.callback(request, **route.kwargs)
+
+
+def test_trabajo12_list_page_recorre_todo_el_catalogo():
+    books = [BookRepository.create(title=f"Libro {i}", author="Autor") for i in range(5)]
+    BookRepository.delete(books[2].id)
+
+    first, cursor = BookRepository.list_page(limit=2)
+    second, cursor_2 = BookRepository.list_page(after=cursor, limit=2)
+
+    assert first == books[:2]
+    assert second == books[3:5]
+    assert cursor_2 is None
+    assert BookRepository.list_page(after=books[-1].id, limit=2) == ([], None)
+
+
+def test_trabajo12_list_all_mantiene_orden_tras_replace_all():
+    later = Book(title="B", author="Autor")
+    later.id = 9
+    earlier = Book(title="A", author="Autor")
+    earlier.id = 3
+
+    BookRepository.replace_all([later, earlier])
+    created = BookRepository.create(title="C", author="Autor")
+
+    assert [book.id for book in BookRepository.list_all()] == [3, 9, created.id]
+    assert created.id == 10
+
+
+def test_trabajo12_endpoint_paginado_devuelve_next_cursor():
+    for i in range(3):
+        BookRepository.create(title=f"Libro {i}", author="Autor")
+
+    response = _get("/api/books/", {"limit": "2"})
+
+    assert response.status_code == 200
+    payload = json.loads(response.content)
+    assert [entry["title"] for entry in payload["results"]] == ["Libro 0", "Libro 1"]
+    assert payload["next_cursor"] == "2"
+
+    response = _get("/api/books/", {"limit": "2", "cursor": payload["next_cursor"]})
+
+    payload = json.loads(response.content)
+    assert [entry["title"] for entry in payload["results"]] == ["Libro 2"]
+    assert payload["next_cursor"] is None
+
+
+def test_trabajo12_endpoint_sin_parametros_devuelve_lista_completa():
+    BookRepository.create(title="Único", author="Autor")
+
+    payload = json.loads(_get("/api/books/").content)
+
+    assert isinstance(payload, list)
+    assert payload[0]["title"] == "Único"
+
+
+def test_trabajo12_endpoint_rechaza_cursor_y_limit_invalidos():
+    response = _get("/api/books/", {"cursor": "abc", "limit": "0"})
+
+    assert response.status_code == 400
+    payload = json.loads(response.content)
+    assert set(payload["errors"]) == {"cursor", "limit"}
+
+
+def test_trabajo12_digitos_unicode_devuelven_400():
+    response = _get("/api/books/", {"cursor": "²", "limit": "²"})
+
+    assert response.status_code == 400
+    assert set(json.loads(response.content)["errors"]) == {"cursor", "limit"}
+    assert _get("/api/books/changes/", {"since": "²"}).status_code == 400
@@ -0,0 +1,95 @@
+"""Tests asociados al Trabajo13 (búsqueda de texto completo sobre libros)."""
+from __future__ import annotations
+
+import json
+import os
+
+import django
+from django.conf import settings
+from django.http import HttpRequest
+from django.urls import resolve
+
+from library.models import BookRepository
+from library.search_index import InvertedIndex, tokenize
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+
+def setup_function(_: object) -> None:
+    BookRepository.reset()
+
+
+def _get(path: str, params: dict | None = None):
+    route = resolve(path)
+    request = HttpRequest(method="GET", path=path, GET=params or {})
+    return route.callback(request, **route.kwargs)
+
+
+def test_trabajo13_tokenize_elimina_acentos_y_mayusculas():
+    assert tokenize("Cien años de Soledad, García Márquez") == [
+        "cien",
+        "anos",
+        "de",
+        "soledad",
+        "garcia",
+        "marquez",
+    ]
+
+
+def test_trabajo13_inverted_index_ordena_por_frecuencia():
+    index = InvertedIndex()
+    index.add(1, ("El mar", "Autor"))
+    index.add(2, ("Mar y mar", "Marina"))
+    index.add(3, ("Tierra", "Autor"))
+
+    assert index.search("mar") == [(2, 3), (1, 1)]
+    assert index.search("mar autor") == [(1, 2)]
+    assert index.search("") == []
+
+    index.remove(2, ("Mar y mar", "Marina"))
+
+    assert index.search("mar") == [(1, 1)]
+    assert len(index) == 4
+
+
+def test_trabajo13_search_por_prefijo_y_sin_acentos():
+    rayuela = BookRepository.create(title="Rayuela", author="Julio Cortázar")
+    BookRepository.create(title="Ficciones", author="Jorge Luis Borges")
+
+    assert BookRepository.search("cortaz ray") == [rayuela]
+    assert BookRepository.search("CORTÁZAR") == [rayuela]
+    assert BookRepository.search("saramago") == []
+
+
+def test_trabajo13_search_sigue_las_mutaciones_del_repositorio():
+    book = BookRepository.create(title="La ciudad", author="Autora")
+
+    book = BookRepository.update(book.id, title="El pueblo")
+
+    assert BookRepository.search("ciudad") == []
+    assert BookRepository.search("pueblo") == [book]
+
+    BookRepository.delete(book.id)
+
+    assert BookRepository.search("pueblo") == []
+
+
+def test_trabajo13_endpoint_search_devuelve_resultados():
+    BookRepository.create(title="Niebla", author="Miguel de Unamuno")
+    BookRepository.create(title="Don Quijote", author="Miguel de Cervantes")
+
+    response = _get("/api/books/search/", {"q": "miguel quij"})
+
+    assert response.status_code == 200
+    payload = json.loads(response.content)
+    assert payload["query"] == "miguel quij"
+    assert [entry["title"] for entry in payload["results"]] == ["Don Quijote"]
+
+
+def test_trabajo13_endpoint_search_sin_q_devuelve_400():
+    response = _get("/api/books/search/")
+
+    assert response.status_code == 400
+    assert "q" in json.loads(response.content)["errors"]
@@ -0,0 +1,160 @@
+"""Tests asociados al Trabajo14 (almacenamiento columnar del repositorio de libros)."""
+from __future__ import annotations
+
+import os
+
+import django
+import pytest
+from django.conf import settings
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+from library.book_storage import ColumnarBookStore, SortedPairs, from_epoch_micros, to_epoch_micros  # noqa: E402
+from library.models import Book, BookRepository  # noqa: E402
+from library.search_index import InvertedIndex  # noqa: E402
+
+
+def setup_function(_: object) -> None:
+    BookRepository.use_storage("columnar")
+    BookRepository.reset()
+
+
+def teardown_function(_: object) -> None:
+    BookRepository.use_storage("dict")
+    BookRepository.reset()
+
+
+def test_trabajo14_epoch_micros_ida_y_vuelta():
+    book = Book(title="Reloj", author="Autor")
+
+    assert from_epoch_micros(to_epoch_micros(book.created_at)) == book.created_at
+
+
+def test_trabajo14_repositorio_columnar_conserva_api_publica():
+    book = BookRepository.create(
+        title="Pedro Páramo",
+        author="Juan Rulfo",
+        published_year=1955,
+        isbn="978-84-376-0000-1",
+        created_by="lectora",
+    )
+    BookRepository.create(title="Sin año", author="Juan Rulfo")
+
+    stored = BookRepository.get(book.id)
+
+    assert isinstance(BookRepository._records, ColumnarBookStore)
+    assert stored == book
+    assert [entry.title for entry in BookRepository.list_all()] == ["Pedro Páramo", "Sin año"]
+    assert BookRepository.list_all()[1].published_year is None
+    assert BookRepository.find_by_author("juan rulfo")[0].id == book.id
+    assert BookRepository.search("paramo")[0].id == book.id
+
+
+def test_trabajo14_update_y_delete_en_columnar():
+    book = BookRepository.create(title="Antes", author="Autora", isbn="1")
+
+    updated = BookRepository.update(book.id, title="Después", isbn=None)
+
+    assert BookRepository.get(book.id).title == "Después"
+    assert BookRepository.get(book.id).isbn is None
+    assert BookRepository.get(book.id).updated_at == updated.updated_at
+
+    BookRepository.delete(book.id)
+
+    with pytest.raises(LookupError):
+        BookRepository.get(book.id)
+    assert BookRepository.list_all() == []
+
+
+def test_trabajo14_updates_no_hacen_crecer_el_buffer_de_cadenas():
+    book = BookRepository.create(title="Un título largo", author="Autora", isbn="978-1")
+    for index in range(50):
+        BookRepository.create(title=f"Relleno {index}", author="Autora")
+    before = BookRepository._records.nbytes()
+
+    for year in range(1000):
+        BookRepository.update(book.id, published_year=year)
+    assert BookRepository._records.nbytes() == before
+
+    for index in range(1000):
+        BookRepository.update(book.id, title=f"Título {index:04d}")
+    assert BookRepository._records.nbytes() < before * 2
+    assert BookRepository.get(book.id).title == "Título 0999"
+    assert BookRepository.get(book.id).isbn == "978-1"
+    assert BookRepository.list_all()[1].title == "Relleno 0"
+
+
+def test_trabajo14_store_compacta_filas_borradas_y_admite_ids_desordenados():
+    books = []
+    for book_id in (5, 1, 3, 2, 4):
+        book = Book(title=f"Libro {book_id}", author="Autor")
+        book.id = book_id
+        books.append(book)
+    store = ColumnarBookStore(Book, books[:3])
+    store[2] = books[3]
+    store[4] = books[4]
+
+    for book_id in (1, 2, 3):
+        del store[book_id]
+
+    assert list(store) == [4, 5]
+    assert len(store) == 2
+    assert 1 not in store
+    assert [book.title for book in store.values()] == ["Libro 4", "Libro 5"]
+
+
+def test_trabajo14_use_storage_migra_los_datos_existentes():
+    BookRepository.create(title="Migrado", author="Autor")
+
+    BookRepository.use_storage("dict")
+
+    assert isinstance(BookRepository._records, dict)
+    assert BookRepository.list_all()[0].title == "Migrado"
+    with pytest.raises(ValueError):
+        BookRepository.use_storage("rocksdb")
+
+
+def test_trabajo14_sorted_pairs_ordena_filtra_y_recorta():
+    pairs = SortedPairs([(2001, 7), (1999, 3), (2001, 2)])
+    pairs.add(2000, 5)
+    pairs.extend([(1999, 1), (2005, 9)])
+    pairs.remove(2001, 7)
+    pairs.remove(2001, 99)
+
+    assert list(pairs) == [(1999, 1), (1999, 3), (2000, 5), (2001, 2), (2005, 9)]
+    assert pairs.ids_between(2000, 2001) == [5, 2]
+    assert pairs.ids_between(high=1999) == [1, 3]
+    assert pairs.items_from(2001) == [(2001, 2), (2005, 9)]
+    assert pairs.drop_first(2) == 1999
+    assert len(pairs) == 3
+    assert pairs.nbytes() == 3 * 16
+
+
+def test_trabajo14_indices_secundarios_compactos_conservan_resultados():
+    first = BookRepository.create(title="Rayuela", author="Julio Cortázar", published_year=1963, isbn="84-376-0494-X")
+    second = BookRepository.create(title="Bestiario", author="Julio Cortázar", published_year=1951, isbn="84-376-0494-X")
+    third = BookRepository.create(title="Ficciones", author="Borges", published_year=1944)
+
+    assert isinstance(BookRepository._year_index, SortedPairs)
+    assert BookRepository._author_index["borges"] == third.id
+    assert [book.id for book in BookRepository.find_by_isbn("84-376-0494-X")] == [first.id, second.id]
+    BookRepository.delete(second.id)
+    assert BookRepository._isbn_index[next(iter(BookRepository._isbn_index))] == first.id
+    assert [book.id for book in BookRepository.find_by_author("Julio Cortázar")] == [first.id]
+    assert [book.id for book in BookRepository.find_by_year_range(1940, 1960)] == [third.id]
+
+
+def test_trabajo14_indice_invertido_guarda_postings_unicos_como_id():
+    index = InvertedIndex()
+    index.add(1, ["gato gato", "perro"])
+    index.add(2, ["perro"])
+
+    assert index._postings["perro"] == {1: 1, 2: 1}
+    assert index._postings["gato"] == {1: 2}
+    index.remove(2, ["perro"])
+    assert index._postings["perro"] == 1
+    assert index.search("gat perr") == [(1, 3)]
+    index.remove(1, ["gato gato", "perro"])
+    assert len(index) == 0
@@ -0,0 +1,129 @@
+"""Tests asociados al Trabajo15 (operaciones masivas sobre libros)."""
+from __future__ import annotations
+
+import json
+import os
+
+import django
+import pytest
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.http import HttpRequest
+from django.urls import resolve
+
+from library.models import BookRepository
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+
+def setup_function(_: object) -> None:
+    BookRepository.reset()
+    User.objects.reset()
+
+
+def _post_bulk(body: object, user: User | None = None):
+    route = resolve("/api/books/bulk/")
+    request = HttpRequest(
+        method="POST",
+        path="/api/books/bulk/",
+        body=json.dumps(body).encode("utf-8"),
+        user=user or AnonymousUser(),
+    )
+    return route.callback(request, **route.kwargs)
+
+
+def _make_user(username: str = "importer") -> User:
+    return User.objects.create_user(username=username, password="segura")
+
+
+def test_trabajo15_bulk_create_comparte_timestamp_e_indices():
+    books = BookRepository.bulk_create(
+        [
+            {"title": "Uno", "author": "Autora", "published_year": 2001},
+            {"title": "Dos", "author": "Autora", "created_by": "otra"},
+        ],
+        created_by="importer",
+    )
+
+    assert [book.id for book in books] == [1, 2]
+    assert books[0].created_at == books[1].created_at
+    assert [book.created_by for book in books] == ["importer", "otra"]
+    assert BookRepository.find_by_author("autora") == books
+    assert BookRepository.find_by_year_range(2001, 2001) == [books[0]]
+    assert BookRepository.search("dos") == [books[1]]
+    assert BookRepository.create(title="Tres", author="X").id == 3
+
+
+def test_trabajo15_bulk_create_con_item_invalido_no_guarda_nada():
+    BookRepository.create(title="Previo", author="A")
+
+    with pytest.raises(TypeError):
+        BookRepository.bulk_create([{"title": "Uno", "author": "A"}, {"title": "Dos", "author": "A", "editorial": "X"}])
+
+    assert len(BookRepository._records) == 1
+    assert [book.title for book in BookRepository.list_all()] == ["Previo"]
+    assert BookRepository.create(title="Siguiente", author="A").id == 2
+
+
+def test_trabajo15_bulk_update_con_campo_desconocido_no_aplica_nada():
+    book = BookRepository.create(title="Indexado", author="Autora", isbn="111")
+    other = BookRepository.create(title="Otro", author="Autora")
+
+    with pytest.raises(AttributeError):
+        BookRepository.bulk_update([(other.id, {"title": "Cambiado"}), (book.id, {"bogus": 1})])
+
+    assert BookRepository.find_by_isbn("111") == [book]
+    assert BookRepository.get(other.id).title == "Otro"
+    assert BookRepository.search("cambiado") == []
+    twice = BookRepository.bulk_update([(other.id, {"title": "Uno"}), (other.id, {"author": "Dos"})])
+    assert (twice[1].title, twice[1].author, twice[1].version) == ("Uno", "Dos", 3)
+    assert BookRepository.find_by_author("dos") == [twice[1]]
+
+
+def test_trabajo15_bulk_update_y_bulk_delete_devuelven_resultado_por_item():
+    first = BookRepository.create(title="Uno", author="A")
+    second = BookRepository.create(title="Dos", author="B")
+
+    updated = BookRepository.bulk_update([(first.id, {"title": "Uno bis"}), (99, {"title": "X"})])
+
+    assert updated[0].title == "Uno bis" and updated[1] is None
+    assert first.title == "Uno"
+    assert BookRepository.search("bis") == [updated[0]]
+
+    assert BookRepository.bulk_delete([second.id, 99, second.id]) == [True, False, False]
+    assert BookRepository.list_all() == [updated[0]]
+
+
+def test_trabajo15_endpoint_bulk_aplica_operaciones_y_reporta_errores():
+    existing = BookRepository.create(title="Viejo", author="Autor")
+    removable = BookRepository.create(title="Borrar", author="Autor")
+
+    response = _post_bulk(
+        {
+            "create": [{"title": "Nuevo", "author": "Autora"}, {"author": "Sin título"}, "x"],
+            "update": [{"id": existing.id, "title": "Renovado"}, {"id": 999, "title": "Nada"}, {"title": "?"}],
+            "delete": [removable.id, 999],
+        },
+        user=_make_user(),
+    )
+
+    assert response.status_code == 200
+    payload = json.loads(response.content)
+    assert [item["status"] for item in payload["create"]] == [201, 400, 400]
+    assert payload["create"][0]["book"]["created_by"] == "importer"
+    assert "title" in payload["create"][1]["errors"]
+    assert [item["status"] for item in payload["update"]] == [200, 404, 400]
+    assert payload["update"][0]["book"]["title"] == "Renovado"
+    assert [item["status"] for item in payload["delete"]] == [204, 404]
+    assert [book.title for book in BookRepository.list_all()] == ["Renovado", "Nuevo"]
+
+
+def test_trabajo15_endpoint_bulk_requiere_autenticacion_y_listas():
+    assert _post_bulk({"create": []}).status_code == 401
+
+    response = _post_bulk({"create": {"title": "x"}}, user=_make_user())
+
+    assert response.status_code == 400
+    assert "create" in json.loads(response.content)["errors"]
@@ -0,0 +1,101 @@
+"""Tests asociados al Trabajo16 (snapshots binarios del repositorio de libros)."""
+from __future__ import annotations
+
+import os
+
+import django
+import pytest
+from django.conf import settings
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+from library.book_snapshot import SnapshotError  # noqa: E402
+from library.models import BookRepository  # noqa: E402
+
+
+def setup_function(_: object) -> None:
+    BookRepository.reset()
+
+
+def teardown_function(_: object) -> None:
+    BookRepository.use_storage("dict")
+    BookRepository.reset()
+
+
+def _sample_books():
+    first = BookRepository.create(
+        title="Cien años de soledad",
+        author="Gabriel García Márquez",
+        published_year=1967,
+        isbn="978-0-06-088328-7",
+        created_by="bibliotecaria",
+    )
+    second = BookRepository.create(title="Anónimo", author="Desconocido")
+    return first, second
+
+
+def test_trabajo16_dump_y_load_restauran_el_estado(tmp_path):
+    first, second = _sample_books()
+    removed = BookRepository.create(title="Borrado", author="Nadie")
+    BookRepository.delete(removed.id)
+    path = tmp_path / "books.snap"
+
+    assert BookRepository.dump_snapshot(path) == 2
+    BookRepository.reset()
+    assert BookRepository.load_snapshot(path) == 2
+
+    assert BookRepository.list_all() == [first, second]
+    assert BookRepository.get(second.id).published_year is None
+    assert BookRepository.get(second.id).isbn is None
+    assert BookRepository.find_by_isbn("9780060883287") == [first]
+    assert BookRepository.search("garcia") == [first]
+    assert BookRepository.create(title="Nuevo", author="Autor").id == removed.id + 1
+
+
+def test_trabajo16_load_snapshot_con_almacenamiento_columnar(tmp_path):
+    first, second = _sample_books()
+    path = tmp_path / "books.snap"
+    BookRepository.dump_snapshot(path)
+
+    BookRepository.use_storage("columnar")
+    BookRepository.reset()
+    BookRepository.load_snapshot(path)
+
+    assert BookRepository.list_all() == [first, second]
+
+
+def test_trabajo16_replace_all_masivo_indexa_una_vez_cada_id():
+    BookRepository.use_storage("columnar")
+    first, second = _sample_books()
+    renamed = BookRepository.get(first.id)
+    renamed.title = "Crónica de una muerte anunciada"
+
+    BookRepository.replace_all([first, second, renamed])
+
+    assert [book.title for book in BookRepository.list_all()] == [renamed.title, second.title]
+    assert BookRepository.search("cronica") == [renamed]
+    assert BookRepository.search("soledad") == []
+    assert BookRepository.find_by_isbn("9780060883287") == [renamed]
+    assert BookRepository.find_by_year_range(1960, 1970) == [renamed]
+
+
+def test_trabajo16_snapshot_vacio_y_corrupto(tmp_path):
+    path = tmp_path / "empty.snap"
+    BookRepository.dump_snapshot(path)
+
+    assert BookRepository.load_snapshot(path) == 0
+
+    broken = tmp_path / "broken.snap"
+    _sample_books()
+    BookRepository.dump_snapshot(broken)
+    broken.write_bytes(broken.read_bytes()[:-5])
+
+    with pytest.raises(SnapshotError):
+        BookRepository.load_snapshot(broken)
+
+    broken.write_bytes(b"NOTASNAP" + bytes(16))
+
+    with pytest.raises(SnapshotError):
+        BookRepository.load_snapshot(broken)
@@ -0,0 +1,188 @@
+"""Tests asociados al Trabajo17 (write-ahead log y compactación del repositorio)."""
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+import django
+from django.conf import settings
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+from library import book_wal  # noqa: E402
+from library.book_wal import COMPACTING_SUFFIX, CompactionThread, WriteAheadLog, read_entries  # noqa: E402
+from library.concurrency import ReadWriteLock  # noqa: E402
+from library.models import BookRepository  # noqa: E402
+
+
+def setup_function(_: object) -> None:
+    BookRepository.reset()
+
+
+def teardown_function(_: object) -> None:
+    BookRepository.disable_wal()
+    BookRepository.set_thread_safe(False)
+    BookRepository.reset()
+
+
+def test_trabajo17_mutaciones_se_recuperan_desde_el_wal(tmp_path):
+    wal_path = tmp_path / "books.wal"
+    BookRepository.enable_wal(wal_path)
+    kept = BookRepository.create(title="Guardado", author="Autora", published_year=2001)
+    removed = BookRepository.create(title="Borrado", author="Autor")
+    BookRepository.update(kept.id, title="Guardado bis")
+    BookRepository.delete(removed.id)
+    BookRepository.bulk_create([{"title": "Lote", "author": "Autor"}])
+    BookRepository.disable_wal()
+    expected = BookRepository.list_all()
+
+    BookRepository.reset()
+    replayed = BookRepository.recover(tmp_path / "missing.snap", wal_path)
+
+    assert replayed == 5
+    assert BookRepository.list_all() == expected
+    assert BookRepository.search("bis")[0].id == kept.id
+    assert BookRepository.create(title="Siguiente", author="X").id == 4
+
+
+def test_trabajo17_group_commit_escribe_por_lotes(tmp_path):
+    wal = WriteAheadLog(tmp_path / "group.wal", batch_size=3, max_delay=60)
+    try:
+        wal.append({"op": "delete", "id": 1})
+        wal.append({"op": "delete", "id": 2})
+        assert wal.size() == 0
+
+        wal.append({"op": "delete", "id": 3})
+        assert wal.size() > 0
+        assert [entry["id"] for entry in read_entries(wal.path)] == [1, 2, 3]
+    finally:
+        wal.close()
+
+
+def test_trabajo17_mutacion_vuelve_con_su_entrada_en_disco(tmp_path):
+    wal_path = tmp_path / "durable.wal"
+    BookRepository.enable_wal(wal_path, batch_size=1000, max_delay=60)
+
+    book = BookRepository.create(title="Confirmado", author="Autora")
+    assert [entry["book"]["id"] for entry in read_entries(wal_path)] == [book.id]
+
+    BookRepository.delete(book.id)
+    assert [entry["op"] for entry in read_entries(wal_path)] == ["put", "delete"]
+
+
+def test_trabajo17_escritores_concurrentes_comparten_fsync(tmp_path, monkeypatch):
+    fsyncs = []
+    original = book_wal.os.fsync
+
+    def slow_fsync(descriptor):
+        fsyncs.append(descriptor)
+        time.sleep(0.005)
+        original(descriptor)
+
+    monkeypatch.setattr(book_wal.os, "fsync", slow_fsync)
+    BookRepository.set_thread_safe(True)
+    wal_path = tmp_path / "shared.wal"
+    BookRepository.enable_wal(wal_path, batch_size=1000, max_delay=60)
+
+    def writer(index):
+        for number in range(10):
+            BookRepository.create(title=f"Hilo {index}-{number}", author="Autor")
+
+    threads = [threading.Thread(target=writer, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(list(read_entries(wal_path))) == 80
+    assert len(fsyncs) < 80
+
+
+def test_trabajo17_flusher_respeta_max_delay(tmp_path):
+    wal = WriteAheadLog(tmp_path / "delay.wal", batch_size=1000, max_delay=0.01)
+    try:
+        wal.append({"op": "reset"})
+        deadline = time.monotonic() + 2
+        while wal.size() == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert wal.size() > 0
+    finally:
+        wal.close()
+
+
+def test_trabajo17_cola_corrupta_se_descarta_y_trunca(tmp_path):
+    wal_path = tmp_path / "torn.wal"
+    BookRepository.enable_wal(wal_path, batch_size=1)
+    BookRepository.create(title="Intacto", author="Autor")
+    BookRepository.disable_wal()
+    with open(wal_path, "ab") as handle:
+        handle.write(b"\x10\x00\x00\x00garbage")
+
+    BookRepository.reset()
+    assert BookRepository.recover(tmp_path / "none.snap", wal_path) == 1
+
+    BookRepository.enable_wal(wal_path, batch_size=1)
+    BookRepository.create(title="Tras el corte", author="Autor")
+    BookRepository.disable_wal()
+
+    assert [entry["book"]["title"] for entry in read_entries(wal_path)] == ["Intacto", "Tras el corte"]
+
+
+def test_trabajo17_compact_wal_genera_snapshot_y_vacia_el_log(tmp_path):
+    wal_path = tmp_path / "books.wal"
+    snapshot_path = tmp_path / "books.snap"
+    BookRepository.enable_wal(wal_path)
+    BookRepository.create(title="Uno", author="Autor")
+    BookRepository.create(title="Dos", author="Autor")
+
+    assert BookRepository.compact_wal(snapshot_path) == 2
+    assert os.path.getsize(wal_path) == 0
+    assert not os.path.exists(f"{wal_path}{COMPACTING_SUFFIX}")
+
+    BookRepository.update(1, title="Uno bis")
+    BookRepository.disable_wal()
+    BookRepository.reset()
+
+    assert BookRepository.recover(snapshot_path, wal_path) == 1
+    assert [book.title for book in BookRepository.list_all()] == ["Uno bis", "Dos"]
+
+
+def test_trabajo17_compactacion_en_segundo_plano(tmp_path):
+    wal_path = tmp_path / "bg.wal"
+    snapshot_path = tmp_path / "bg.snap"
+    BookRepository.enable_wal(wal_path, batch_size=1)
+    BookRepository.create(title="Fondo", author="Autor")
+
+    BookRepository.start_background_compaction(snapshot_path, interval=0.01, min_bytes=1)
+    deadline = time.monotonic() + 2
+    while not snapshot_path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert snapshot_path.exists()
+    assert isinstance(BookRepository._lock, ReadWriteLock)
+
+
+def test_trabajo17_compactacion_sobrevive_a_un_error(tmp_path):
+    wal = WriteAheadLog(tmp_path / "error.wal", batch_size=1)
+    calls = []
+
+    def compact():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise OSError("disco lleno")
+
+    wal.append({"op": "reset"})
+    thread = CompactionThread(wal, compact, interval=0.01, min_bytes=1)
+    thread.start()
+    try:
+        deadline = time.monotonic() + 2
+        while len(calls) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(calls) >= 2
+        assert thread.is_alive()
+    finally:
+        thread.stop()
+        wal.close()
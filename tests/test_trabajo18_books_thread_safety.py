@@ -0,0 +1,96 @@
+"""Tests asociados al Trabajo18 (acceso concurrente seguro al repositorio de libros)."""
+from __future__ import annotations
+
+import os
+import threading
+
+import django
+import pytest
+from django.conf import settings
+
+from library.concurrency import ReadWriteLock
+from library.models import BookRepository
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+
+def setup_function(_: object) -> None:
+    BookRepository.set_thread_safe(True)
+    BookRepository.reset()
+
+
+def teardown_function(_: object) -> None:
+    BookRepository.set_thread_safe(False)
+    BookRepository.reset()
+
+
+def test_trabajo18_lock_es_reentrante_y_permite_leer_al_escritor():
+    lock = ReadWriteLock()
+
+    with lock.write():
+        with lock.write():
+            with lock.read():
+                pass
+    with lock.read():
+        with lock.read():
+            with pytest.raises(RuntimeError):
+                lock.acquire_write()
+
+
+def test_trabajo18_escritor_espera_a_los_lectores():
+    lock = ReadWriteLock()
+    events: list = []
+    lock.acquire_read()
+    writer = threading.Thread(target=lambda: (lock.acquire_write(), events.append("write"), lock.release_write()))
+    writer.start()
+    writer.join(0.05)
+
+    assert events == []
+
+    lock.release_read()
+    writer.join(2)
+    assert events == ["write"]
+
+
+def test_trabajo18_creaciones_concurrentes_asignan_ids_unicos():
+    errors: list = []
+
+    def worker(slot: int) -> None:
+        try:
+            for index in range(200):
+                book = BookRepository.create(title=f"Libro {slot}-{index}", author=f"Autor {slot}")
+                if index % 3 == 0:
+                    BookRepository.update(book.id, published_year=2000 + slot)
+                if index % 5 == 0:
+                    BookRepository.delete(book.id)
+                BookRepository.list_page(limit=10)
+                BookRepository.search("libro")
+        except Exception as exc:  # pragma: no cover - only reached on failure
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(slot,)) for slot in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    books = BookRepository.list_all()
+    assert errors == []
+    assert len(books) == 6 * 160
+    assert len({book.id for book in books}) == len(books)
+    assert list(BookRepository._ordered_ids) == sorted(BookRepository._records)
+    assert len(BookRepository.find_by_year_range()) == 6 * 53
+
+
+def test_trabajo18_update_no_modifica_libros_ya_entregados():
+    book = BookRepository.create(title="Original", author="Autora")
+    listed = BookRepository.list_all()[0]
+
+    updated = BookRepository.update(book.id, title="Revisado")
+    BookRepository.bulk_update([(book.id, {"title": "Revisado otra vez"})])
+
+    assert (listed.title, listed.version) == ("Original", 1)
+    assert (updated.title, updated.version) == ("Revisado", 2)
+    assert BookRepository.get(book.id).version == 3
@@ -0,0 +1,169 @@
+"""Tests asociados al Trabajo19 (ETags y peticiones condicionales en libros)."""
+from __future__ import annotations
+
+import json
+import os
+
+import django
+import pytest
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.http import HttpRequest
+from django.urls import resolve
+
+from library.models import BookRepository, BookVersionConflict
+from library.reviews_service import create_review, get_reviews_collection, rebuild_rating_aggregates
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+
+def setup_function(_: object) -> None:
+    BookRepository.reset()
+    User.objects.reset()
+    get_reviews_collection().delete_many({})
+    rebuild_rating_aggregates()
+
+
+def _call(
+    path: str,
+    *,
+    method: str = "GET",
+    body: dict | None = None,
+    user: User | None = None,
+    headers: dict | None = None,
+):
+    route = resolve(path)
+    request = HttpRequest(
+        method=method,
+        path=path,
+        body=json.dumps(body).encode("utf-8") if body is not None else None,
+        user=user or AnonymousUser(),
+        headers=headers or {},
+    )
+    return route.callback(request, **route.kwargs)
+
+
+def test_trabajo19_update_incrementa_version_y_respeta_expected_version():
+    book = BookRepository.create(title="Versión", author="Autor")
+    assert book.version == 1
+
+    BookRepository.update(book.id, title="Versión 2")
+
+    assert BookRepository.get(book.id).version == 2
+    with pytest.raises(BookVersionConflict):
+        BookRepository.update(book.id, expected_version=1, title="Perdida")
+    assert BookRepository.get(book.id).title == "Versión 2"
+
+
+def test_trabajo19_detalle_devuelve_304_con_if_none_match():
+    book = BookRepository.create(title="Cacheable", author="Autor")
+
+    first = _call(f"/api/books/{book.id}/")
+    etag = first.headers["ETag"]
+    second = _call(f"/api/books/{book.id}/", headers={"If-None-Match": etag})
+
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["ETag"] == etag
+
+
+def test_trabajo19_etag_del_detalle_cambia_con_ediciones_y_resenas():
+    book = BookRepository.create(title="Cambiante", author="Autor")
+    etag = _call(f"/api/books/{book.id}/").headers["ETag"]
+
+    create_review(book_id=book.id, user_id=1, username="lector", rating=4)
+    after_review = _call(f"/api/books/{book.id}/", headers={"if-none-match": etag})
+
+    assert after_review.status_code == 200
+    assert after_review.headers["ETag"] != etag
+
+    BookRepository.update(book.id, title="Cambiado")
+    after_update = _call(f"/api/books/{book.id}/", headers={"If-None-Match": after_review.headers["ETag"]})
+
+    assert after_update.status_code == 200
+
+
+def test_trabajo19_listado_devuelve_304_hasta_que_cambia_el_catalogo():
+    BookRepository.create(title="Uno", author="Autor")
+    etag = _call("/api/books/").headers["ETag"]
+
+    assert _call("/api/books/", headers={"If-None-Match": f'W/{etag}, "otro"'}).status_code == 304
+
+    BookRepository.create(title="Dos", author="Autor")
+
+    response = _call("/api/books/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(json.loads(response.content)) == 2
+
+
+def test_trabajo19_parametros_invalidos_devuelven_400_aunque_coincida_el_etag():
+    BookRepository.create(title="Uno", author="Autor")
+    etag = _call("/api/books/").headers["ETag"]
+    route = resolve("/api/books/")
+
+    for params in ({"limit": "abc"}, {"cursor": "-1"}, {"updated_since": "basura"}, {"fields": "precio"}):
+        request = HttpRequest(path="/api/books/", user=AnonymousUser(), GET=params, headers={"If-None-Match": etag})
+        assert route.callback(request).status_code == 400, params
+    request = HttpRequest(path="/api/books/", user=AnonymousUser(), GET={"limit": "1"}, headers={"If-None-Match": etag})
+    assert route.callback(request).status_code == 304
+
+
+def test_trabajo19_put_con_if_match_obsoleto_devuelve_412():
+    user = User.objects.create_user(username="editor", password="segura")
+    book = BookRepository.create(title="Original", author="Autor")
+    etag = _call(f"/api/books/{book.id}/").headers["ETag"]
+
+    ok = _call(
+        f"/api/books/{book.id}/",
+        method="PATCH",
+        body={"title": "Primera edición"},
+        user=user,
+        headers={"If-Match": etag},
+    )
+    stale = _call(
+        f"/api/books/{book.id}/",
+        method="PATCH",
+        body={"title": "Edición perdida"},
+        user=user,
+        headers={"If-Match": etag},
+    )
+
+    assert ok.status_code == 200
+    assert stale.status_code == 412
+    assert BookRepository.get(book.id).title == "Primera edición"
+
+    again = _call(
+        f"/api/books/{book.id}/",
+        method="PUT",
+        body={"title": "Segunda edición", "author": "Autor"},
+        user=user,
+        headers={"If-Match": ok.headers["ETag"]},
+    )
+    assert again.status_code == 200
+
+
+def test_trabajo19_if_match_rechaza_etags_debiles():
+    user = User.objects.create_user(username="editor", password="segura")
+    book = BookRepository.create(title="Original", author="Autor")
+    etag = _call(f"/api/books/{book.id}/").headers["ETag"]
+
+    weak = _call(
+        f"/api/books/{book.id}/",
+        method="PATCH",
+        body={"title": "Débil"},
+        user=user,
+        headers={"If-Match": f"W/{etag}"},
+    )
+    strong = _call(
+        f"/api/books/{book.id}/",
+        method="PATCH",
+        body={"title": "Fuerte"},
+        user=user,
+        headers={"If-Match": f'W/"otro", {etag}'},
+    )
+
+    assert weak.status_code == 412
+    assert strong.status_code == 200
+    assert BookRepository.get(book.id).title == "Fuerte"
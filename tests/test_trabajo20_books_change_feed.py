@@ -0,0 +1,156 @@
+"""Tests asociados al Trabajo20 (feed de cambios del repositorio de libros)."""
+from __future__ import annotations
+
+import json
+import os
+
+import django
+import pytest
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest
+from django.urls import resolve
+
+from library.book_changes import ChangeFeed, ChangeFeedExpired
+from library.models import BookRepository
+from library.neo4j_service import get_graph_snapshot, reset_graph_state
+from library.tasks import task_sync_book_changes_to_neo4j
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+
+def setup_function(_: object) -> None:
+    BookRepository.set_change_feed_capacity(10_000)
+    BookRepository.reset()
+    reset_graph_state()
+
+
+def _get(path: str, **params: str):
+    route = resolve(path)
+    request = HttpRequest(method="GET", path=path, user=AnonymousUser(), GET=params)
+    return route.callback(request, **route.kwargs)
+
+
+def test_trabajo20_change_feed_es_un_buffer_acotado():
+    feed = ChangeFeed(capacity=3)
+    for book_id in range(1, 6):
+        feed.record("put", book_id)
+
+    changes, latest = feed.since(2)
+
+    assert latest == 5
+    assert [(change.seq, change.book_id) for change in changes] == [(3, 3), (4, 4), (5, 5)]
+    assert [change.seq for change in feed.since(3, limit=1)[0]] == [4]
+    assert feed.since(5) == ([], 5)
+    with pytest.raises(ChangeFeedExpired):
+        feed.since(1)
+    with pytest.raises(ChangeFeedExpired):
+        feed.since(6)
+
+
+def test_trabajo20_mutaciones_registran_cambios_en_orden():
+    start = BookRepository.latest_change_seq()
+    first = BookRepository.create(title="Uno", author="Autor")
+    second, third = BookRepository.bulk_create([{"title": "Dos", "author": "A"}, {"title": "Tres", "author": "B"}])
+    BookRepository.update(first.id, title="Uno bis")
+    BookRepository.bulk_delete([second.id, 999])
+    BookRepository.delete(third.id)
+
+    changes, latest = BookRepository.changes_since(start)
+
+    assert latest == start + 6
+    assert [(change.op, change.book_id) for change in changes] == [
+        ("put", first.id),
+        ("put", second.id),
+        ("put", third.id),
+        ("put", first.id),
+        ("delete", second.id),
+        ("delete", third.id),
+    ]
+
+
+def test_trabajo20_endpoint_devuelve_cambios_y_estado_actual():
+    start = BookRepository.latest_change_seq()
+    book = BookRepository.create(title="Inicial", author="Autor")
+    BookRepository.update(book.id, title="Final")
+    gone = BookRepository.create(title="Efímero", author="Autor")
+    BookRepository.delete(gone.id)
+
+    response = _get("/api/books/changes/", since=str(start), limit="2")
+    payload = json.loads(response.content)
+
+    assert response.status_code == 200
+    assert [item["op"] for item in payload["changes"]] == ["put", "put"]
+    assert payload["changes"][0]["book"]["title"] == "Final"
+    assert payload["next_since"] == start + 2
+    assert payload["latest_seq"] == start + 4
+
+    rest = json.loads(_get("/api/books/changes/", since=str(payload["next_since"])).content)
+
+    assert [(item["op"], item["book_id"]) for item in rest["changes"]] == [("put", gone.id), ("delete", gone.id)]
+    assert rest["changes"][0]["book"] is None
+    assert rest["next_since"] == rest["latest_seq"]
+
+
+def test_trabajo20_endpoint_responde_410_si_los_cambios_expiraron():
+    BookRepository.set_change_feed_capacity(2)
+    start = BookRepository.latest_change_seq()
+    for index in range(3):
+        BookRepository.create(title=f"Libro {index}", author="Autor")
+
+    response = _get("/api/books/changes/", since=str(start))
+
+    assert response.status_code == 410
+    assert json.loads(response.content)["latest_seq"] == start + 3
+    assert _get("/api/books/changes/", since="abc").status_code == 400
+
+
+def test_trabajo20_since_posterior_al_ultimo_seq_responde_410():
+    BookRepository.create(title="Tras reinicio", author="Autor")
+    latest = BookRepository.latest_change_seq()
+
+    response = _get("/api/books/changes/", since=str(latest + 50))
+
+    assert response.status_code == 410
+    assert json.loads(response.content)["latest_seq"] == latest
+    assert json.loads(_get("/api/books/changes/", since=str(latest)).content)["changes"] == []
+    assert task_sync_book_changes_to_neo4j(latest + 50)["full_resync"] == 1
+
+
+def test_trabajo20_tarea_neo4j_aplica_deltas():
+    start = BookRepository.latest_change_seq()
+    kept = BookRepository.create(title="Se queda", author="Autor")
+    removed = BookRepository.create(title="Se va", author="Autor")
+
+    first = task_sync_book_changes_to_neo4j(start)
+
+    assert first["books_synced"] == 2
+    assert set(get_graph_snapshot()["books"]) == {kept.id, removed.id}
+
+    BookRepository.update(kept.id, title="Se queda (2ª ed.)")
+    BookRepository.delete(removed.id)
+    second = task_sync_book_changes_to_neo4j(first["next_since"])
+
+    assert second == {
+        "next_since": BookRepository.latest_change_seq(),
+        "full_resync": 0,
+        "books_synced": 1,
+        "books_removed": 1,
+    }
+    assert get_graph_snapshot()["books"] == {kept.id: {"id": kept.id, "title": "Se queda (2ª ed.)", "author": "Autor"}}
+
+
+def test_trabajo20_tarea_neo4j_resincroniza_tras_reset():
+    start = BookRepository.latest_change_seq()
+    old = BookRepository.create(title="Antiguo", author="Autor")
+    task_sync_book_changes_to_neo4j(start)
+
+    BookRepository.reset()
+    new = BookRepository.create(title="Nuevo", author="Autor")
+    result = task_sync_book_changes_to_neo4j(start + 1)
+
+    assert result["full_resync"] == 1
+    assert old.id == new.id
+    assert get_graph_snapshot()["books"][new.id]["title"] == "Nuevo"
@@ -0,0 +1,106 @@
+"""Tests asociados al Trabajo21 (sincronización incremental por fecha de actualización)."""
+from __future__ import annotations
+
+import json
+import os
+from datetime import UTC, datetime, timedelta
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest
+from django.urls import resolve
+
+from library.models import BookRepository
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+
+def setup_function(_: object) -> None:
+    BookRepository.tombstone_limit = 10_000
+    BookRepository.reset()
+
+
+def teardown_function(_: object) -> None:
+    BookRepository.tombstone_limit = 10_000
+
+
+def _sync(since: str):
+    route = resolve("/api/books/")
+    request = HttpRequest(method="GET", path="/api/books/", user=AnonymousUser(), GET={"updated_since": since})
+    response = route.callback(request, **route.kwargs)
+    return response.status_code, json.loads(response.content)
+
+
+def test_trabajo21_changed_since_usa_el_indice_de_updated_at():
+    old = BookRepository.create(title="Viejo", author="Autor")
+    checkpoint = datetime.now(tz=UTC)
+    new = BookRepository.create(title="Nuevo", author="Autor")
+    old = BookRepository.update(old.id, title="Viejo revisado")
+    BookRepository.delete(new.id)
+
+    books, deleted, complete = BookRepository.changed_since(checkpoint)
+
+    assert complete is True
+    assert books == [old]
+    assert [book_id for book_id, _ in deleted] == [new.id]
+    assert BookRepository.changed_since(datetime.now(tz=UTC) + timedelta(seconds=1))[:2] == ([], [])
+
+
+def test_trabajo21_endpoint_devuelve_cambios_y_tombstones():
+    BookRepository.create(title="Sin cambios", author="Autor")
+    edited = BookRepository.create(title="Editado", author="Autor")
+    removed = BookRepository.create(title="Borrado", author="Autor")
+    checkpoint = datetime.now(tz=UTC).isoformat()
+    BookRepository.update(edited.id, title="Editado v2")
+    BookRepository.bulk_delete([removed.id])
+    created = BookRepository.create(title="Recién llegado", author="Autor")
+
+    status, payload = _sync(checkpoint)
+
+    assert status == 200
+    assert payload["full_resync"] is False
+    assert [book["title"] for book in payload["results"]] == ["Editado v2", "Recién llegado"]
+    assert [item["id"] for item in payload["deleted"]] == [removed.id]
+    assert datetime.fromisoformat(payload["next_updated_since"]) == BookRepository.get(created.id).updated_at
+
+    status, again = _sync(payload["next_updated_since"])
+
+    assert [book["id"] for book in again["results"]] == [created.id]
+    assert again["deleted"] == []
+
+
+def test_trabajo21_fechas_sin_zona_o_con_espacio_en_el_offset():
+    checkpoint = datetime.now(tz=UTC)
+    BookRepository.create(title="Libro", author="Autor")
+
+    naive = checkpoint.replace(tzinfo=None).isoformat()
+    spaced = checkpoint.isoformat().replace("+", " ")
+
+    assert len(_sync(naive)[1]["results"]) == 1
+    assert len(_sync(spaced)[1]["results"]) == 1
+    assert _sync("ayer")[0] == 400
+
+
+def test_trabajo21_pide_resync_completo_si_faltan_tombstones():
+    before_reset = (datetime.now(tz=UTC) - timedelta(days=1)).isoformat()
+    BookRepository.reset()
+    kept = BookRepository.create(title="Se queda", author="Autor")
+
+    _, payload = _sync(before_reset)
+
+    assert payload["full_resync"] is True
+    assert [book["id"] for book in payload["results"]] == [kept.id]
+
+    BookRepository.tombstone_limit = 2
+    checkpoint = datetime.now(tz=UTC).isoformat()
+    for index in range(3):
+        BookRepository.delete(BookRepository.create(title=f"Temporal {index}", author="Autor").id)
+
+    _, truncated = _sync(checkpoint)
+
+    assert truncated["full_resync"] is True
+    assert [book["id"] for book in truncated["results"]] == [kept.id]
+    assert truncated["deleted"] == []
@@ -0,0 +1,102 @@
+"""Tests asociados al Trabajo22 (proyección de campos en la API de libros)."""
+from __future__ import annotations
+
+import json
+import os
+
+import django
+import pytest
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest
+from django.urls import resolve
+
+from library.models import BookRepository
+from library.reviews_service import create_review, get_reviews_collection, rebuild_rating_aggregates
+from library.serializers import BookSerializer
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+
+def setup_function(_: object) -> None:
+    BookRepository.reset()
+    get_reviews_collection().delete_many({})
+    rebuild_rating_aggregates()
+
+
+def _get(path: str, **params: str):
+    route = resolve(path)
+    request = HttpRequest(method="GET", path=path, user=AnonymousUser(), GET=params)
+    response = route.callback(request, **route.kwargs)
+    return response.status_code, json.loads(response.content)
+
+
+def test_trabajo22_serializer_proyecta_en_el_orden_canonico():
+    book = BookRepository.create(title="Rayuela", author="Julio Cortázar", isbn="123")
+
+    assert BookSerializer(book, fields=["title", "id"]).data() == {"id": book.id, "title": "Rayuela"}
+    with pytest.raises(ValueError):
+        BookSerializer(book, fields=["secreto"])
+
+
+def test_trabajo22_listado_y_paginas_con_fields():
+    first = BookRepository.create(title="Uno", author="Autor", isbn="111")
+    second = BookRepository.create(title="Dos", author="Autor")
+
+    assert _get("/api/books/", fields="id,title") == (
+        200,
+        [{"id": first.id, "title": "Uno"}, {"id": second.id, "title": "Dos"}],
+    )
+    status, page = _get("/api/books/", fields="id", limit="1")
+    assert page["results"] == [{"id": first.id}]
+
+
+def test_trabajo22_fields_invalidos_devuelven_400():
+    BookRepository.create(title="Uno", author="Autor")
+
+    status, payload = _get("/api/books/", fields="id,clave")
+
+    assert status == 400
+    assert "clave" in payload["errors"]["fields"][0]
+    assert _get("/api/books/", fields=" , ")[0] == 400
+
+
+def test_trabajo22_fields_invalidos_no_se_responden_con_304():
+    BookRepository.create(title="Uno", author="Autor")
+    route = resolve("/api/books/")
+    etag = route.callback(HttpRequest(method="GET", path="/api/books/", user=AnonymousUser())).headers["ETag"]
+
+    request = HttpRequest(
+        method="GET", path="/api/books/", user=AnonymousUser(), GET={"fields": "bogus"}, headers={"If-None-Match": etag}
+    )
+
+    assert route.callback(request, **route.kwargs).status_code == 400
+
+
+def test_trabajo22_detalle_con_fields_y_rating_opcional():
+    book = BookRepository.create(title="Ficciones", author="Borges", published_year=1944)
+    create_review(book_id=book.id, user_id=1, username="lector", rating=5)
+
+    assert _get(f"/api/books/{book.id}/", fields="title,average_rating") == (
+        200,
+        {"title": "Ficciones", "average_rating": 5.0},
+    )
+    assert _get(f"/api/books/{book.id}/", fields="id,published_year") == (
+        200,
+        {"id": book.id, "published_year": 1944},
+    )
+    status, full = _get(f"/api/books/{book.id}/")
+    assert full["reviews_count"] == 1 and full["author"] == "Borges"
+
+
+def test_trabajo22_detalle_sin_campos_de_rating_no_consulta_mongo(monkeypatch):
+    book = BookRepository.create(title="Aleph", author="Borges")
+
+    def _fail(_: int):
+        raise AssertionError("no debería calcular el rating")
+
+    monkeypatch.setattr("library.api.get_average_rating_for_book", _fail)
+
+    assert _get(f"/api/books/{book.id}/", fields="title") == (200, {"title": "Aleph"})
@@ -0,0 +1,52 @@
+"""Tests asociados al Trabajo23 (serializer de libros compilado)."""
+from __future__ import annotations
+
+import os
+
+import django
+import pytest
+from django.conf import settings
+
+from library.models import BookRepository
+from library.serializers import BookSerializer, compile_dict_builder, compile_row_getter
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+
+def setup_function(_: object) -> None:
+    BookRepository.reset()
+
+
+def test_trabajo23_builder_compilado_equivale_al_getattr():
+    book = BookRepository.create(title="Rayuela", author="Cortázar", published_year=1963, isbn="1", created_by="ana")
+    build = compile_dict_builder(tuple(BookSerializer.fields))
+
+    assert build(book) == {field: getattr(book, field) for field in BookSerializer.fields}
+    assert compile_dict_builder(tuple(BookSerializer.fields)) is build
+
+
+def test_trabajo23_builder_rechaza_nombres_que_no_son_identificadores():
+    with pytest.raises(ValueError):
+        compile_dict_builder(("id", "title}; import os; {"))
+
+
+def test_trabajo23_many_acepta_generadores_sin_copiar():
+    books = [BookRepository.create(title=f"Libro {index}", author="Autor") for index in range(3)]
+
+    data = BookSerializer((book for book in books), many=True, fields=["id"]).data()
+
+    assert data == [{"id": book.id} for book in books]
+
+
+def test_trabajo23_rows_devuelve_tuplas_en_el_orden_de_fields():
+    first = BookRepository.create(title="Uno", author="A")
+    second = BookRepository.create(title="Dos", author="B")
+
+    assert BookSerializer([first, second], many=True, fields=["title", "id"]).rows() == [
+        (first.id, "Uno"),
+        (second.id, "Dos"),
+    ]
+    assert BookSerializer(first, fields=["author"]).rows() == [("A",)]
+    assert compile_row_getter(())(first) == ()
@@ -0,0 +1,91 @@
+"""Tests asociados al Trabajo24 (respuestas JSON en streaming)."""
+from __future__ import annotations
+
+import json
+import os
+
+import django
+import pytest
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest
+from django.urls import resolve
+from rest_framework import Response, StreamingResponse
+
+from library.models import BookRepository
+from library.reviews_service import create_review, get_reviews_collection, rebuild_rating_aggregates
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+
+def setup_function(_: object) -> None:
+    BookRepository.reset()
+    get_reviews_collection().delete_many({})
+    rebuild_rating_aggregates()
+
+
+def _get(path: str, **params: str):
+    route = resolve(path)
+    request = HttpRequest(method="GET", path=path, user=AnonymousUser(), GET=params)
+    return route.callback(request, **route.kwargs)
+
+
+def test_trabajo24_streaming_codifica_por_bloques_y_de_forma_perezosa():
+    consumed = []
+
+    def items():
+        for index in range(5):
+            consumed.append(index)
+            yield {"n": index}
+
+    response = StreamingResponse(items(), chunk_size=2)
+
+    assert consumed == []
+    chunks = list(response.streaming_content)
+    assert len(chunks) == 5  # apertura, tres bloques y cierre
+    assert b"".join(chunks) == Response([{"n": index} for index in range(5)]).content
+
+
+def test_trabajo24_streaming_con_envoltorio_y_lista_vacia():
+    response = StreamingResponse(iter([]), envelope={"total": 0})
+
+    assert json.loads(response.content) == {"total": 0, "results": []}
+    assert StreamingResponse([]).content == b"[]"
+
+
+def test_trabajo24_el_contenido_solo_se_puede_iterar_una_vez():
+    response = StreamingResponse([1, 2])
+
+    assert response.content == b"[1,2]"
+    assert response.content == b"[1,2]"
+    with pytest.raises(RuntimeError):
+        list(response.streaming_content)
+
+
+def test_trabajo24_listado_de_libros_en_streaming():
+    BookRepository.bulk_create({"title": f"Libro {index}", "author": "Autor"} for index in range(1200))
+
+    response = _get("/api/books/")
+
+    assert isinstance(response, StreamingResponse)
+    assert response.headers["ETag"]
+    chunks = list(response.streaming_content)
+    assert len(chunks) == 5
+    books = json.loads(b"".join(chunks))
+    assert len(books) == 1200 and books[-1]["title"] == "Libro 1199"
+
+
+def test_trabajo24_delta_y_resenas_en_streaming():
+    book = BookRepository.create(title="Libro", author="Autor")
+    create_review(book_id=book.id, user_id=1, username="ana", rating=4)
+    create_review(book_id=book.id, user_id=2, username="luis", rating=2)
+
+    reviews = _get(f"/api/books/{book.id}/reviews/")
+    delta = json.loads(_get("/api/books/", updated_since="2000-01-01T00:00:00+00:00").content)
+
+    assert isinstance(reviews, StreamingResponse)
+    assert sorted(review["username"] for review in json.loads(reviews.content)) == ["ana", "luis"]
+    assert [item["id"] for item in delta["results"]] == [book.id]
+    assert delta["deleted"] == []
@@ -0,0 +1,94 @@
+"""Tests asociados al Trabajo25 (caché de fragmentos JSON por libro)."""
+from __future__ import annotations
+
+import json
+import os
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest
+from django.urls import resolve
+
+from library.book_fragments import FragmentCache
+from library.models import BookRepository
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+
+def setup_function(_: object) -> None:
+    BookRepository.reset()
+
+
+def _list(**params: str):
+    route = resolve("/api/books/")
+    request = HttpRequest(method="GET", path="/api/books/", user=AnonymousUser(), GET=params)
+    return json.loads(route.callback(request, **route.kwargs).content)
+
+
+def test_trabajo25_el_listado_reutiliza_fragmentos():
+    BookRepository.bulk_create({"title": f"Libro {index}", "author": "Autor"} for index in range(3))
+    cache = BookRepository.fragment_cache()
+
+    first = _list()
+    misses = cache.misses
+    second = _list()
+
+    assert first == second
+    assert cache.misses == misses
+    assert cache.hits >= 3
+
+
+def test_trabajo25_update_y_delete_invalidan_fragmentos():
+    book, other = BookRepository.bulk_create([{"title": "Original", "author": "A"}, {"title": "Otro", "author": "B"}])
+    _list()
+
+    BookRepository.update(book.id, title="Cambiado")
+    BookRepository.delete(other.id)
+
+    assert _list() == [
+        {"id": book.id, "title": "Cambiado", "author": "A", "published_year": None, "isbn": None, "created_by": None}
+    ]
+    assert _list(fields="title") == [{"title": "Cambiado"}]
+
+
+def test_trabajo25_reset_no_sirve_fragmentos_de_ids_reutilizados():
+    BookRepository.create(title="Antes del reset", author="A")
+    _list()
+
+    BookRepository.reset()
+    BookRepository.create(title="Después del reset", author="B")
+
+    assert [book["title"] for book in _list()] == ["Después del reset"]
+
+
+def test_trabajo25_cache_valida_el_sello_y_respeta_maxsize():
+    cache = FragmentCache(maxsize=2)
+    cache.put(1, (1, None), ("id",), b'{"id": 1}')
+    cache.put(1, (1, None), ("title",), b'{"title": "t"}')
+    cache.put(2, (1, None), ("id",), b'{"id": 2}')
+
+    assert cache.get(1, (2, None), ("id",)) is None
+    assert cache.get(1, (1, None), ("title",)) == b'{"title": "t"}'
+
+    cache.put(3, (1, None), ("id",), b'{"id": 3}')
+
+    assert len(cache) == 2
+    assert cache.get(1, (1, None), ("id",)) == b'{"id": 1}'
+    assert cache.get(3, (1, None), ("id",)) is None
+
+
+def test_trabajo25_catalogo_mayor_que_maxsize_sigue_acertando(monkeypatch):
+    cache = FragmentCache(maxsize=1000)
+    monkeypatch.setattr(BookRepository, "_fragments", cache)
+    BookRepository.bulk_create({"title": f"Libro {index}", "author": "Autor"} for index in range(1500))
+
+    first = _list()
+    hits, misses = cache.hits, cache.misses
+    second = _list()
+
+    assert first == second
+    assert (cache.hits - hits, cache.misses - misses) == (1000, 500)
+    assert len(cache) == 1000
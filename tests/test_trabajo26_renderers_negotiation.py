@@ -0,0 +1,110 @@
+"""Tests asociados al Trabajo26 (renderizado diferido y negociación de contenido)."""
+from __future__ import annotations
+
+import json
+import os
+
+import django
+import pytest
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest
+from django.urls import resolve
+from rest_framework import Response
+from rest_framework import renderers
+from rest_framework.renderers import JSONRenderer, MessagePackRenderer, negotiate, packb, unpackb
+
+from library.models import BookRepository
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+
+def setup_function(_: object) -> None:
+    BookRepository.reset()
+
+
+def _call(path: str, *, method: str = "GET", headers: dict | None = None, **params: str):
+    route = resolve(path)
+    request = HttpRequest(method=method, path=path, user=AnonymousUser(), GET=params, headers=headers or {})
+    return route.callback(request, **route.kwargs)
+
+
+def test_trabajo26_response_no_renderiza_hasta_leer_el_contenido():
+    response = Response({"valor": object()})
+
+    assert response.is_rendered is False
+    response.discard_body()
+    assert response.content == b""
+    with pytest.raises(TypeError):
+        Response({"valor": object()}).content
+
+
+def test_trabajo26_negociacion_por_accept():
+    available = renderers.DEFAULT_RENDERERS
+
+    assert isinstance(negotiate(None, available), JSONRenderer)
+    assert isinstance(negotiate("application/msgpack", available), MessagePackRenderer)
+    assert isinstance(negotiate("application/x-msgpack;q=0.9, */*;q=0.1", available), MessagePackRenderer)
+    assert isinstance(negotiate("application/msgpack;q=0.5, application/json", available), JSONRenderer)
+    assert isinstance(negotiate("text/html, application/*", available), JSONRenderer)
+    assert negotiate("text/html", available) is None
+    assert negotiate("application/json;q=0", available) is None
+
+
+def test_trabajo26_msgpack_ida_y_vuelta():
+    payload = {
+        "id": 7,
+        "title": "Cien años de soledad" * 3,
+        "flags": [True, False, None],
+        "numbers": [0, 127, 128, 65_536, 2**40, -1, -33, -200, -(2**40)],
+        "rating": 4.25,
+        "raw": b"\x00\x01",
+        "items": list(range(20)),
+        "nested": {str(index): index for index in range(20)},
+    }
+
+    assert unpackb(packb(payload)) == payload
+    assert unpackb(MessagePackRenderer().render(payload)) == payload
+    with pytest.raises(TypeError):
+        packb({"cuando": object()})
+
+
+def test_trabajo26_json_dumps_es_compacto_con_o_sin_orjson(monkeypatch):
+    data = {"título": "Ñandú", "valores": [1, 2.5, None, True]}
+    fast = renderers.json_dumps(data)
+
+    monkeypatch.setattr(renderers, "orjson", None)
+
+    assert renderers.json_dumps(data) == fast
+    assert json.loads(fast) == data
+    assert b" " not in fast.replace("Ñandú".encode(), b"")
+
+
+def test_trabajo26_vistas_negocian_msgpack_y_406():
+    BookRepository.bulk_create({"title": f"Libro {index}", "author": "Autor"} for index in range(3))
+
+    as_json = _call("/api/books/")
+    as_msgpack = _call("/api/books/", headers={"Accept": "application/msgpack"})
+    detail = _call("/api/books/1/", headers={"Accept": "application/msgpack"}, fields="id,title")
+
+    assert as_msgpack.content_type == "application/msgpack"
+    assert unpackb(as_msgpack.content) == json.loads(as_json.content)
+    assert unpackb(detail.content) == {"id": 1, "title": "Libro 0"}
+    assert "Accept" in as_msgpack.headers["Vary"].split(", ")
+    assert "Accept" in detail.headers["Vary"].split(", ")
+    rejected = _call("/api/books/", headers={"Accept": "text/html"})
+    assert rejected.status_code == 406
+    assert rejected.headers["Vary"] == "Accept"
+
+
+def test_trabajo26_head_devuelve_cabeceras_sin_cuerpo():
+    BookRepository.create(title="Libro", author="Autor")
+
+    response = _call("/api/books/", method="HEAD")
+
+    assert response.status_code == 200
+    assert response.headers["ETag"]
+    assert response.content == b""
+    assert b"".join(response.streaming_content) == b""
@@ -0,0 +1,145 @@
+"""Tests asociados al Trabajo27 (compresión de respuestas y caché de cuerpos comprimidos)."""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import zlib
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest
+from django.urls import resolve
+from rest_framework import StreamingResponse
+from rest_framework import compression
+from rest_framework.compression import body_cache, negotiate_encoding
+
+from library.models import BookRepository
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+
+def setup_function(_: object) -> None:
+    BookRepository.reset()
+    body_cache.clear()
+
+
+def _call(path: str, *, method: str = "GET", headers: dict | None = None, **params: str):
+    route = resolve(path)
+    request = HttpRequest(method=method, path=path, user=AnonymousUser(), GET=params, headers=headers or {})
+    return route.callback(request, **route.kwargs)
+
+
+def _crear_libros(total: int) -> None:
+    BookRepository.bulk_create({"title": f"Libro {index}", "author": "Autor"} for index in range(total))
+
+
+def test_trabajo27_negociacion_de_accept_encoding():
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0.5, deflate") == "deflate"
+    assert negotiate_encoding("gzip;q=0, *") == "deflate"
+    assert negotiate_encoding("br, gzip;q=0") is None
+
+
+def test_trabajo27_listado_comprimido_con_gzip_y_deflate():
+    _crear_libros(50)
+    plain = _call("/api/books/")
+    expected = json.loads(plain.content)
+
+    gzipped = _call("/api/books/", headers={"Accept-Encoding": "gzip"})
+    deflated = _call("/api/books/", headers={"Accept-Encoding": "deflate"})
+
+    assert "Content-Encoding" not in plain.headers
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert gzipped.headers["Vary"] == "Accept, Accept-Encoding"
+    assert json.loads(gzip.decompress(gzipped.content)) == expected
+    assert deflated.headers["Content-Encoding"] == "deflate"
+    assert json.loads(zlib.decompress(deflated.content)) == expected
+    assert len(gzipped.content) < len(plain.content)
+
+
+def test_trabajo27_cuerpos_pequenos_no_se_comprimen(monkeypatch):
+    _crear_libros(1)
+
+    response = _call("/api/books/", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+    assert json.loads(response.content)[0]["title"] == "Libro 0"
+
+    monkeypatch.setattr(settings, "API_COMPRESSION_MIN_SIZE", 10)
+    body_cache.clear()
+    response = _call("/api/books/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+
+
+def test_trabajo27_peticiones_repetidas_no_vuelven_a_comprimir(monkeypatch):
+    _crear_libros(50)
+    calls = []
+    original = compression.compress
+
+    def counting(body, encoding, level):
+        calls.append(encoding)
+        return original(body, encoding, level)
+
+    monkeypatch.setattr(compression, "compress", counting)
+    first = _call("/api/books/", headers={"Accept-Encoding": "gzip"})
+    misses = BookRepository.fragment_cache().misses
+    second = _call("/api/books/", headers={"Accept-Encoding": "gzip"})
+
+    assert first.content == second.content
+    assert calls == ["gzip"]
+    assert BookRepository.fragment_cache().misses == misses
+
+    BookRepository.create(title="Nuevo", author="Autor")
+    third = _call("/api/books/", headers={"Accept-Encoding": "gzip"})
+    assert calls == ["gzip", "gzip"]
+    assert len(json.loads(gzip.decompress(third.content))) == 51
+
+
+def test_trabajo27_cuerpos_grandes_se_comprimen_en_streaming(monkeypatch):
+    _crear_libros(1200)
+    monkeypatch.setattr(settings, "API_COMPRESSED_CACHE_MAX_BODY", 2048)
+
+    response = _call("/api/books/", headers={"Accept-Encoding": "gzip"})
+
+    assert isinstance(response, StreamingResponse)
+    assert response.headers["Content-Encoding"] == "gzip"
+    chunks = list(response.streaming_content)
+    assert len(chunks) > 1
+    books = json.loads(gzip.decompress(b"".join(chunks)))
+    assert len(books) == 1200 and books[-1]["title"] == "Libro 1199"
+    assert len(body_cache) == 0
+
+
+def test_trabajo27_head_y_304_no_se_comprimen():
+    _crear_libros(50)
+    etag = _call("/api/books/").headers["ETag"]
+
+    head = _call("/api/books/", method="HEAD", headers={"Accept-Encoding": "gzip"})
+    not_modified = _call("/api/books/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+
+    assert head.content == b"" and "Content-Encoding" not in head.headers
+    assert not_modified.status_code == 304
+    assert not_modified.content == b"" and "Content-Encoding" not in not_modified.headers
+
+
+def test_trabajo27_variante_comprimida_tiene_etag_propio(monkeypatch):
+    _crear_libros(50)
+    identity = _call("/api/books/").headers["ETag"]
+
+    compressed = _call("/api/books/", headers={"Accept-Encoding": "gzip"})
+    etag = compressed.headers["ETag"]
+
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert etag == identity[:-1] + '-gzip"'
+    assert _call("/api/books/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}).status_code == 304
+    assert _call("/api/books/", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+    monkeypatch.setattr(settings, "API_COMPRESSED_CACHE_MAX_BODY", 16)
+    streamed = _call("/api/books/", headers={"Accept-Encoding": "deflate"})
+    assert streamed.headers["ETag"] == identity[:-1] + '-deflate"'
+    assert compression.strip_encoding_suffix('"otro-zstd"') == '"otro-zstd"'
@@ -0,0 +1,100 @@
+"""Tests asociados al Trabajo28 (validación por lotes en BookInputSerializer)."""
+from __future__ import annotations
+
+import json
+import os
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.http import HttpRequest
+from django.urls import resolve
+
+from library.models import BookRepository
+from library.serializers import BookInputSerializer
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+
+def setup_function(_: object) -> None:
+    BookRepository.reset()
+    User.objects.reset()
+
+
+def test_trabajo28_lote_con_errores_por_indice():
+    serializer = BookInputSerializer(
+        [
+            {"title": " Uno ", "author": "A", "published_year": "1999", "isbn": ""},
+            {"title": "", "author": 3},
+            "no es un objeto",
+            {"title": "Dos", "author": "B", "published_year": "²"},
+            {"title": "Tres", "author": "C", "id": 99},
+        ],
+        many=True,
+    )
+
+    assert serializer.is_valid() is False
+    assert serializer.errors == {
+        1: {
+            "title": ["Este campo es obligatorio.", "Este campo es obligatorio."],
+            "author": ["Debe ser una cadena.", "Este campo es obligatorio."],
+        },
+        2: {"non_field_errors": ["Debe ser un objeto."]},
+        3: {"published_year": ["Debe ser un número entero."]},
+    }
+    assert serializer.valid_indexes == [0, 4]
+    assert serializer.validated_data == [
+        {"title": "Uno", "author": "A", "published_year": 1999, "isbn": None},
+        {"title": "Tres", "author": "C"},
+    ]
+
+
+def test_trabajo28_lote_parcial_y_lote_valido():
+    partial = BookInputSerializer([{"isbn": " 123 "}, {"title": None}], many=True, partial=True)
+    assert partial.is_valid() is False
+    assert partial.validated_data == [{"isbn": "123"}]
+    assert partial.errors == {1: {"title": ["Este campo es obligatorio.", "Este campo es obligatorio."]}}
+
+    valid = BookInputSerializer([{"title": "T", "author": "A"}] * 3, many=True)
+    assert valid.is_valid() is True
+    assert valid.errors == {} and valid.valid_indexes == [0, 1, 2]
+
+
+def test_trabajo28_modo_individual_coincide_con_el_lote():
+    payloads = [{"title": "T", "author": "A", "published_year": 2001}, {"author": 1, "isbn": 5}, {}, {"title": ""}]
+    batch = BookInputSerializer(payloads, many=True)
+    batch.is_valid()
+
+    for index, payload in enumerate(payloads):
+        single = BookInputSerializer(payload)
+        assert single.is_valid() is (index not in batch.errors)
+        assert list(single.errors.items()) == list(batch.errors.get(index, {}).items())
+
+
+def test_trabajo28_bulk_api_usa_la_validacion_por_lotes():
+    user = User.objects.create_user(username="importer", password="segura")
+    book = BookRepository.create(title="Existente", author="A")
+    route = resolve("/api/books/bulk/")
+    body = {
+        "create": [{"title": "Nuevo", "author": "B"}, {"title": ""}],
+        "update": [{"id": book.id, "title": " Editado "}, {"id": book.id, "author": 1}, {"id": "x"}],
+    }
+    request = HttpRequest(method="POST", path="/api/books/bulk/", body=json.dumps(body).encode("utf-8"), user=user)
+
+    payload = json.loads(route.callback(request, **route.kwargs).content)
+
+    assert [item["status"] for item in payload["create"]] == [201, 400]
+    assert payload["create"][1]["errors"] == {
+        "title": ["Este campo es obligatorio.", "Este campo es obligatorio."],
+        "author": ["Este campo es obligatorio."],
+    }
+    assert [item["status"] for item in payload["update"]] == [200, 400, 400]
+    assert payload["update"][0]["book"]["title"] == "Editado"
+    assert payload["update"][1] == {
+        "index": 1,
+        "status": 400,
+        "errors": {"author": ["Debe ser una cadena.", "Este campo es obligatorio."]},
+    }
+    assert payload["update"][2]["errors"] == {"id": ["Debe ser un número entero."]}
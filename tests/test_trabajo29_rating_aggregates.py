@@ -0,0 +1,129 @@
+"""Tests asociados al Trabajo29 (agregados de valoraciones mantenidos de forma incremental)."""
+from __future__ import annotations
+
+import json
+import os
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest
+from django.urls import resolve
+
+from library.models import BookRepository
+from library.reviews_service import (
+    create_review,
+    get_average_rating_for_book,
+    get_average_ratings_for_books,
+    get_rating_aggregate,
+    get_rating_aggregates_collection,
+    get_reviews_collection,
+    rebuild_rating_aggregates,
+    upsert_review,
+)
+from library.tasks import task_rebuild_rating_aggregates
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+
+def setup_function(_: object) -> None:
+    BookRepository.reset()
+    get_reviews_collection().delete_many({})
+    rebuild_rating_aggregates()
+
+
+def _review(book_id: int, rating: int) -> None:
+    create_review(book_id=book_id, user_id=1, username="lector", rating=rating)
+
+
+def test_trabajo29_create_review_actualiza_suma_conteo_e_histograma():
+    book = BookRepository.create(title="Popular", author="Autora")
+    for rating in (5, 5, 3, 1):
+        _review(book.id, rating)
+
+    aggregate = get_rating_aggregate(book.id)
+    document = get_rating_aggregates_collection().find_one({"book_id": book.id})
+
+    assert (aggregate.total, aggregate.count, aggregate.average) == (14, 4, 3.5)
+    assert aggregate.histogram == (1, 0, 1, 0, 2)
+    assert document["histogram"] == {"1": 1, "3": 1, "5": 2}
+    assert get_average_rating_for_book(book.id) == (3.5, 4)
+    assert get_average_rating_for_book(book.id + 1) == (None, 0)
+
+
+def test_trabajo29_la_media_no_recorre_las_resenas(monkeypatch):
+    book = BookRepository.create(title="Leído", author="Autor")
+    _review(book.id, 4)
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("no se deben recorrer las reseñas")
+
+    monkeypatch.setattr(get_reviews_collection(), "find", _fail)
+    route = resolve(f"/api/books/{book.id}/")
+    request = HttpRequest(method="GET", path=f"/api/books/{book.id}/", user=AnonymousUser())
+    payload = json.loads(route.callback(request, **route.kwargs).content)
+
+    assert payload["average_rating"] == 4.0 and payload["reviews_count"] == 1
+
+
+def test_trabajo29_la_cache_se_invalida_al_crear_resenas():
+    book = BookRepository.create(title="Cacheado", author="Autor")
+    _review(book.id, 2)
+    assert get_average_rating_for_book(book.id) == (2.0, 1)
+
+    _review(book.id, 4)
+
+    assert get_average_rating_for_book(book.id) == (3.0, 2)
+
+
+def test_trabajo29_rebuild_repara_desviaciones():
+    book = BookRepository.create(title="Desviado", author="Autor")
+    other = BookRepository.create(title="Otro", author="Autor")
+    _review(book.id, 5)
+    _review(other.id, 1)
+    get_reviews_collection().insert_one({"book_id": book.id, "rating": 3})
+    get_reviews_collection().delete_many({"book_id": other.id})
+    assert get_average_rating_for_book(book.id) == (5.0, 1)
+
+    assert rebuild_rating_aggregates(book.id) == 1
+    assert get_average_rating_for_book(book.id) == (4.0, 2)
+    assert get_average_rating_for_book(other.id) == (1.0, 1)
+
+    assert task_rebuild_rating_aggregates() == {"books_rebuilt": 1}
+    assert get_average_rating_for_book(other.id) == (None, 0)
+    assert get_rating_aggregate(book.id).histogram == (0, 0, 1, 0, 1)
+
+
+def _legacy_reviews(book_id: int, ratings: list[int]) -> None:
+    # Reseñas anteriores a los agregados: están en Mongo pero no en los agregados.
+    for user_id, rating in enumerate(ratings, start=1):
+        get_reviews_collection().insert_one({"book_id": book_id, "user_id": user_id, "rating": rating})
+
+
+def test_trabajo29_resenas_anteriores_a_los_agregados_se_reconstruyen_al_leer():
+    book = BookRepository.create(title="Antiguo", author="Autor")
+    other = BookRepository.create(title="Antiguo 2", author="Autor")
+    unreviewed = BookRepository.create(title="Sin reseñas", author="Autor")
+    _legacy_reviews(book.id, [5, 3])
+    _legacy_reviews(other.id, [2])
+
+    assert get_average_rating_for_book(book.id) == (4.0, 2)
+    assert get_average_ratings_for_books([other.id, unreviewed.id]) == {other.id: (2.0, 1), unreviewed.id: (None, 0)}
+    assert get_rating_aggregates_collection().find_one({"book_id": other.id})["count"] == 1
+    assert get_rating_aggregates_collection().find_one({"book_id": unreviewed.id}) is None
+
+
+def test_trabajo29_escrituras_sobre_resenas_antiguas_no_descuadran_el_agregado():
+    book = BookRepository.create(title="Migrado", author="Autor")
+    other = BookRepository.create(title="Migrado 2", author="Autor")
+    _legacy_reviews(book.id, [5, 3])
+    _legacy_reviews(other.id, [4])
+
+    upsert_review(book_id=book.id, user_id=1, username="lector", rating=1)
+    _review(other.id, 2)
+
+    assert get_rating_aggregate(book.id).histogram == (1, 0, 1, 0, 0)
+    assert get_average_rating_for_book(book.id) == (2.0, 2)
+    assert get_average_rating_for_book(other.id) == (3.0, 2)
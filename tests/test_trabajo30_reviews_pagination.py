@@ -0,0 +1,157 @@
+"""Tests asociados al Trabajo30 (listado paginado de reseñas ordenado por índice)."""
+from __future__ import annotations
+
+import json
+import os
+
+import django
+import pymongo
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest
+from django.urls import resolve
+
+from library import reviews_service
+from library.models import BookRepository
+from library.reviews_service import (
+    get_reviews_collection,
+    get_reviews_for_book,
+    get_reviews_page,
+    rebuild_rating_aggregates,
+)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+
+def setup_function(_: object) -> None:
+    BookRepository.reset()
+    get_reviews_collection().delete_many({})
+    rebuild_rating_aggregates()
+
+
+def _get(path: str, **params: str):
+    route = resolve(path)
+    request = HttpRequest(method="GET", path=path, user=AnonymousUser(), GET=params)
+    return route.callback(request, **route.kwargs)
+
+
+def _insert_reviews(book_id: int, timestamps: list[str]) -> None:
+    collection = get_reviews_collection()
+    for index, created_at in enumerate(timestamps):
+        collection.insert_one(
+            {"book_id": book_id, "user_id": 1, "rating": 1 + index % 5, "comment": f"r{index}", "created_at": created_at}
+        )
+
+
+def test_trabajo30_indice_compuesto_en_la_coleccion_de_resenas():
+    indexes = get_reviews_collection().index_information()
+
+    assert indexes["book_id_created_at"]["key"] == [("book_id", 1), ("created_at", -1), ("_id", -1)]
+
+
+def test_trabajo30_paginas_por_cursor_con_empates_de_fecha():
+    book = BookRepository.create(title="Reseñado", author="Autor")
+    other = BookRepository.create(title="Otro", author="Autor")
+    _insert_reviews(book.id, ["2024-01-01T10:00:00+00:00", "2024-01-02T10:00:00+00:00"] * 3)
+    _insert_reviews(other.id, ["2024-01-03T10:00:00+00:00"])
+    expected = [review["comment"] for review in get_reviews_for_book(book.id)]
+
+    seen, before = [], None
+    while True:
+        page, before = get_reviews_page(book.id, before=before, limit=4)
+        seen.extend(review["comment"] for review in page)
+        if before is None:
+            break
+
+    assert seen == expected == ["r5", "r3", "r1", "r4", "r2", "r0"]
+
+
+def test_trabajo30_api_pagina_las_resenas():
+    book = BookRepository.create(title="API", author="Autor")
+    _insert_reviews(book.id, [f"2024-01-0{day}T10:00:00+00:00" for day in range(1, 6)])
+    path = f"/api/books/{book.id}/reviews/"
+
+    first = json.loads(_get(path, limit="2").content)
+    # Un "+" sin codificar llega como espacio en la query string.
+    second = json.loads(_get(path, limit="2", before=first["next_cursor"].replace("+", " ")).content)
+    third = json.loads(_get(path, limit="2", before=second["next_cursor"]).content)
+
+    assert [review["comment"] for review in first["results"]] == ["r4", "r3"]
+    assert first["next_cursor"] == f"2024-01-04T10:00:00+00:00,{first['results'][-1]['id']}"
+    assert [review["comment"] for review in second["results"]] == ["r2", "r1"]
+    assert [review["comment"] for review in third["results"]] == ["r0"]
+    assert third["next_cursor"] is None
+    assert len(json.loads(_get(path).content)) == 5
+
+
+def test_trabajo30_cursor_con_otro_huso_se_normaliza_a_utc():
+    book = BookRepository.create(title="Husos", author="Autor")
+    _insert_reviews(book.id, [f"2024-01-01T{hour:02d}:00:00+00:00" for hour in range(8, 13)])
+    path = f"/api/books/{book.id}/reviews/"
+    newest = json.loads(_get(path).content)[0]
+
+    # 12:30+02:00 son las 10:30 UTC: quedan las reseñas de las 10, 9 y 8.
+    page = json.loads(_get(path, before=f"2024-01-01T12:30:00+02:00,{newest['id']}").content)
+
+    assert [review["comment"] for review in page["results"]] == ["r2", "r1", "r0"]
+
+
+def test_trabajo30_el_limite_se_delega_en_la_coleccion(monkeypatch):
+    book = BookRepository.create(title="Límite", author="Autor")
+    _insert_reviews(book.id, ["2024-01-01T10:00:00+00:00"] * 10)
+    limits = []
+    original = pymongo.Cursor.limit
+
+    def recording(self, limit):
+        limits.append(limit)
+        return original(self, limit)
+
+    monkeypatch.setattr(pymongo.Cursor, "limit", recording)
+    page, next_cursor = get_reviews_page(book.id, limit=3)
+
+    assert limits == [4]
+    assert len(page) == 3 and next_cursor is not None
+
+
+def test_trabajo30_cursor_invalido_devuelve_400():
+    book = BookRepository.create(title="Errores", author="Autor")
+    path = f"/api/books/{book.id}/reviews/"
+
+    for before in ("sin-coma", "fecha,1", "2024-01-01T10:00:00+00:00,zz"):
+        response = _get(path, before=before)
+        assert response.status_code == 400
+        assert json.loads(response.content) == {"errors": {"before": ["Cursor inválido."]}}
+    assert _get(path, limit="0").status_code == 400
+
+
+def test_trabajo30_pagina_profunda_recorre_solo_limit_entradas(monkeypatch):
+    book = BookRepository.create(title="Profundo", author="Autor")
+    _insert_reviews(book.id, [f"2024-01-01T10:{minute // 60:02d}:{minute % 60:02d}+00:00" for minute in range(300)])
+    reviews = get_reviews_for_book(book.id)
+    before = (reviews[249]["created_at"], reviews[249]["id"])
+    calls = []
+    original = pymongo._matches
+
+    def counting(document, filtro):
+        calls.append(document["_id"])
+        return original(document, filtro)
+
+    monkeypatch.setattr(pymongo, "_matches", counting)
+    page, _ = get_reviews_page(book.id, before=before, limit=5)
+
+    assert [review["id"] for review in page] == [review["id"] for review in reviews[250:255]]
+    assert len(set(calls)) <= 5 + 2
+
+
+def test_trabajo30_id_de_solo_digitos_se_interpreta_como_object_id(monkeypatch):
+    class FakeObjectId(str):
+        @staticmethod
+        def is_valid(raw):
+            return len(raw) == 24
+
+    monkeypatch.setattr(reviews_service, "ObjectId", FakeObjectId)
+
+    assert isinstance(reviews_service._parse_review_id("0" * 24), FakeObjectId)
+    assert reviews_service._parse_review_id("42") == 42
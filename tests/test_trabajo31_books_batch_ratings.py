@@ -0,0 +1,102 @@
+"""Tests asociados al Trabajo31 (valoraciones de varios libros en una sola consulta)."""
+from __future__ import annotations
+
+import json
+import os
+
+import django
+import pymongo
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest
+from django.urls import resolve
+from rest_framework.renderers import unpackb
+
+from library import api
+from library.models import BookRepository
+from library.reviews_service import (
+    create_review,
+    get_average_ratings_for_books,
+    get_reviews_collection,
+    rebuild_rating_aggregates,
+)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+
+def setup_function(_: object) -> None:
+    BookRepository.reset()
+    get_reviews_collection().delete_many({})
+    rebuild_rating_aggregates()
+
+
+def _get(headers: dict | None = None, **params: str):
+    route = resolve("/api/books/")
+    request = HttpRequest(method="GET", path="/api/books/", user=AnonymousUser(), GET=params, headers=headers or {})
+    return route.callback(request, **route.kwargs)
+
+
+def _count_finds(monkeypatch) -> list:
+    calls = []
+    original = pymongo.Collection.find
+
+    def counting(self, filtro=None):
+        calls.append((self.name, filtro))
+        return original(self, filtro)
+
+    monkeypatch.setattr(pymongo.Collection, "find", counting)
+    return calls
+
+
+def test_trabajo31_medias_de_varios_libros_en_una_consulta(monkeypatch):
+    books = BookRepository.bulk_create({"title": f"Libro {index}", "author": "A"} for index in range(4))
+    for book, rating in zip(books, (5, 3, 4)):
+        create_review(book_id=book.id, user_id=1, username="u", rating=rating)
+    create_review(book_id=books[0].id, user_id=2, username="v", rating=4)
+    calls = _count_finds(monkeypatch)
+
+    ratings = get_average_ratings_for_books([book.id for book in books])
+
+    assert ratings == {books[0].id: (4.5, 2), books[1].id: (3.0, 1), books[2].id: (4.0, 1), books[3].id: (None, 0)}
+    assert len(calls) == 1 and calls[0][1] == {"book_id": {"$in": [book.id for book in books]}}
+    assert get_average_ratings_for_books([books[0].id, books[3].id]) == {books[0].id: (4.5, 2), books[3].id: (None, 0)}
+    assert len(calls) == 1  # servido desde la caché
+
+
+def test_trabajo31_listado_con_include_rating(monkeypatch):
+    books = BookRepository.bulk_create({"title": f"Libro {index}", "author": "A"} for index in range(5))
+    create_review(book_id=books[1].id, user_id=1, username="u", rating=2)
+    calls = _count_finds(monkeypatch)
+    monkeypatch.setattr(api, "BOOKS_RATINGS_BATCH_SIZE", 2)
+
+    response = _get(include="rating", fields="id,title")
+    payload = json.loads(response.content)
+
+    assert "ETag" not in response.headers
+    assert payload[1] == {"id": books[1].id, "title": "Libro 1", "average_rating": 2.0, "reviews_count": 1}
+    assert payload[0] == {"id": books[0].id, "title": "Libro 0", "average_rating": None, "reviews_count": 0}
+    assert len(payload) == 5
+    assert len(calls) == 3  # una consulta por lote de 2 libros
+    assert "average_rating" not in json.loads(_get().content)[0]
+
+
+def test_trabajo31_include_rating_en_paginas_delta_y_msgpack():
+    book = BookRepository.create(title="Único", author="A")
+    create_review(book_id=book.id, user_id=1, username="u", rating=5)
+
+    page = json.loads(_get(include="rating", limit="10").content)
+    delta = json.loads(_get(include="rating", updated_since="2000-01-01T00:00:00").content)
+    packed = unpackb(_get(headers={"Accept": "application/msgpack"}, include="rating").content)
+
+    assert page["results"][0]["average_rating"] == 5.0
+    assert delta["results"][0]["reviews_count"] == 1
+    assert packed[0]["average_rating"] == 5.0 and packed[0]["title"] == "Único"
+
+
+def test_trabajo31_include_desconocido_devuelve_400():
+    response = _get(include="rating,autor")
+
+    assert response.status_code == 400
+    assert json.loads(response.content) == {"errors": {"include": ["Valores no válidos: autor."]}}
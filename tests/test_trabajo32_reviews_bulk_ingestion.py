@@ -0,0 +1,115 @@
+"""Tests asociados al Trabajo32 (ingesta masiva de reseñas con insert_many)."""
+from __future__ import annotations
+
+import json
+import os
+
+import django
+import pymongo
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.http import HttpRequest
+from django.urls import resolve
+
+from library import api
+from library.models import BookRepository
+from library.reviews_service import (
+    create_reviews_bulk,
+    get_average_rating_for_book,
+    get_rating_aggregate,
+    get_reviews_collection,
+    get_reviews_for_book,
+    rebuild_rating_aggregates,
+)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+
+def setup_function(_: object) -> None:
+    BookRepository.reset()
+    User.objects.reset()
+    get_reviews_collection().delete_many({})
+    rebuild_rating_aggregates()
+
+
+class _RecordingTask:
+    def __init__(self) -> None:
+        self.calls: list = []
+
+    def delay(self, *args):
+        self.calls.append(args)
+
+
+def _post(body: object, user: object):
+    route = resolve("/api/reviews/bulk/")
+    request = HttpRequest(method="POST", path="/api/reviews/bulk/", body=json.dumps(body).encode("utf-8"), user=user)
+    return route.callback(request, **route.kwargs)
+
+
+def test_trabajo32_servicio_inserta_con_un_solo_insert_many(monkeypatch):
+    book = BookRepository.create(title="Migrado", author="A")
+    calls = []
+    original = pymongo.Collection.insert_many
+
+    def counting(self, documents, ordered=True):
+        documents = list(documents)
+        calls.append(len(documents))
+        return original(self, documents, ordered=ordered)
+
+    monkeypatch.setattr(pymongo.Collection, "insert_many", counting)
+    created, errors = create_reviews_bulk(
+        [
+            {"book_id": book.id, "user_id": 1, "rating": "5", "comment": "  Genial "},
+            {"book_id": book.id, "user_id": 2, "rating": 9},
+            {"book_id": book.id, "user_id": 3, "rating": 3, "created_at": "2020-05-01T12:00:00"},
+            {"book_id": "x", "user_id": 4, "rating": 2, "comment": 7},
+        ]
+    )
+
+    assert calls == [2]
+    assert [index for index, _ in created] == [0, 2]
+    assert created[0][1]["comment"] == "Genial" and created[0][1]["rating"] == 5
+    assert created[1][1]["created_at"] == "2020-05-01T12:00:00+00:00"
+    assert errors == {
+        1: {"rating": ["El rating debe estar entre 1 y 5"]},
+        3: {"book_id": ["Debe ser un número entero."], "comment": ["El comentario debe ser texto"]},
+    }
+    assert get_average_rating_for_book(book.id) == (4.0, 2)
+    assert get_rating_aggregate(book.id).histogram == (0, 0, 1, 0, 1)
+    assert [review["rating"] for review in get_reviews_for_book(book.id)] == [5, 3]
+
+
+def test_trabajo32_api_sincroniza_una_vez_por_libro_y_usuario(monkeypatch):
+    staff = User.objects.create_user(username="admin", password="x", is_staff=True)
+    first = BookRepository.create(title="Uno", author="A")
+    second = BookRepository.create(title="Dos", author="B")
+    book_task, user_task = _RecordingTask(), _RecordingTask()
+    monkeypatch.setattr(api, "task_sync_book_reviews_to_neo4j", book_task)
+    monkeypatch.setattr(api, "task_sync_user_recommendations", user_task)
+    reviews = [{"book_id": book.id, "user_id": user_id, "rating": 4} for book in (first, second) for user_id in (7, 8)]
+    reviews += [{"book_id": 999, "user_id": 7, "rating": 4}, {"book_id": first.id, "user_id": 7}]
+
+    response = _post({"reviews": reviews}, staff)
+    results = json.loads(response.content)["results"]
+
+    assert response.status_code == 200
+    assert [result["status"] for result in results] == [201, 201, 201, 201, 404, 400]
+    assert results[5]["errors"] == {"rating": ["El rating es obligatorio"]}
+    assert results[0]["review"]["book_id"] == first.id
+    assert book_task.calls == [(first.id,), (second.id,)]
+    assert user_task.calls == [(7,), (8,)]
+    assert get_average_rating_for_book(second.id) == (4.0, 2)
+
+
+def test_trabajo32_api_requiere_staff_y_lista():
+    user = User.objects.create_user(username="lector", password="x")
+    staff = User.objects.create_user(username="admin", password="x", is_staff=True)
+
+    assert _post({"reviews": []}, AnonymousUser()).status_code == 401
+    assert _post({"reviews": []}, user).status_code == 403
+    invalid = _post({"reviews": {}}, staff)
+    assert invalid.status_code == 400
+    assert json.loads(invalid.content) == {"errors": {"reviews": ["Debe ser una lista."]}}
+    assert json.loads(_post({"reviews": []}, staff).content) == {"results": []}
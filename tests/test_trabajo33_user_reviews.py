@@ -0,0 +1,98 @@
+"""Tests asociados al Trabajo33 (índice de reseñas por usuario y endpoint "mis reseñas")."""
+from __future__ import annotations
+
+import json
+import os
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.http import HttpRequest
+from django.urls import resolve
+
+from library.models import BookRepository
+from library.reviews_service import (
+    create_review,
+    get_rating_aggregate,
+    get_reviews_by_user,
+    get_reviews_collection,
+    rebuild_rating_aggregates,
+    upsert_review,
+)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+
+def setup_function(_: object) -> None:
+    BookRepository.reset()
+    User.objects.reset()
+    get_reviews_collection().delete_many({})
+    rebuild_rating_aggregates()
+
+
+def _call(path: str, *, user: object, method: str = "GET", body: dict | None = None, **params: str):
+    route = resolve(path)
+    request = HttpRequest(
+        method=method,
+        path=path,
+        user=user,
+        GET=params,
+        body=json.dumps(body).encode("utf-8") if body is not None else b"",
+    )
+    return route.callback(request, **route.kwargs)
+
+
+def test_trabajo33_indices_por_usuario_y_por_par():
+    indexes = get_reviews_collection().index_information()
+
+    assert indexes["user_id_created_at"]["key"] == [("user_id", 1), ("created_at", -1), ("_id", -1)]
+    assert indexes["book_id_user_id"]["key"] == [("book_id", 1), ("user_id", 1)]
+
+
+def test_trabajo33_resenas_de_un_usuario_paginadas():
+    books = BookRepository.bulk_create({"title": f"Libro {index}", "author": "A"} for index in range(5))
+    for book in books:
+        create_review(book_id=book.id, user_id=1, username="ana", rating=4)
+        create_review(book_id=book.id, user_id=2, username="luis", rating=2)
+
+    first, cursor = get_reviews_by_user(1, limit=3)
+    second, end = get_reviews_by_user(1, before=cursor, limit=3)
+
+    assert [review["book_id"] for review in first + second] == [book.id for book in reversed(books)]
+    assert all(review["user_id"] == 1 for review in first + second)
+    assert end is None
+
+
+def test_trabajo33_upsert_actualiza_la_resena_y_los_agregados():
+    book = BookRepository.create(title="Único", author="A")
+
+    first, created = upsert_review(book_id=book.id, user_id=1, username="ana", rating=2, comment="Flojo")
+    second, created_again = upsert_review(book_id=book.id, user_id=1, username="ana", rating=5)
+    create_review(book_id=book.id, user_id=2, username="luis", rating=3, upsert=True)
+
+    assert created is True and created_again is False
+    assert second["id"] == first["id"] and second["created_at"] == first["created_at"]
+    assert second["rating"] == 5 and second["comment"] is None
+    assert get_reviews_collection().count_documents({"book_id": book.id}) == 2
+    aggregate = get_rating_aggregate(book.id)
+    assert (aggregate.total, aggregate.count, aggregate.histogram) == (8, 2, (0, 0, 1, 0, 1))
+
+
+def test_trabajo33_endpoint_mis_resenas_y_post_con_upsert():
+    ana = User.objects.create_user(username="ana", password="x")
+    luis = User.objects.create_user(username="luis", password="x")
+    book = BookRepository.create(title="Libro", author="A")
+    path = f"/api/books/{book.id}/reviews/"
+
+    created = _call(path, user=ana, method="POST", body={"rating": 3}, upsert="true")
+    updated = _call(path, user=ana, method="POST", body={"rating": 4}, upsert="true")
+    _call(path, user=luis, method="POST", body={"rating": 1})
+    mine = json.loads(_call("/api/users/me/reviews/", user=ana).content)
+
+    assert (created.status_code, updated.status_code) == (201, 200)
+    assert json.loads(updated.content)["rating"] == 4
+    assert mine == {"next_cursor": None, "results": [json.loads(updated.content)]}
+    assert _call("/api/users/me/reviews/", user=AnonymousUser()).status_code == 401
+    assert _call("/api/users/me/reviews/", user=ana, before="x").status_code == 400
@@ -0,0 +1,89 @@
+"""Tests asociados al Trabajo34 (histograma de valoraciones desde contadores precalculados)."""
+from __future__ import annotations
+
+import json
+import os
+
+import django
+import pymongo
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest
+from django.urls import resolve
+
+from library.models import BookRepository
+from library.reviews_service import create_review, get_reviews_collection, rebuild_rating_aggregates
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "biblioteca_config.settings")
+if not settings.configured:
+    django.setup()
+
+
+def setup_function(_: object) -> None:
+    BookRepository.reset()
+    get_reviews_collection().delete_many({})
+    rebuild_rating_aggregates()
+
+
+def _get(path: str, **params: str):
+    route = resolve(path)
+    request = HttpRequest(method="GET", path=path, user=AnonymousUser(), GET=params)
+    return route.callback(request, **route.kwargs)
+
+
+def _finds(monkeypatch) -> list:
+    calls = []
+    original = pymongo.Collection.find
+
+    def recording(self, filtro=None):
+        calls.append(self.name)
+        return original(self, filtro)
+
+    monkeypatch.setattr(pymongo.Collection, "find", recording)
+    return calls
+
+
+def test_trabajo34_histograma_de_un_libro_sin_recorrer_resenas(monkeypatch):
+    book = BookRepository.create(title="Estrellas", author="A")
+    for rating in (5, 5, 4, 1):
+        create_review(book_id=book.id, user_id=1, username="u", rating=rating)
+    calls = _finds(monkeypatch)
+
+    response = _get(f"/api/books/{book.id}/rating/histogram/")
+
+    assert response.status_code == 200
+    assert json.loads(response.content) == {
+        "book_id": book.id,
+        "average_rating": 3.75,
+        "num_reviews": 4,
+        "histogram": {"1": 1, "2": 0, "3": 0, "4": 1, "5": 2},
+    }
+    assert get_reviews_collection().name not in calls
+    assert _get("/api/books/999/rating/histogram/").status_code == 404
+
+
+def test_trabajo34_histogramas_de_varios_libros_en_una_consulta(monkeypatch):
+    first, second, third = BookRepository.bulk_create({"title": f"L{index}", "author": "A"} for index in range(3))
+    create_review(book_id=first.id, user_id=1, username="u", rating=3)
+    create_review(book_id=third.id, user_id=1, username="u", rating=5)
+    calls = _finds(monkeypatch)
+
+    payload = json.loads(_get("/api/books/rating/histogram/", ids=f"{third.id},999,{first.id},{second.id}").content)
+
+    assert len(calls) == 1
+    assert [entry["book_id"] for entry in payload["results"]] == [third.id, first.id, second.id]
+    assert payload["results"][0]["histogram"]["5"] == 1
+    assert payload["results"][2] == {
+        "book_id": second.id,
+        "average_rating": None,
+        "num_reviews": 0,
+        "histogram": {"1": 0, "2": 0, "3": 0, "4": 0, "5": 0},
+    }
+    assert payload["not_found"] == [999]
+
+
+def test_trabajo34_ids_invalidos_devuelven_400():
+    for ids in ("", "1,a", "1,²"):
+        response = _get("/api/books/rating/histogram/", ids=ids)
+        assert response.status_code == 400
+        assert "ids" in json.loads(response.content)["errors"]
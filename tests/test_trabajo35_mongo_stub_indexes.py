@@ -0,0 +1,106 @@
+"""Tests asociados al Trabajo35 (índices hash y ordenados en la Collection en memoria)."""
+from __future__ import annotations
+
+import pymongo
+import pytest
+from pymongo import ASCENDING, DESCENDING, Collection, DuplicateKeyError
+
+
+def _collection(size: int = 60) -> Collection:
+    collection = Collection("resenas")
+    for index in range(size):
+        collection.insert_one(
+            {"book_id": index % 6, "user_id": index % 7, "rating": 1 + index % 5, "created_at": f"2024-01-{1 + index % 20:02d}"}
+        )
+    return collection
+
+
+def _brute(collection: Collection, predicate) -> list:
+    return [document["_id"] for document in collection._documents.values() if predicate(document)]
+
+
+def _count_matches(monkeypatch) -> list:
+    calls = []
+    original = pymongo._matches
+
+    def counting(document, filtro):
+        calls.append(document["_id"])
+        return original(document, filtro)
+
+    monkeypatch.setattr(pymongo, "_matches", counting)
+    return calls
+
+
+def test_trabajo35_indice_compuesto_ordenado_evita_recorrer_la_coleccion(monkeypatch):
+    collection = _collection()
+    collection.create_index([("book_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="libro_fecha")
+    calls = _count_matches(monkeypatch)
+
+    page = [doc["_id"] for doc in collection.find({"book_id": 2}).sort([("created_at", -1), ("_id", -1)]).limit(3)]
+    expected = sorted(_brute(collection, lambda doc: doc["book_id"] == 2), key=lambda i: (collection._documents[i]["created_at"], i))
+
+    assert page == expected[::-1][:3]
+    assert len(calls) == 3
+    ascending = [doc["_id"] for doc in collection.find({"book_id": 2}).sort([("created_at", 1), ("_id", 1)])]
+    assert ascending == expected
+    assert collection.count_documents({"book_id": 2}) == 10
+    assert len(calls) == 3 + 10 + 10
+
+
+def test_trabajo35_rangos_prefijos_e_in_coinciden_con_el_recorrido(monkeypatch):
+    collection = _collection()
+    collection.create_index([("book_id", ASCENDING), ("created_at", ASCENDING)])
+    collection.create_index("user_id")
+    queries = [
+        ({"book_id": 1, "created_at": {"$gte": "2024-01-05", "$lt": "2024-01-12"}},
+         lambda doc: doc["book_id"] == 1 and "2024-01-05" <= doc["created_at"] < "2024-01-12"),
+        ({"book_id": 3, "created_at": {"$gt": "2024-01-10"}},
+         lambda doc: doc["book_id"] == 3 and doc["created_at"] > "2024-01-10"),
+        ({"book_id": 4, "created_at": {"$lte": "2024-01-10"}, "rating": 5},
+         lambda doc: doc["book_id"] == 4 and doc["created_at"] <= "2024-01-10" and doc["rating"] == 5),
+        ({"user_id": {"$in": [2, 5, 2]}}, lambda doc: doc["user_id"] in (2, 5)),
+        ({"book_id": 0, "created_at": {"$lt": 5}}, lambda doc: False),
+        ({"rating": 3}, lambda doc: doc["rating"] == 3),
+    ]
+
+    for filtro, predicate in queries:
+        assert [doc["_id"] for doc in collection.find(filtro)] == _brute(collection, predicate)
+        assert collection.count_documents(filtro) == len(_brute(collection, predicate))
+
+
+def test_trabajo35_indice_hash_y_unicidad():
+    collection = _collection(42)
+    collection.create_index([("book_id", "hashed")], name="libro_hash")
+    collection.create_index([("book_id", ASCENDING), ("user_id", ASCENDING)], name="par", unique=True)
+
+    assert [doc["_id"] for doc in collection.find({"book_id": 5})] == _brute(collection, lambda doc: doc["book_id"] == 5)
+    assert collection.index_information()["par"] == {"key": [("book_id", 1), ("user_id", 1)], "unique": True}
+    with pytest.raises(DuplicateKeyError):
+        collection.insert_one({"book_id": 0, "user_id": 0})
+    with pytest.raises(DuplicateKeyError):
+        collection.update_one({"book_id": 0, "user_id": 0}, {"$set": {"user_id": 1}})
+    assert collection.find_one({"book_id": 0, "user_id": 0}) is not None
+    with pytest.raises(DuplicateKeyError):
+        collection.create_index("book_id", name="libro_unico", unique=True)
+    with pytest.raises(DuplicateKeyError):
+        collection.insert_one({"_id": 1})
+
+
+def test_trabajo35_escrituras_mantienen_los_indices():
+    collection = _collection(42)
+    collection.create_index([("book_id", ASCENDING), ("user_id", ASCENDING)], name="par", unique=True)
+    target = collection.find_one({"book_id": 1, "user_id": 1})
+
+    collection.update_one({"_id": target["_id"]}, {"$set": {"book_id": 9}})
+    assert collection.find_one({"book_id": 1, "user_id": 1}) is None
+    assert collection.find_one({"book_id": 9, "user_id": 1})["_id"] == target["_id"]
+    collection.insert_one({"book_id": 1, "user_id": 1})
+
+    assert collection.delete_many({"book_id": 9}).deleted_count == 1
+    assert collection.count_documents({"book_id": 9}) == 0
+    assert collection.delete_many({"user_id": {"$in": [3, 4]}}).deleted_count == 12
+    assert collection.count_documents({}) == 42 - 12
+    collection.update_one({"book_id": 7, "user_id": 7}, {"$inc": {"count": 1}}, upsert=True)
+    assert collection.find_one({"book_id": 7})["count"] == 1
+    assert collection.delete_many({}).deleted_count == 31
+    assert list(collection.find({"book_id": 7})) == []